@@ -2,47 +2,77 @@ from typing import Any, Dict
 from mods_base import hook, build_mod, SliderOption, BoolOption, keybind
 from unrealsdk.hooks import Type
 from unrealsdk.unreal import UObject, WrappedStruct
-import unrealsdk
 
-def _hud(title: str, msg: str) -> None:
-    try:
-        from ui_utils import show_hud_message
-        show_hud_message(title, msg)
-    except Exception:
-        pass
+from arpg_core import attributes, bases, buffs, context, frame, hud, kills, modifiers, telemetry
+from arpg_core.profiling import profiled
+from arpg_core.session import Saved, Session
+from arpg_core.trace import traced
+from arpg_core.scheduler import timers
+
+def _mark_dirty(*_: Any) -> None:
+    # Options or players changed: every player re-applies. The tick hook is
+    # only attached while there is something to apply.
+    for st in _session.states.values():
+        st.dirty = True
+    _session.wake()
+
+def _invalidate_plan(*_: Any) -> None:
+    # on_change runs before the value is stored, so the plan is rebuilt on the next apply.
+    global _plan
+    _plan = None
+    _mark_dirty()
+
+PerKillPct: SliderOption = SliderOption("Per‑Kill %  (1=2.5, 2=5, 3=7.5, 4=10, 5=20)", 5, 1, 5, 1, True, on_change=_invalidate_plan)
+MaxStacks: SliderOption = SliderOption("Max Stacks (1–10)", 10, 1, 10, 1, True, on_change=_invalidate_plan)
+def _on_decay_change(_: Any, value: float) -> None:
+    # on_change runs before the option value is updated, so use the new value directly.
+    for st in _session.states.values():
+        if st.stacks > 0:
+            _schedule_decay(st, st.last_kill_time + float(value))
+            _save(st, context.world_time())
+
+DecaySeconds: SliderOption = SliderOption("Seconds per Stack Decay (5–20)", 10, 5, 20, 1, True, on_change=_on_decay_change)
+
+AffectReload:   BoolOption = BoolOption("Affect Reload Speed",   True,  "On", "Off", on_change=_invalidate_plan)
+AffectFireRate: BoolOption = BoolOption("Affect Fire Rate",      True,  "On", "Off", on_change=_invalidate_plan)
+AffectSplashD:  BoolOption = BoolOption("Affect Splash Damage",  True,  "On", "Off", on_change=_invalidate_plan)
+AffectSplashR:  BoolOption = BoolOption("Affect Splash Radius",  True,  "On", "Off", on_change=_invalidate_plan)
+AffectAS_CDR:   BoolOption = BoolOption("Affect Action Skill Cooldown Rate", True, "On", "Off", on_change=_invalidate_plan)
+UseTimeDilate:  BoolOption = BoolOption("Use Time Dilation for Movement", True, "On", "Off", on_change=_invalidate_plan)
+UseFOVBump:     BoolOption = BoolOption("Also bump FOV for visibility", True, "On", "Off", on_change=_invalidate_plan)
+
+class _PlayerState:
+    __slots__ = ("ctx", "stacks", "last_kill_time", "base_fov", "fov_written", "dirty", "levels")
+
+    def __init__(self, ctx: context.PlayerContext) -> None:
+        self.ctx = ctx
+        self.stacks = 0
+        self.last_kill_time = 0.0
+        self.base_fov: float | None = None
+        self.fov_written: float | None = None
+        self.dirty = True
+        # Stack count over time, one sample per change.
+        self.levels = telemetry.ring(f"KillStackHaste.stacks P{ctx.index + 1}", telemetry.LEVEL)
+
+# Compiled from the options by _compile_plan; None until the next apply after a change.
+_plan: buffs.BuffPlan | None = None
+# FOV factor per stack level; the camera is written directly, not through modifiers.
+_plan_fov: tuple = (1.0,)
+
+_MOD = "KillStackHaste"
+_DECAY_KEY = "KillStackHaste.decay"
 
-PerKillPct: SliderOption = SliderOption("Per‑Kill %  (1=2.5, 2=5, 3=7.5, 4=10, 5=20)", 5, 1, 5, 1, True)
-MaxStacks: SliderOption = SliderOption("Max Stacks (1–10)", 10, 1, 10, 1, True)
-DecaySeconds: SliderOption = SliderOption("Seconds per Stack Decay (5–20)", 10, 5, 20, 1, True)
-
-AffectReload:   BoolOption = BoolOption("Affect Reload Speed",   True,  "On", "Off")
-AffectFireRate: BoolOption = BoolOption("Affect Fire Rate",      True,  "On", "Off")
-AffectSplashD:  BoolOption = BoolOption("Affect Splash Damage",  True,  "On", "Off")
-AffectSplashR:  BoolOption = BoolOption("Affect Splash Radius",  True,  "On", "Off")
-AffectAS_CDR:   BoolOption = BoolOption("Affect Action Skill Cooldown Rate", True, "On", "Off")
-UseTimeDilate:  BoolOption = BoolOption("Use Time Dilation for Movement", True, "On", "Off")
-UseFOVBump:     BoolOption = BoolOption("Also bump FOV for visibility", True, "On", "Off")
-
-_stacks: int = 0
-_last_kill_time: float = 0.0
-_base_walk: float | None = None
-_base_sprint: float | None = None
-_base_td: float | None = None
-_base_fov: float | None = None
-
-_attr_bases: Dict[str, float] = {}
-_attr_defs: Dict[str, object] = {}
-
-ATTR_RELOAD   = "/Game/GameData/Attributes/Weapon/Att_Weapon_ReloadSpeedScale"
-ATTR_FIRERATE = "/Game/GameData/Attributes/Weapon/Att_Weapon_FireRateScale"
-ATTR_SPLASH_D = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashDamageScale"
-ATTR_SPLASH_R = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashRadiusScale"
 ATTR_AS_CDR   = "/Game/GameData/Attributes/ActionSkill/Att_ActionSkill_CooldownRate"
 ATTR_MOVE_CANDIDATES = [
     "/Game/GameData/Attributes/Movement/Att_CharacterMovementSpeed",
     "/Game/GameData/Attributes/Movement/Att_Character_Movement_Speed",
     "/Game/GameData/Attributes/Player/Att_CharacterMovementSpeed",
 ]
+# Only one of the movement candidates exists in a given build; the registry picks it.
+MOVE_GROUP = "KillStackHaste.move_speed"
+attributes.register([attributes.RELOAD_SPEED, attributes.FIRE_RATE, attributes.SPLASH_DAMAGE,
+                     attributes.SPLASH_RADIUS, ATTR_AS_CDR])
+attributes.register_group(MOVE_GROUP, ATTR_MOVE_CANDIDATES)
 
 def _per_stack() -> float:
     return {1: 0.025, 2: 0.05, 3: 0.075, 4: 0.10, 5: 0.20}.get(int(PerKillPct.value), 0.05)
@@ -53,220 +83,231 @@ def _max_stacks() -> int:
 def _decay_seconds() -> float:
     return float(DecaySeconds.value)
 
-def _world_time() -> float:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        return pc.GetWorldInfo().TimeSeconds if pc else 0.0
-    except Exception:
-        return 0.0
-
-def _find_attr(path: str):
-    if path in _attr_defs:
-        return _attr_defs[path]
-    obj = unrealsdk.FindObject("AttributeDefinition", path)
-    _attr_defs[path] = obj
-    return obj
-
-def _cache_attr_base(target, path: str):
-    if path in _attr_bases:
-        return
-    attr = _find_attr(path)
-    if attr and target:
-        try:
-            _attr_bases[path] = float(target.GetAttributeBaseValue(attr))
-        except Exception:
-            _attr_bases[path] = 1.0
-
-def _apply_attr_scaled(target, path: str, mult: float):
-    attr = _find_attr(path)
-    if not attr or not target:
-        return
-    _cache_attr_base(target, path)
-    base = _attr_bases.get(path, 1.0)
-    try:
-        target.SetAttributeBaseValue(attr, base * mult)
-    except Exception:
-        pass
+def _compile_plan() -> buffs.BuffPlan:
+    global _plan, _plan_fov
+    levels = _max_stacks() + 1
+    mults = buffs.compound(_per_stack(), levels)
+    ones = buffs.neutral(levels)
+    plan = buffs.BuffPlan(levels)
+    plan.add(buffs.MOVEMENT, "MaxWalkSpeed", mults)
+    plan.add(buffs.MOVEMENT, "MaxSprintSpeed", mults)
+    move = attributes.group(MOVE_GROUP)
+    if move:
+        plan.add(buffs.PAWN, move, mults)
+    plan.add(buffs.PAWN, "CustomTimeDilation", mults if UseTimeDilate.value else ones)
+    for enabled, path in (
+        (AffectReload.value,   attributes.RELOAD_SPEED),
+        (AffectFireRate.value, attributes.FIRE_RATE),
+        (AffectSplashD.value,  attributes.SPLASH_DAMAGE),
+        (AffectSplashR.value,  attributes.SPLASH_RADIUS),
+        (AffectAS_CDR.value,   ATTR_AS_CDR),
+    ):
+        plan.add(buffs.CONTROLLER, path, mults if enabled else ones)
+    _plan_fov = tuple(1.0 + 0.10*(m-1.0) for m in mults) if UseFOVBump.value else ones  # mild bump
+    _plan = plan
+    return plan
 
-def _apply_movement(pawn, mult: float) -> None:
-    global _base_walk, _base_sprint, _base_td
+def _set_fov(cam, fov: float) -> None:
     try:
-        if not pawn or not pawn.CharacterMovement:
-            return
-        cm = pawn.CharacterMovement
-        if _base_walk is None:
-            _base_walk = float(getattr(cm, "MaxWalkSpeed", 600.0))
-        if _base_sprint is None and hasattr(cm, "MaxSprintSpeed"):
-            _base_sprint = float(getattr(cm, "MaxSprintSpeed"))
-        if _base_td is None:
-            _base_td = float(getattr(pawn, "CustomTimeDilation", 1.0))
-
-        try: cm.MaxWalkSpeed = _base_walk * mult
-        except Exception: pass
-        try:
-            if _base_sprint is not None and hasattr(cm, "MaxSprintSpeed"):
-                cm.MaxSprintSpeed = _base_sprint * mult
-        except Exception: pass
-
-        for path in ATTR_MOVE_CANDIDATES:
-            _apply_attr_scaled(pawn, path, mult)
-
-        if UseTimeDilate.value:
-            try: pawn.CustomTimeDilation = _base_td * mult
-            except Exception: pass
-        else:
-            try: pawn.CustomTimeDilation = _base_td if _base_td is not None else 1.0
-            except Exception: pass
-
+        cam.SetFOV(fov)
     except Exception:
-        pass
+        cam.DefaultFOV = fov
 
-def _apply_fov(pc, mult: float) -> None:
-    global _base_fov
+def _apply_fov(st: _PlayerState, factor: float) -> None:
     try:
-        cam = pc.PlayerCameraManager if pc else None
+        cam = st.ctx.camera
         if not cam:
             return
-        current_fov = 90.0
-        try:
-            current_fov = float(cam.GetFOVAngle())
-        except Exception:
-            try:
-                current_fov = float(getattr(cam, "DefaultFOV", 90.0))
-            except Exception:
-                pass
-        if _base_fov is None:
-            _base_fov = current_fov
-        target_fov = float(_base_fov) * (1.0 + 0.10*(mult-1.0))  # mild bump
-        try:
-            cam.SetFOV(target_fov)
-        except Exception:
+        if st.base_fov is None:
+            current_fov = 90.0
             try:
-                cam.DefaultFOV = target_fov
+                current_fov = float(cam.GetFOVAngle())
             except Exception:
-                pass
+                try:
+                    current_fov = float(getattr(cam, "DefaultFOV", 90.0))
+                except Exception:
+                    pass
+            st.base_fov = current_fov
+            st.fov_written = current_fov
+            _session.journal.set(st.ctx.index, "fov", current_fov)
+        target_fov = st.base_fov * factor
+        if target_fov != st.fov_written:
+            _set_fov(cam, target_fov)
+            st.fov_written = target_fov
     except Exception:
         pass
 
+def _claim(st: _PlayerState, saved: Saved) -> None:
+    # What the journal had for this player: stack count (with seconds to the next
+    # decay) and the camera's true FOV.
+    ctx = st.ctx
+    fov = saved.get("fov")
+    if fov is not None and ctx.camera:
+        # Put the true FOV back before any bump is applied on top of it.
+        _set_fov(ctx.camera, fov.value)
+        st.base_fov = st.fov_written = fov.value
+    stacks = saved.get("stacks")
+    if stacks is not None and stacks.value > 0:
+        st.stacks = min(int(stacks.value), _max_stacks())
+        # Deadlines that passed while the game was closed fire on the first pump.
+        due = context.world_time() + stacks.remaining()
+        st.last_kill_time = due - _decay_seconds()
+        _schedule_decay(st, due)
+        st.dirty = True
+    telemetry.record(st.levels, ctx.world_time(), st.stacks)
+
+def _leave(st: _PlayerState) -> None:
+    timers.cancel(_decay_key(st))
+
+# One state per local player, keyed by controller (re-keyed when a controller is replaced).
+_session: Session[_PlayerState] = Session(_MOD, _PlayerState, _claim, _leave)
+
+def _sync_players() -> Dict[Any, _PlayerState]:
+    # Runs from the context listener: new split-screen players get a state, states
+    # follow their player to a new controller, departed players are dropped.
+    states = _session.sync()
+    for st in states.values():
+        st.dirty = True
+    _session.wake()
+    return states
+
+@profiled("KillStackHaste._apply")
+def _apply(st: _PlayerState) -> None:
+    ctx = st.ctx
+    if not ctx.pawn:
+        return
+    plan = _plan or _compile_plan()
+    plan.apply(_MOD, ctx, st.stacks)
+    if st.base_fov is not None or _plan_fov[-1] != 1.0:
+        _apply_fov(st, _plan_fov[min(st.stacks, len(_plan_fov) - 1)])
+    st.dirty = False
+
 def _apply_all() -> None:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        pawn = pc.Pawn if pc else None
-        if not pawn:
-            return
-        mult = (1.0 + _per_stack()) ** _stacks
-        _apply_movement(pawn, mult)
-        if UseFOVBump.value:
-            _apply_fov(pc, mult)
-        tgt = pc if pc else pawn
-        if AffectReload.value:   _apply_attr_scaled(tgt, ATTR_RELOAD,   mult)
-        if AffectFireRate.value: _apply_attr_scaled(tgt, ATTR_FIRERATE, mult)
-        if AffectSplashD.value:  _apply_attr_scaled(tgt, ATTR_SPLASH_D, mult)
-        if AffectSplashR.value:  _apply_attr_scaled(tgt, ATTR_SPLASH_R, mult)
-        if AffectAS_CDR.value:   _apply_attr_scaled(pc if pc else pawn, ATTR_AS_CDR, mult)
-    except Exception:
-        pass
+    for st in _session.states.values():
+        if st.dirty:
+            _apply(st)
 
 def _restore_all() -> None:
     try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        pawn = pc.Pawn if pc else None
-        if pawn and pawn.CharacterMovement and _base_walk is not None:
-            cm = pawn.CharacterMovement
-            try: cm.MaxWalkSpeed = _base_walk
-            except Exception: pass
-            if _base_sprint is not None and hasattr(cm, "MaxSprintSpeed"):
-                try: cm.MaxSprintSpeed = _base_sprint
-                except Exception: pass
-        if _base_td is not None and pawn and hasattr(pawn, "CustomTimeDilation"):
-            try: pawn.CustomTimeDilation = _base_td
-            except Exception: pass
-        if _base_fov is not None and pc and getattr(pc, "PlayerCameraManager", None):
-            try:
-                pc.PlayerCameraManager.SetFOV(_base_fov)
-            except Exception:
-                try:
-                    pc.PlayerCameraManager.DefaultFOV = _base_fov
-                except Exception:
-                    pass
-    except Exception:
-        pass
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        pawn = pc.Pawn if pc else None
-        tgt = pc if pc else pawn
-        for path, base in _attr_bases.items():
-            attr = _find_attr(path)
-            if attr and tgt:
-                try: tgt.SetAttributeBaseValue(attr, base)
-                except Exception: pass
+        modifiers.clear(_MOD)
+        modifiers.flush()
+        for st in _session.states.values():
+            if st.base_fov is not None:
+                _apply_fov(st, 1.0)
+                if st.fov_written == st.base_fov:
+                    _session.journal.delete(st.ctx.index, "fov")
     except Exception:
         pass
+    _mark_dirty()
 
-def _gain_stack() -> None:
-    global _stacks, _last_kill_time
-    new_val = min(_stacks + 1, _max_stacks())
-    if new_val != _stacks:
-        _stacks = new_val
-        _last_kill_time = _world_time()
-        _hud("KillStackHaste", f"Stacks: {_stacks}  (+{int(_per_stack()*100)}% per)")
-        _apply_all()
-
-def _clear_stacks() -> None:
-    global _stacks
-    _stacks = 0
-    _hud("KillStackHaste", "Stacks cleared")
-    _restore_all()
+def _title(st: _PlayerState) -> str:
+    return "KillStackHaste" if st.ctx.index == 0 else f"KillStackHaste P{st.ctx.index + 1}"
 
-def _decay(now: float) -> None:
-    global _stacks, _last_kill_time
-    while _stacks > 0 and now - _last_kill_time >= _decay_seconds():
-        _stacks -= 1
-        _last_kill_time += _decay_seconds()
+def _decay_key(st: _PlayerState) -> str:
+    return f"{_DECAY_KEY}.{st.ctx.index}"
 
-@hook("/Script/OakGame.OakCharacter:Died", Type.POST)
-def _on_died_char(obj: UObject, args: WrappedStruct, *_: Any) -> None:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        is_hostile = pc.GetTeamComponent().IsHostile if pc else None
-        if is_hostile is None or is_hostile(obj):
-            _gain_stack()
-    except Exception:
-        pass
-    return
+def _schedule_decay(st: _PlayerState, when: float) -> None:
+    timers.schedule(_decay_key(st), when, lambda w, st=st: _on_decay(st, w))
 
-@hook("/Script/OakGame.OakDamageComponent:OnDeath", Type.POST)
-def _on_death_dc(obj: UObject, args: WrappedStruct, *_: Any) -> None:
-    try:
-        owner = getattr(obj, "Owner", None) or getattr(obj, "GetOwner", lambda: None)()
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        is_hostile = pc.GetTeamComponent().IsHostile if pc else None
-        if owner and (is_hostile is None or is_hostile(owner)):
-            _gain_stack()
-    except Exception:
-        pass
-    return
+def _save(st: _PlayerState, now: float) -> None:
+    # One appended record per change; the decay deadline is saved as time left.
+    if st.stacks > 0:
+        _session.journal.set(st.ctx.index, "stacks", st.stacks, timers.time_left(_decay_key(st), now))
+    else:
+        _session.journal.delete(st.ctx.index, "stacks")
+
+def _gain_stack(st: _PlayerState, count: int = 1) -> None:
+    new_val = min(st.stacks + count, _max_stacks())
+    if new_val != st.stacks:
+        st.stacks = new_val
+        st.last_kill_time = context.world_time()
+        _schedule_decay(st, st.last_kill_time + _decay_seconds())
+        _save(st, st.last_kill_time)
+        telemetry.record(st.levels, st.last_kill_time, new_val)
+        hud.show(_title(st), f"Stacks: {st.stacks}  (+{int(_per_stack()*100)}% per)")
+        st.dirty = True
+        _session.wake()
+
+def _clear_stacks(st: _PlayerState) -> None:
+    st.stacks = 0
+    timers.cancel(_decay_key(st))
+    _save(st, 0.0)
+    telemetry.record(st.levels, context.world_time(), 0)
+    hud.show(_title(st), "Stacks cleared", priority=True)
+    st.dirty = True
+    _session.wake()
+
+@profiled("KillStackHaste._on_decay")
+def _on_decay(st: _PlayerState, when: float) -> None:
+    # Fired by the scheduler at each decay deadline; after a hitch the follow-up
+    # deadlines are already due and fire in the same pump.
+    if st.stacks <= 0:
+        return
+    st.stacks -= 1
+    st.last_kill_time = when
+    telemetry.record(st.levels, when, st.stacks)
+    st.dirty = True
+    _session.wake()
+    if st.stacks > 0:
+        _schedule_decay(st, when + _decay_seconds())
+    _save(st, when)
+
+@profiled("KillStackHaste._on_kills")
+def _on_kills(batch: kills.KillBatch) -> None:
+    counts: Dict[context.PlayerContext, int] = {}
+    for k in batch:
+        counts[k.player] = counts.get(k.player, 0) + 1
+    for ctx, n in counts.items():
+        st = context.state_for(_session.states, ctx, _sync_players)
+        if st is not None:
+            _gain_stack(st, n)
 
 @hook("/Script/OakGame.OakPlayerController:PlayerTick", Type.POST)
+@profiled("KillStackHaste._on_tick")
 def _on_tick(obj: UObject, args: WrappedStruct, *_: Any) -> None:
-    try:
-        now = _world_time()
-        _decay(now)
-        _apply_all()
-        if _stacks == 0:
-            _restore_all()
-    except Exception:
-        pass
-    return
+    # Fires once per local controller; all players are handled in the lead's call.
+    if not frame.is_lead(obj):
+        return
+    busy = False
+    for st in _session.states.values():
+        if st.dirty:
+            _apply(st)
+            busy = busy or st.dirty
+    modifiers.flush()
+    if not busy:
+        _on_tick.disable()
+
+_session.tick = _on_tick
 
 @keybind("KSH: Add Stack")
+@traced
+@profiled("KillStackHaste._kb_add")
 def _kb_add() -> None:
-    _gain_stack()
-    _apply_all()
+    st = context.state_for(_session.states, context.get(), _sync_players)
+    if st is not None:
+        _gain_stack(st)
 
 @keybind("KSH: Clear Stacks")
+@traced
+@profiled("KillStackHaste._kb_clear")
 def _kb_clear() -> None:
-    _clear_stacks()
-    _apply_all()
+    for st in list(_session.states.values()):
+        _clear_stacks(st)
+
+context.on_change("KillStackHaste", _sync_players)
+attributes.on_reload("KillStackHaste", _invalidate_plan)
+
+def _on_enable() -> None:
+    _session.enabled = True
+    attributes.preload()
+    bases.restore()
+    _session.load_journal()
+    kills.subscribe(_MOD, _on_kills)
+    _sync_players()
+
+def _on_disable() -> None:
+    _session.enabled = False
+    kills.unsubscribe(_MOD)
+    _restore_all()
 
-build_mod()
+build_mod(on_enable=_on_enable, on_disable=_on_disable)
@@ -2,28 +2,33 @@ from typing import Any, Dict, List, Tuple, Optional
 from mods_base import hook, build_mod, SliderOption, BoolOption, keybind
 from unrealsdk.hooks import Type
 from unrealsdk.unreal import UObject, WrappedStruct
-import unrealsdk
 
-def _hud(title: str, msg: str) -> None:
-    try:
-        from ui_utils import show_hud_message
-        show_hud_message(title, msg)
-    except Exception:
-        pass
+from arpg_core import attributes, bases, buffs, context, frame, hud, modifiers, telemetry
+from arpg_core.profiling import profiled
+from arpg_core.session import Saved, Session
+from arpg_core.trace import traced
+from arpg_core.scheduler import timers
+# Not imported lazily: enable builds the current map's anchors, which uses all three.
+from . import layouts, regions, render
+from .spatial import Anchor, AnchorGrid, Proximity
 
 Duration: SliderOption = SliderOption("Pylon Duration (sec)", 35, 20, 60, 5, True)
 Cooldown: SliderOption = SliderOption("Anchor Cooldown (sec)", 180, 60, 600, 30, True)
 MaxSimultaneous: SliderOption = SliderOption("Max Concurrent Pylon Buffs", 2, 1, 3, 1, True)
-AnchorsPerMap: SliderOption = SliderOption("Anchors Per Map (1–3)", 3, 1, 3, 1, True)
+def _on_generation_change(_: SliderOption, value: int) -> None:
+    # Regions regenerate with the new count as the player moves; 0 leaves only dropped anchors.
+    for s in _streams.values():
+        _forget_near(s.clear())
+    _session.wake()
+
+AnchorsPerRegion: SliderOption = SliderOption("Anchors Per Region (0 = dropped only)", 2, 0, 3, 1, True, on_change=_on_generation_change)
+DrawDistance: SliderOption = SliderOption("Anchor Draw Distance", 8000, 2000, 20000, 1000, True)
 
 EnableFrenzy:   BoolOption = BoolOption("Enable Frenzy (MS/Reload/FireRate)", True, "On", "Off")
 EnableConquest: BoolOption = BoolOption("Enable Conquest (Splash Dmg/Radius)", True, "On", "Off")
 ShowHUDHints:   BoolOption = BoolOption("Show HUD Hints Near Anchors", True, "On", "Off")
 
-ATTR_RELOAD   = "/Game/GameData/Attributes/Weapon/Att_Weapon_ReloadSpeedScale"
-ATTR_FIRERATE = "/Game/GameData/Attributes/Weapon/Att_Weapon_FireRateScale"
-ATTR_SPLASH_D = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashDamageScale"
-ATTR_SPLASH_R = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashRadiusScale"
+attributes.register([attributes.RELOAD_SPEED, attributes.FIRE_RATE, attributes.SPLASH_DAMAGE, attributes.SPLASH_RADIUS])
 
 FRENZY_MS   = 1.25
 FRENZY_RE   = 1.25
@@ -31,30 +36,47 @@ FRENZY_FR   = 1.20
 CONQ_SD     = 1.35
 CONQ_SR     = 1.30
 
-_anchors: List[Dict[str, Any]] = []
+def _compile_plans() -> Dict[str, buffs.BuffPlan]:
+    # Level 0 is "off", level 1 "active". No option feeds these values, so this runs once.
+    frenzy = buffs.BuffPlan(2)
+    frenzy.add(buffs.PAWN, "CustomTimeDilation", (1.0, FRENZY_MS))
+    frenzy.add(buffs.CONTROLLER, attributes.RELOAD_SPEED, (1.0, FRENZY_RE))
+    frenzy.add(buffs.CONTROLLER, attributes.FIRE_RATE, (1.0, FRENZY_FR))
+    conquest = buffs.BuffPlan(2)
+    conquest.add(buffs.CONTROLLER, attributes.SPLASH_DAMAGE, (1.0, CONQ_SD))
+    conquest.add(buffs.CONTROLLER, attributes.SPLASH_RADIUS, (1.0, CONQ_SR))
+    return {"Frenzy": frenzy, "Conquest": conquest}
+
+PLANS: Dict[str, buffs.BuffPlan] = _compile_plans()
+
+HINT_RANGE  = 1200.0
+# Leaving takes a little more distance than entering, so the boundary does not flap.
+HINT_EXIT_RANGE = 1500.0
+
+# One grid per map; _anchors is the grid for the map we are currently on. It holds
+# the saved (dropped) anchors plus whatever regions _stream has generated.
+_index: Dict[str, AnchorGrid] = {}
+_streams: Dict[str, regions.RegionStreamer] = {}
+_anchors: AnchorGrid = AnchorGrid()
+_stream: Optional[regions.RegionStreamer] = None
 _active: List[Dict[str, Any]] = []
 _built_for_map: Optional[str] = None
-_last_hint_time: float = 0.0
+class _PlayerState:
+    __slots__ = ("ctx", "near")
 
-def _world_time() -> float:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        return pc.GetWorldInfo().TimeSeconds if pc else 0.0
-    except Exception:
-        return 0.0
+    def __init__(self, ctx: context.PlayerContext) -> None:
+        self.ctx = ctx
+        self.near = Proximity(HINT_RANGE, HINT_EXIT_RANGE)
+
+_next_buff_id: int = 0
+_store = layouts.LayoutStore()
 
 def _map_name() -> str:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        wi = pc.GetWorldInfo() if pc else None
-        return wi.GetMapName() if wi else "Unknown"
-    except Exception:
-        return "Unknown"
+    return context.get().map_id
 
-def _pawn_loc() -> Optional[Tuple[float,float,float]]:
+def _pawn_loc(ctx: Optional[context.PlayerContext] = None) -> Optional[Tuple[float,float,float]]:
     try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        pawn = pc.Pawn if pc else None
+        pawn = (ctx or context.get()).pawn
         if not pawn:
             return None
         loc = pawn.K2_GetActorLocation()
@@ -62,176 +84,253 @@ def _pawn_loc() -> Optional[Tuple[float,float,float]]:
     except Exception:
         return None
 
-def _apply_attr_scaled(target, path: str, mult: float):
-    attr = unrealsdk.FindObject("AttributeDefinition", path)
-    if not attr or not target:
+def _apply_buff(buff_id: str, kind: str, ctx: context.PlayerContext) -> None:
+    if not ctx.controller or not ctx.pawn:
         return
-    try:
-        base = float(target.GetAttributeBaseValue(attr))
-    except Exception:
-        base = 1.0
-    try:
-        target.SetAttributeBaseValue(attr, base * mult)
-    except Exception:
-        pass
+    PLANS.get(kind, PLANS["Frenzy"]).apply(buff_id, ctx, 1)
 
-def _apply_frenzy() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    pawn = pc.Pawn if pc else None
-    if not pc or not pawn:
-        return
-    try:
-        base_td = float(getattr(pawn, "CustomTimeDilation", 1.0))
-        pawn.CustomTimeDilation = base_td * FRENZY_MS
-    except Exception:
-        pass
-    tgt = pc if pc else pawn
-    _apply_attr_scaled(tgt, ATTR_RELOAD, FRENZY_RE)
-    _apply_attr_scaled(tgt, ATTR_FIRERATE, FRENZY_FR)
-
-def _apply_conquest() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    pawn = pc.Pawn if pc else None
-    if not pc or not pawn:
-        return
-    tgt = pc if pc else pawn
-    _apply_attr_scaled(tgt, ATTR_SPLASH_D, CONQ_SD)
-    _apply_attr_scaled(tgt, ATTR_SPLASH_R, CONQ_SR)
+def _reapply_active() -> None:
+    # The pawn was replaced (respawn/travel); put running buffs on the new one.
+    for b in _active:
+        _apply_buff(b["id"], b["type"], b["player"])
+
+def _title(ctx: context.PlayerContext) -> str:
+    return "Pylons" if ctx.index == 0 else f"Pylons P{ctx.index + 1}"
+
+def _reset_near() -> None:
+    for st in _session.states.values():
+        st.near.reset()
+
+def _forget_near(gone: List[Anchor]) -> None:
+    if gone:
+        for st in _session.states.values():
+            st.near.forget(gone)
 
 def _restore_all() -> None:
-    try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        pawn = pc.Pawn if pc else None
-        if pawn and hasattr(pawn, "CustomTimeDilation"):
-            try: pawn.CustomTimeDilation = 1.0
-            except Exception: pass
-        tgt = pc if pc else pawn
-        for path in [ATTR_RELOAD, ATTR_FIRERATE, ATTR_SPLASH_D, ATTR_SPLASH_R]:
-            try:
-                attr = unrealsdk.FindObject("AttributeDefinition", path)
-                if attr and tgt:
-                    base = float(tgt.GetAttributeBaseValue(attr))
-                    tgt.SetAttributeBaseValue(attr, base)
-            except Exception:
-                pass
-    except Exception:
-        pass
+    players = {b["player"] for b in _active}
+    for b in _active:
+        timers.cancel(f"{b['id']}.expire")
+        modifiers.clear(b["id"])
+        _session.journal.delete(b["player"].index, b["id"])
+    _active.clear()
+    modifiers.flush()
+    for ctx in players:
+        _record_buffs(ctx, ctx.world_time())
 
-def _assign_types(count: int) -> List[str]:
+def _record_buffs(ctx: context.PlayerContext, now: float) -> None:
+    # Buffs running per player over time; only on activation and expiry.
+    ring = telemetry.ring(f"PylonsARPG.buffs P{ctx.index + 1}", telemetry.LEVEL, 128)
+    telemetry.record(ring, now, sum(1 for b in _active if b["player"] is ctx))
+
+def _type_pool() -> List[str]:
     pool = []
     if EnableFrenzy.value: pool.append("Frenzy")
     if EnableConquest.value: pool.append("Conquest")
-    if not pool: pool = ["Frenzy"]
-    return [pool[i % len(pool)] for i in range(count)]
+    return pool or ["Frenzy"]
 
 def _build_anchors_if_needed() -> None:
-    global _built_for_map, _anchors
+    # Runs from the context change listener (map travel, respawn), never per frame.
+    # Only switches grids; regions are generated by _sense as the player moves.
+    global _built_for_map, _anchors, _stream
     mapname = _map_name()
-    if _built_for_map == mapname and _anchors:
+    if _built_for_map is mapname:
         return
-    _anchors = []
+    if mapname not in _index:
+        _index[mapname] = _load_layout(mapname)
+        _streams[mapname] = regions.RegionStreamer(mapname, _index[mapname])
+    _anchors = _index[mapname]
+    _stream = _streams[mapname]
     _built_for_map = mapname
-    me = _pawn_loc()
-    if not me:
-        return
-    ax = int(AnchorsPerMap.value)
-    offsets = [(0.0,0.0,0.0), (1200.0,0.0,0.0), (0.0,1200.0,0.0)][:ax]
-    types = _assign_types(len(offsets))
-    now = _world_time()
-    for i, off in enumerate(offsets):
-        pos = (me[0]+off[0], me[1]+off[1], me[2]+off[2])
-        _anchors.append({"map": mapname, "pos": pos, "type": types[i], "cooldown_until": now})
-    _hud("Pylons", f"{len(_anchors)} pylons ready in {mapname}")
-
-def _dist(a: Tuple[float,float,float], b: Tuple[float,float,float]) -> float:
-    dx, dy, dz = a[0]-b[0], a[1]-b[1], a[2]-b[2]
-    return (dx*dx+dy*dy+dz*dz) ** 0.5
-
-def _draw_anchors() -> None:
-    try:
-        for a in _anchors:
-            pos = a["pos"]
-            unrealsdk.DrawDebugSphere(pos, 50.0, 12, (0, 255, 255, 255), False, 0.1)
-    except Exception:
-        pass
+    _reset_near()
 
-def _nearest_anchor(within: float=1200.0):
-    me = _pawn_loc()
-    if not me or not _anchors:
-        return None, None
-    best = None
-    bestd = 9e9
-    curmap = _map_name()
-    for i,a in enumerate(_anchors):
-        if a["map"] != curmap:
+def _load_layout(mapname: str) -> AnchorGrid:
+    # Only the map being entered is read; cooldowns resume with the time that was left.
+    grid = AnchorGrid()
+    layout = _store.load(mapname)
+    if layout is None:
+        return grid
+    now = context.world_time()
+    for a in layout.anchors.values():
+        grid.insert(a)
+    for uid, left in layout.cooldowns.items():
+        if left > 0.0:
+            a = layout.anchors.get(uid)
+            if a is not None:
+                a.cooldown_until = now + left
+            kind = a.type if a is not None else "A"
+            timers.schedule(_cooldown_key(mapname, uid), now + left, lambda _, m=mapname, k=kind: _cooldown_done(m, k))
+    return grid
+
+def _stream_regions(me: Tuple[float, float, float], now: float) -> None:
+    generated, evicted = _stream.update(me[0], me[1], me[2], int(AnchorsPerRegion.value), _type_pool())
+    for a in generated:
+        key = _cooldown_key(a.map, a.uid)
+        if key in timers:
+            # Cooldown started before the region was evicted; it kept running in the scheduler.
+            a.cooldown_until = now + timers.time_left(key, now)
+    _forget_near(evicted)
+
+def _sense(now: float) -> None:
+    # One pawn read per player per render pass feeds streaming, proximity events and drawing.
+    viewers = []
+    for st in _session.states.values():
+        me = _pawn_loc(st.ctx)
+        if not me:
             continue
-        d = _dist(a["pos"], me)
-        if d < bestd and d <= within:
-            bestd = d
-            best = i
-    return best, bestd if best is not None else (None, None)
-
-def _activate_anchor(i: int) -> None:
-    if i is None or i < 0 or i >= len(_anchors):
+        if _stream is not None and AnchorsPerRegion.value:
+            _stream_regions(me, now)
+        entered, _ = st.near.update(_anchors, me[0], me[1], me[2])
+        if entered and ShowHUDHints.value:
+            hud.show(_title(st.ctx), f"Near {entered[-1].type} — press bound key")
+        viewers.append((me, st.ctx.camera))
+    if viewers:
+        render.draw(_anchors, _built_for_map, viewers, float(DrawDistance.value), now)
+    else:
+        # No local pawn (menus, dead); sleep until a possess wakes us.
+        _on_tick.disable()
+
+def _nearest_anchor() -> Tuple[Optional[Anchor], Optional[context.PlayerContext]]:
+    # Reads the in-range sets kept by _sense; no scan on keypress. With several
+    # local players the closest player/anchor pair wins.
+    best, best_d2, who = None, 0.0, None
+    for st in _session.states.values():
+        a, d2 = st.near.nearest()
+        if a is not None and (best is None or d2 < best_d2):
+            best, best_d2, who = a, d2, st.ctx
+    return best, who
+
+def _activate_anchor(a: Optional[Anchor], ctx: Optional[context.PlayerContext] = None) -> None:
+    global _next_buff_id
+    if a is None:
         return
-    now = _world_time()
-    a = _anchors[i]
-    if now < a["cooldown_until"]:
-        secs = int(a["cooldown_until"] - now)
-        _hud("Pylons", f"{a['type']} on cooldown ({secs}s)")
+    ctx = ctx or context.get()
+    title = _title(ctx)
+    now = context.world_time()
+    cd_key = _cooldown_key(a.map, a.uid)
+    if cd_key in timers:
+        secs = int(timers.time_left(cd_key, now))
+        hud.show(title, f"{a.type} on cooldown ({secs}s)", priority=True)
         return
-    _active[:] = [b for b in _active if b["expires"] > now]
-    if len(_active) >= int(MaxSimultaneous.value):
-        _hud("Pylons", "Pylon limit reached")
+    timers.run_due(now)
+    if sum(1 for b in _active if b["player"] is ctx) >= int(MaxSimultaneous.value):
+        hud.show(title, "Pylon limit reached", priority=True)
         return
+    _next_buff_id += 1
+    buff_id = f"Pylons#{_next_buff_id}"
     dur = int(Duration.value)
-    if a["type"] == "Frenzy":
-        _apply_frenzy()
-    else:
-        _apply_conquest()
-    _active.append({"type": a["type"], "expires": now + dur})
-    a["cooldown_until"] = now + max(int(Cooldown.value), dur + 10)
-    _hud("Pylons", f"{a['type']} activated — {dur}s")
-
-def _tick_expiry() -> None:
-    now = _world_time()
-    before = len(_active)
-    _active[:] = [b for b in _active if b["expires"] > now]
-    if before > 0 and len(_active) == 0:
-        _restore_all()
+    _start_buff(buff_id, a.type, ctx, now, dur)
+    a.cooldown_until = now + max(int(Cooldown.value), dur + 10)
+    timers.schedule(cd_key, a.cooldown_until, lambda _, m=a.map, k=a.type: _cooldown_done(m, k))
+    _store.append(a.map, layouts.OP_COOLDOWN, a, a.cooldown_until - now)
+    hud.show(title, f"{a.type} activated — {dur}s", priority=True)
+
+def _start_buff(buff_id: str, kind: str, ctx: context.PlayerContext, now: float, dur: float) -> None:
+    _apply_buff(buff_id, kind, ctx)
+    _active.append({"id": buff_id, "type": kind, "expires": now + dur, "player": ctx})
+    timers.schedule(f"{buff_id}.expire", now + dur, lambda w, b=buff_id: _expire(b, w))
+    _record_buffs(ctx, now)
+    _session.journal.set(ctx.index, buff_id, left=dur, text=kind)
+
+def _cooldown_key(mapname: str, uid: int) -> str:
+    # Keyed by uid rather than object, so a regenerated region finds its running cooldowns.
+    return f"Pylons.cooldown.{mapname}.{uid}"
+
+@profiled("PylonsARPG._cooldown_done")
+def _cooldown_done(mapname: str, kind: str) -> None:
+    # Cooldowns keep running while the mod is disabled; only the hint waits for enable.
+    if _session.enabled and ShowHUDHints.value and mapname is _built_for_map:
+        hud.show("Pylons", f"{kind} pylon ready")
+
+@profiled("PylonsARPG._expire")
+def _expire(buff_id: str, when: float) -> None:
+    modifiers.clear(buff_id)
+    gone = [b for b in _active if b["id"] == buff_id]
+    _active[:] = [b for b in _active if b["id"] != buff_id]
+    for b in gone:
+        _session.journal.delete(b["player"].index, buff_id)
+        _record_buffs(b["player"], when)
+
+def _claim(st: _PlayerState, saved: Saved) -> None:
+    # The player's buffs (type, seconds left) that were running when the game went
+    # down resume with the time they had left, minus the time the game was closed.
+    # Anchor cooldowns are saved with the map's layout instead.
+    global _next_buff_id
+    now = context.world_time()
+    for buff_id, e in saved.items():
+        left = e.remaining()
+        _session.journal.delete(st.ctx.index, buff_id)
+        if left <= 0.0 or e.text not in PLANS:
+            continue
+        _next_buff_id += 1
+        _start_buff(f"Pylons#{_next_buff_id}", e.text, st.ctx, now, left)
+
+# One state per local player, keyed by controller.
+_session: Session[_PlayerState] = Session("PylonsARPG", _PlayerState, _claim)
 
 @hook("/Script/OakGame.OakPlayerController:PlayerTick", Type.POST)
+@profiled("PylonsARPG._on_tick")
 def _on_tick(obj: UObject, args: WrappedStruct, *_: Any) -> None:
-    global _last_hint_time
-    try:
-        _build_anchors_if_needed()
-        _draw_anchors()
-        _tick_expiry()
-        now = _world_time()
-        if ShowHUDHints.value and (now - _last_hint_time) > 1.0:
-            idx, d = _nearest_anchor(1200.0)
-            if idx is not None:
-                _hud("Pylons", f"Near {_anchors[idx]['type']} — press bound key")
-            _last_hint_time = now
-    except Exception:
-        pass
-    return
+    # Fires once per local controller; all players are handled in the lead's call.
+    if not frame.is_lead(obj):
+        return
+    if not _anchors and not AnchorsPerRegion.value:
+        # Nothing to draw, hint or stream on this map; sleep until a map/pawn change,
+        # a dropped anchor or generation being switched back on. Buffs expire on the scheduler.
+        _on_tick.disable()
+        return
+    now = context.world_time()
+    if render.due(now):
+        _sense(now)
+
+_session.tick = _on_tick
 
 @keybind("Pylon: Use Nearest")
+@traced
+@profiled("PylonsARPG._kb_use")
 def _kb_use() -> None:
-    i, d = _nearest_anchor(1200.0)
-    if i is None:
-        _hud("Pylons", "No pylon nearby")
+    a, who = _nearest_anchor()
+    if a is None:
+        hud.show("Pylons", "No pylon nearby", priority=True)
         return
-    _activate_anchor(i)
+    _activate_anchor(a, who)
 
 @keybind("Pylon: Drop Anchor Here")
+@traced
+@profiled("PylonsARPG._kb_drop_here")
 def _kb_drop_here() -> None:
     me = _pawn_loc()
     if not me:
         return
-    now = _world_time()
-    _anchors.append({"map": _map_name(), "pos": me, "type": "Frenzy", "cooldown_until": now})
-    _hud("Pylons", "Temporary Frenzy pylon dropped at your feet")
+    mapname = _built_for_map or _map_name()
+    uid = max((b.uid for b in _anchors if not b.uid & regions.GENERATED), default=-1) + 1
+    a = Anchor(mapname, me[0], me[1], me[2], "Frenzy", 0.0, uid)
+    _anchors.insert(a)
+    _store.append(mapname, layouts.OP_ADD, a)
+    _session.wake()
+    hud.show("Pylons", "Frenzy pylon dropped at your feet (saved)", priority=True)
+
+def _on_context_change() -> None:
+    _session.sync()
+    if not _session.enabled:
+        # No layout reads or cooldown timers for maps visited while disabled; enable builds the current one.
+        return
+    _reapply_active()
+    _build_anchors_if_needed()
+    _session.wake()
+
+context.on_change("PylonsARPG", _on_context_change)
+
+def _on_enable() -> None:
+    _session.enabled = True
+    attributes.preload()
+    bases.restore()
+    _session.sync()
+    _session.load_journal()
+    _build_anchors_if_needed()
+    _session.wake()
+
+def _on_disable() -> None:
+    _session.enabled = False
+    _restore_all()
 
-build_mod()
+build_mod(on_enable=_on_enable, on_disable=_on_disable)
@@ -0,0 +1,168 @@
+"""
+Per-map anchor layouts on disk.
+
+One small binary file per map, so entering a map only ever touches that map's
+file. A file is a header followed by fixed-size records; every change (anchor
+added, cooldown started, anchor removed) is appended as one record, so saving a
+dropped anchor is a single short write. Loading replays the records, ignores a
+torn record at the tail, and rewrites the file compacted (temp file +
+``os.replace``) when superseded records outnumber live anchors. That rewrite
+runs on a worker thread; records appended while it runs are copied over from
+the old file's tail before the swap.
+
+Cooldowns are saved as a wall-clock deadline, so time spent out of the map or
+out of the game counts; loading returns the seconds left and drops the ones
+that have run out, and compaction leaves those out.
+"""
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+from arpg_core import workers
+
+from .spatial import Anchor
+
+MAGIC = b"PYLN"
+VERSION = 1
+_HEADER = struct.Struct("<4sHH")
+# op, anchor uid, x, y, z, type code, cooldown deadline (time.time() seconds)
+_RECORD = struct.Struct("<BIfffBd")
+
+OP_ADD = 1
+OP_COOLDOWN = 2
+OP_REMOVE = 3
+
+TYPES = ["Frenzy", "Conquest"]
+_TYPE_CODES = {t: i for i, t in enumerate(TYPES)}
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "layouts")
+
+class Layout:
+    __slots__ = ("anchors", "cooldowns", "records")
+
+    def __init__(self) -> None:
+        self.anchors: Dict[int, Anchor] = {}
+        # uid -> cooldown seconds remaining at load; expired ones are left out
+        self.cooldowns: Dict[int, float] = {}
+        self.records = 0
+
+class LayoutStore:
+    __slots__ = ("root", "_lock", "_compacting")
+
+    def __init__(self, root: str = DEFAULT_DIR) -> None:
+        self.root = root
+        # Held by appends and by the swap at the end of a background compaction.
+        self._lock = threading.Lock()
+        self._compacting: Dict[str, workers.Job] = {}
+
+    def path(self, map_id: str) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_.-]", "_", map_id) + ".pyl")
+
+    def _pack(self, op: int, a: Anchor, deadline: float = 0.0) -> bytes:
+        return _RECORD.pack(op, a.uid, a.x, a.y, a.z, _TYPE_CODES.get(a.type, 0), deadline)
+
+    def _write_records(self, f, anchors: List[Anchor], cooldowns: Dict[int, float], now: float) -> None:
+        f.write(_HEADER.pack(MAGIC, VERSION, _RECORD.size))
+        for a in anchors:
+            f.write(self._pack(OP_ADD, a))
+        for uid, left in cooldowns.items():
+            if left > 0.0:
+                f.write(_RECORD.pack(OP_COOLDOWN, uid, 0.0, 0.0, 0.0, 0, now + left))
+
+    def load(self, map_id: str) -> Optional[Layout]:
+        try:
+            with open(self.path(map_id), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        magic, version, size = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or size != _RECORD.size:
+            return None
+        layout = Layout()
+        now = time.time()
+        end = len(data) - (len(data) - _HEADER.size) % size
+        for off in range(_HEADER.size, end, size):
+            op, uid, x, y, z, code, cd = _RECORD.unpack_from(data, off)
+            layout.records += 1
+            if op == OP_ADD:
+                t = TYPES[code] if code < len(TYPES) else TYPES[0]
+                layout.anchors[uid] = Anchor(map_id, x, y, z, t, 0.0, uid)
+                layout.cooldowns.pop(uid, None)
+            elif op == OP_COOLDOWN:
+                # Generated anchors are never added, only their cooldowns are saved.
+                layout.cooldowns[uid] = cd - now
+            elif op == OP_REMOVE:
+                layout.anchors.pop(uid, None)
+                layout.cooldowns.pop(uid, None)
+        layout.cooldowns = {uid: left for uid, left in layout.cooldowns.items() if left > 0.0}
+        if end != len(data):
+            # A torn tail would misalign later appends: fix it before any are made.
+            self.write_all(map_id, list(layout.anchors.values()), layout.cooldowns)
+        elif layout.records > 2 * (len(layout.anchors) + len(layout.cooldowns)) + 16:
+            self._compact_later(map_id, list(layout.anchors.values()), dict(layout.cooldowns), end)
+        return layout
+
+    def _compact_later(self, map_id: str, anchors: List[Anchor], cooldowns: Dict[int, float], size: int) -> None:
+        job = self._compacting.get(map_id)
+        if job is not None and not job.finished:
+            return
+        # Skipped if the worker queue is full; the next load of this map tries again.
+        job = workers.submit(None, lambda: self._compact(map_id, anchors, cooldowns, size))
+        if job is not None:
+            self._compacting[map_id] = job
+
+    def _compact(self, map_id: str, anchors: List[Anchor], cooldowns: Dict[int, float], size: int) -> None:
+        path = self.path(map_id)
+        tmp = path + ".tmp"
+        now = time.time()
+        try:
+            with open(tmp, "wb") as f:
+                self._write_records(f, anchors, cooldowns, now)
+            with self._lock:
+                # Whole records appended since the load replay on top of the compacted ones.
+                with open(path, "rb") as old:
+                    old.seek(size)
+                    tail = old.read()
+                if tail:
+                    with open(tmp, "ab") as f:
+                        f.write(tail)
+                os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def wait(self) -> None:
+        # For benchmarks; the game never waits on a compaction.
+        for job in list(self._compacting.values()):
+            job.wait()
+
+    def write_all(self, map_id: str, anchors: List[Anchor], cooldowns: Optional[Dict[int, float]] = None) -> bool:
+        cooldowns = cooldowns or {}
+        path = self.path(map_id)
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, "wb") as f:
+                self._write_records(f, anchors, cooldowns, time.time())
+            os.replace(tmp, path)
+            return True
+        except OSError:
+            return False
+
+    def append(self, map_id: str, op: int, a: Anchor, cooldown: float = 0.0) -> bool:
+        """Append one record; ``cooldown`` is seconds from now, saved as a deadline."""
+        path = self.path(map_id)
+        try:
+            with self._lock:
+                if not os.path.exists(path):
+                    return self.write_all(map_id, [a] if op == OP_ADD else [],
+                                          {a.uid: cooldown} if op == OP_COOLDOWN else None)
+                with open(path, "ab") as f:
+                    f.write(self._pack(op, a, time.time() + cooldown if op == OP_COOLDOWN else 0.0))
+            return True
+        except OSError:
+            return False
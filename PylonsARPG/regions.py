@@ -0,0 +1,114 @@
+"""
+Procedural anchor placement, streamed by world region.
+
+A map is cut into square XY regions of ``REGION_SIZE``. The anchors of a region
+come from a ``random.Random`` seeded with the map ID and the region coordinates,
+so a region always regenerates the same placements and nothing about them has
+to be saved. Regions are generated as the player approaches (a few per pass,
+nearest first) and the least recently visited ones are evicted past
+``MAX_REGIONS``. Anchor uids are derived from the region too, so cooldowns kept
+by uid outside the streamer still apply when an evicted region comes back.
+"""
+import random
+import zlib
+from collections import OrderedDict
+from typing import List, Sequence, Tuple
+
+from .spatial import Anchor, AnchorGrid
+
+REGION_SIZE = 10000.0
+# Regions kept around the player's own region (1 -> the surrounding 3x3).
+RADIUS = 1
+# Enough for four split-screen players' 3x3 neighbourhoods, with some slack.
+MAX_REGIONS = 40
+# Regions generated per update, so entering a map never builds everything at once.
+PER_UPDATE = 2
+# Anchors keep this far from region edges, so neighbours do not overlap.
+MARGIN = 1000.0
+
+# Generated anchors carry this bit in their uid; saved (dropped) anchors never do.
+GENERATED = 1 << 31
+
+def region_of(x: float, y: float) -> Tuple[int, int]:
+    return (int(x // REGION_SIZE), int(y // REGION_SIZE))
+
+def region_uid(rx: int, ry: int, slot: int) -> int:
+    # 12 bits per axis covers +-20M units at the default region size.
+    return GENERATED | ((rx & 0xFFF) << 14) | ((ry & 0xFFF) << 2) | (slot & 0x3)
+
+def seed_for(map_id: str, rx: int, ry: int) -> int:
+    return zlib.crc32(f"{map_id}:{rx}:{ry}".encode())
+
+def generate(map_id: str, rx: int, ry: int, count: int, pool: Sequence[str], z: float) -> List[Anchor]:
+    """The anchors of one region; the same map/region/count/pool always gives the same XY and types."""
+    rng = random.Random(seed_for(map_id, rx, ry))
+    x0, y0 = rx * REGION_SIZE, ry * REGION_SIZE
+    out = []
+    for slot in range(count):
+        x = x0 + rng.uniform(MARGIN, REGION_SIZE - MARGIN)
+        y = y0 + rng.uniform(MARGIN, REGION_SIZE - MARGIN)
+        # No terrain access; anchors sit at the height the player was at when the region streamed in.
+        out.append(Anchor(map_id, x, y, z, rng.choice(pool), 0.0, region_uid(rx, ry, slot)))
+    return out
+
+class RegionStreamer:
+    __slots__ = ("map_id", "grid", "loaded", "current", "complete")
+
+    def __init__(self, map_id: str, grid: AnchorGrid) -> None:
+        self.map_id = map_id
+        self.grid = grid
+        # region -> its anchors, least recently visited first
+        self.loaded: "OrderedDict[Tuple[int, int], List[Anchor]]" = OrderedDict()
+        self.current: Tuple[int, int] = (0, 0)
+        # True once every region around ``current`` is loaded; until then each update builds more.
+        self.complete = False
+
+    def wanted(self, x: float, y: float) -> List[Tuple[int, int]]:
+        cx, cy = region_of(x, y)
+        around = [(cx + dx, cy + dy) for dx in range(-RADIUS, RADIUS + 1) for dy in range(-RADIUS, RADIUS + 1)]
+        around.sort(key=lambda r: (r[0] - cx) ** 2 + (r[1] - cy) ** 2)
+        return around
+
+    def update(self, x: float, y: float, z: float, count: int, pool: Sequence[str]) -> Tuple[List[Anchor], List[Anchor]]:
+        """Stream regions around (x, y); returns (generated, evicted) anchors."""
+        generated: List[Anchor] = []
+        evicted: List[Anchor] = []
+        region = region_of(x, y)
+        if region == self.current and self.complete:
+            return generated, evicted
+        self.current = region
+        wanted = self.wanted(x, y)
+        built = 0
+        for r in wanted:
+            if r in self.loaded:
+                self.loaded.move_to_end(r)
+                continue
+            if built >= PER_UPDATE:
+                continue
+            anchors = generate(self.map_id, r[0], r[1], count, pool, z)
+            for a in anchors:
+                self.grid.insert(a)
+            self.loaded[r] = anchors
+            generated.extend(anchors)
+            built += 1
+        self.complete = built < PER_UPDATE or all(r in self.loaded for r in wanted)
+        keep = set(wanted)
+        while len(self.loaded) > MAX_REGIONS:
+            r = next(iter(self.loaded))
+            if r in keep:
+                break
+            for a in self.loaded.pop(r):
+                self.grid.remove(a)
+                evicted.append(a)
+        return generated, evicted
+
+    def clear(self) -> List[Anchor]:
+        """Drop every generated region; returns the anchors removed from the grid."""
+        removed: List[Anchor] = []
+        for anchors in self.loaded.values():
+            for a in anchors:
+                self.grid.remove(a)
+            removed.extend(anchors)
+        self.loaded.clear()
+        self.complete = False
+        return removed
@@ -0,0 +1,93 @@
+"""
+Debug rendering for pylon anchors.
+
+Debug spheres live for ``LIFETIME`` seconds, so a pass is only issued once per
+lifetime rather than every frame. A pass draws the anchors of the current map
+that are within the draw distance (grid query, so far cells are never visited)
+and roughly inside the camera's view cone, with fewer sphere segments the
+further away an anchor is.
+"""
+import math
+from typing import Any, List, Optional, Set, Tuple
+
+import unrealsdk
+
+from .spatial import Anchor, AnchorGrid
+
+LIFETIME = 0.1
+RADIUS = 50.0
+COLOR = (0, 255, 255, 255)
+# (max distance, segments); anything beyond the last band uses the last count.
+LOD = [(2000.0, 12), (5000.0, 8), (float("inf"), 4)]
+# Extra half-angle on top of the camera FOV, so spheres at the screen edge do not pop.
+CONE_MARGIN_DEG = 10.0
+
+next_draw: float = 0.0
+# Spheres issued by the last pass and over the whole session, for benchmarks.
+last_draws: int = 0
+total_draws: int = 0
+passes: int = 0
+
+def reset() -> None:
+    global next_draw, last_draws, total_draws, passes
+    next_draw = 0.0
+    last_draws = total_draws = passes = 0
+
+def due(now: float) -> bool:
+    # World time restarts on map travel; a deadline too far ahead means the clock went back.
+    return now >= next_draw or now < next_draw - LIFETIME
+
+def _segments(d2: float) -> int:
+    for limit, segs in LOD:
+        if d2 <= limit * limit:
+            return segs
+    return LOD[-1][1]
+
+def _view_cone(camera: Any) -> Optional[Tuple[float, float, float, float, float, float, float]]:
+    """Camera location, forward vector and cos(half-angle), or None to skip culling."""
+    try:
+        loc = camera.GetCameraLocation()
+        rot = camera.GetCameraRotation()
+        fov = float(camera.GetFOVAngle())
+    except Exception:
+        return None
+    pitch, yaw = math.radians(float(rot.Pitch)), math.radians(float(rot.Yaw))
+    cp = math.cos(pitch)
+    half = math.radians(min(fov * 0.5 + CONE_MARGIN_DEG, 89.0))
+    return (float(loc.X), float(loc.Y), float(loc.Z),
+            cp * math.cos(yaw), cp * math.sin(yaw), math.sin(pitch), math.cos(half))
+
+def draw(grid: AnchorGrid, mapname: str, viewers: List[Tuple[Tuple[float, float, float], Any]],
+         draw_distance: float, now: float) -> int:
+    """
+    Issue one render pass for every local player's (position, camera); call when
+    ``due(now)``. An anchor seen by two split-screen players is drawn once.
+    Returns the spheres drawn.
+    """
+    global next_draw, last_draws, total_draws, passes
+    next_draw = now + LIFETIME
+    drawn: Set[Anchor] = set()
+    for me, camera in viewers:
+        cone = _view_cone(camera) if camera else None
+        for a, d2 in grid.query(me[0], me[1], me[2], draw_distance):
+            if a.map != mapname or a in drawn:
+                continue
+            if cone is not None:
+                cx, cy, cz, fx, fy, fz, cos_half = cone
+                vx, vy, vz = a.x - cx, a.y - cy, a.z - cz
+                dot = vx*fx + vy*fy + vz*fz
+                # Inside the cone iff dot >= |v| * cos(half); compared squared to avoid the sqrt.
+                v2 = vx*vx + vy*vy + vz*vz
+                # Anchors right next to the camera are kept even when off-axis.
+                if (dot < 0.0 or dot * dot < v2 * cos_half * cos_half) and v2 > (4.0 * RADIUS) ** 2:
+                    continue
+            try:
+                unrealsdk.DrawDebugSphere(a.pos, RADIUS, _segments(d2), COLOR, False, LIFETIME)
+            except Exception:
+                break
+            drawn.add(a)
+    n = len(drawn)
+    passes += 1
+    last_draws = n
+    total_draws += n
+    return n
@@ -0,0 +1,132 @@
+"""
+Per-map uniform-grid index for pylon anchors.
+
+Anchors are bucketed into square XY cells; a radius query only visits the cells
+overlapping the query circle and compares squared distances, so lookup cost
+depends on local density rather than on how many anchors the map holds.
+
+``Proximity`` turns successive player positions into enter/exit events with an
+inner (enter) and outer (exit) radius, so standing on the boundary does not
+flap.
+"""
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CELL_SIZE = 2000.0
+
+class Anchor:
+    __slots__ = ("map", "x", "y", "z", "type", "cooldown_until", "uid")
+
+    def __init__(self, map: str, x: float, y: float, z: float, type: str, cooldown_until: float = 0.0, uid: int = -1) -> None:
+        self.map = map
+        self.uid = uid
+        self.x = x
+        self.y = y
+        self.z = z
+        self.type = type
+        self.cooldown_until = cooldown_until
+
+    @property
+    def pos(self) -> Tuple[float, float, float]:
+        return (self.x, self.y, self.z)
+
+    def dist_sq(self, x: float, y: float, z: float) -> float:
+        dx, dy, dz = self.x - x, self.y - y, self.z - z
+        return dx*dx + dy*dy + dz*dz
+
+class AnchorGrid:
+    __slots__ = ("cell", "cells", "count")
+
+    def __init__(self, cell: float = CELL_SIZE) -> None:
+        self.cell = cell
+        self.cells: Dict[Tuple[int, int], List[Anchor]] = {}
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Anchor]:
+        for bucket in self.cells.values():
+            yield from bucket
+
+    def _key(self, x: float, y: float) -> Tuple[int, int]:
+        return (int(x // self.cell), int(y // self.cell))
+
+    def insert(self, anchor: Anchor) -> None:
+        self.cells.setdefault(self._key(anchor.x, anchor.y), []).append(anchor)
+        self.count += 1
+
+    def remove(self, anchor: Anchor) -> bool:
+        key = self._key(anchor.x, anchor.y)
+        bucket = self.cells.get(key)
+        if not bucket or anchor not in bucket:
+            return False
+        bucket.remove(anchor)
+        if not bucket:
+            del self.cells[key]
+        self.count -= 1
+        return True
+
+    def query(self, x: float, y: float, z: float, radius: float) -> Iterator[Tuple[Anchor, float]]:
+        r2 = radius * radius
+        cx0, cy0 = self._key(x - radius, y - radius)
+        cx1, cy1 = self._key(x + radius, y + radius)
+        cells = self.cells
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                bucket = cells.get((cx, cy))
+                if not bucket:
+                    continue
+                for a in bucket:
+                    d2 = a.dist_sq(x, y, z)
+                    if d2 <= r2:
+                        yield a, d2
+
+    def nearest(self, x: float, y: float, z: float, within: float) -> Tuple[Optional[Anchor], float]:
+        best = None
+        best_d2 = within * within
+        for a, d2 in self.query(x, y, z, within):
+            if d2 <= best_d2:
+                best, best_d2 = a, d2
+        return best, best_d2
+
+class Proximity:
+    __slots__ = ("inner", "outer", "near")
+
+    def __init__(self, inner: float, outer: float) -> None:
+        self.inner = inner
+        self.outer = max(outer, inner)
+        # Anchors currently in range -> squared distance at the last update.
+        self.near: Dict[Anchor, float] = {}
+
+    def reset(self) -> None:
+        self.near = {}
+
+    def forget(self, anchors: List[Anchor]) -> None:
+        """Drop anchors that left the grid; the rest stay in range without a second enter."""
+        for a in anchors:
+            self.near.pop(a, None)
+
+    def update(self, grid: AnchorGrid, x: float, y: float, z: float) -> Tuple[List[Anchor], List[Anchor]]:
+        """Move the player to (x, y, z); returns (entered, exited)."""
+        near = self.near
+        inner2 = self.inner * self.inner
+        now_near: Dict[Anchor, float] = {}
+        entered: List[Anchor] = []
+        for a, d2 in grid.query(x, y, z, self.outer):
+            if a in near:
+                now_near[a] = d2
+            elif d2 <= inner2:
+                now_near[a] = d2
+                entered.append(a)
+        exited = [a for a in near if a not in now_near] if len(now_near) - len(entered) != len(near) else []
+        self.near = now_near
+        return entered, exited
+
+    def nearest(self) -> Tuple[Optional[Anchor], float]:
+        """Closest anchor within the inner (enter) radius; the hysteresis band only keeps hints quiet."""
+        best, best_d2 = None, 0.0
+        inner2 = self.inner * self.inner
+        for a, d2 in self.near.items():
+            if d2 <= inner2 and (best is None or d2 < best_d2):
+                best, best_d2 = a, d2
+        return best, best_d2
@@ -1,138 +1,195 @@
 from typing import Any, Dict
-import random
-from mods_base import hook, build_mod, SliderOption, keybind
-from unrealsdk.hooks import Type
-from unrealsdk.unreal import UObject, WrappedStruct
-import unrealsdk
+from mods_base import build_mod, SliderOption, BoolOption, keybind
 
+from arpg_core import attributes, bases, buffs, context, hud, kills, modifiers, telemetry, workers
+from arpg_core.profiling import profiled
+from arpg_core.session import Saved, Session
+from arpg_core.trace import traced
+from . import loot
 
-def _hud(title: str, msg: str) -> None:
-    try:
-        from ui_utils import show_hud_message
-        show_hud_message(title, msg)
-    except Exception:
-        pass
+def _on_drop_chance_change(_: Any, value: int) -> None:
+    # Geometric gaps are memoryless, so redrawing with the new odds is exact.
+    global _kills_to_drop
+    if _kills_to_drop is not None:
+        _kills_to_drop = loot.kills_until_drop(LOOT.rng, int(value))
 
-DropChance: SliderOption = SliderOption("Uber Unique Drop Chance (1/n)", 1000, 100, 5000, 100, True)
+DropChance: SliderOption = SliderOption("Uber Unique Drop Chance (1/n)", 1000, 100, 5000, 100, True, on_change=_on_drop_chance_change)
+SkipAhead: BoolOption = BoolOption("Skip-Ahead Drop Rolls", True, "On", "Off")
 
-_attr_bases: Dict[str, float] = {}
-_active: Dict[str, Any] | None = None
+class _PlayerState:
+    __slots__ = ("ctx", "active")
 
-ATTR_DMG_REDUCTION = "/Game/GameData/Attributes/Character/Att_Character_DamageReduction"
-ATTR_PROJ_PER_SHOT = "/Game/GameData/Attributes/Weapon/Att_Weapon_ProjectilesPerShot"
-ATTR_AS_CDR       = "/Game/GameData/Attributes/ActionSkill/Att_ActionSkill_CooldownRate"
-ATTR_SPLASH_D     = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashDamageScale"
-ATTR_SPLASH_R     = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashRadiusScale"
+    def __init__(self, ctx: context.PlayerContext) -> None:
+        self.ctx = ctx
+        self.active: loot.UberDef | None = None
 
-_attr_defs: Dict[str, Any] = {}
+# Kills left until the next drop when SkipAhead is on; drawn lazily.
+_kills_to_drop: int | None = None
 
-def _find_attr(path: str):
-    if path in _attr_defs:
-        return _attr_defs[path]
-    obj = unrealsdk.FindObject("AttributeDefinition", path)
-    _attr_defs[path] = obj
-    return obj
+_MOD = "UberUniques"
 
-def _cache_base(target, path: str) -> None:
-    if path in _attr_bases:
-        return
-    attr = _find_attr(path)
-    if attr and target:
-        try:
-            _attr_bases[path] = float(target.GetAttributeBaseValue(attr))
-        except Exception:
-            _attr_bases[path] = 1.0
+# One sample per drop, valued with the receiving player's index.
+_drops = telemetry.ring("UberUniques.drops", telemetry.EVENT, 64)
 
-def _apply_attr_scaled(target, path: str, mult: float) -> None:
-    attr = _find_attr(path)
-    if not attr or not target:
-        return
-    _cache_base(target, path)
-    base = _attr_bases.get(path, 1.0)
-    try:
-        target.SetAttributeBaseValue(attr, base * mult)
-    except Exception:
-        pass
+def _mod_name(st: _PlayerState) -> str:
+    return _MOD if st.ctx.index == 0 else f"{_MOD}#{st.ctx.index}"
 
 def _restore_attrs() -> None:
+    for st in _session.states.values():
+        modifiers.clear(_mod_name(st))
+    modifiers.flush()
+
+def _claim(st: _PlayerState, saved: Saved) -> None:
+    # The player's active uber, saved by name.
+    e = saved.get("active")
+    if e is not None and st.active is None:
+        st.active = _tables().items.get(e.text)
+
+# One state per local player, keyed by controller; each player holds at most one uber.
+_session: Session[_PlayerState] = Session(_MOD, _PlayerState, _claim)
+
+def _sync_players() -> Dict[Any, _PlayerState]:
+    # New controller (travel/respawn) or split-screen join: the uber moves with its player.
+    states = _session.sync()
+    for st in states.values():
+        if st.active is not None:
+            PLANS[st.active.name].apply(_mod_name(st), st.ctx, 1)
+    return states
+
+def _grant_skill_points(pc, count: int) -> None:
     try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        tgt = pc if pc else None
-        for path, base in _attr_bases.items():
-            attr = _find_attr(path)
-            if attr and tgt:
-                try:
-                    tgt.SetAttributeBaseValue(attr, base)
-                except Exception:
-                    pass
-    except Exception:
-        pass
-
-
-def _apply_aegis() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    tgt = pc if pc else None
-    _apply_attr_scaled(tgt, ATTR_DMG_REDUCTION, 0.5)
-
-def _apply_multishot() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    tgt = pc if pc else None
-    _apply_attr_scaled(tgt, ATTR_PROJ_PER_SHOT, 3.0)
-
-def _apply_splash() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    tgt = pc if pc else None
-    _apply_attr_scaled(tgt, ATTR_SPLASH_D, 4.0)
-    _apply_attr_scaled(tgt, ATTR_SPLASH_R, 2.0)
-
-def _apply_skillpoints() -> None:
-    pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-    try:
-        pc.AddSkillPoints(10)
+        pc.AddSkillPoints(count)
     except Exception:
         try:
-            pc.SkillPoints += 10
+            pc.SkillPoints += count
         except Exception:
             pass
 
-UBERS = [
-    {"name": "Aegis of the Ancients", "desc": "50% damage taken", "apply": _apply_aegis},
-    {"name": "Echoing Volumes", "desc": "+200% projectiles per shot", "apply": _apply_multishot},
-    {"name": "Nova Catalyst", "desc": "+300% splash dmg", "apply": _apply_splash},
-    {"name": "Paragon Talisman", "desc": "+10 skill points", "apply": _apply_skillpoints},
-]
-
-
-def _grant_uber(item: Dict[str, Any]) -> None:
-    global _active
-    _restore_attrs()
-    _active = item
-    item["apply"]()
-    _hud("Uber Unique", f"{item['name']} acquired — {item['desc']}")
-
-def _roll_drop() -> None:
-    if int(DropChance.value) <= 0:
+# ubers.json is parsed on a worker once the mod is enabled, not on import;
+# whatever needs the tables before that finishes (the first kill, a restored
+# uber) takes the result from _tables(), which parses inline if there is none.
+LOOT: loot.LootTables | None = None
+_loot_job: workers.Job | None = None
+
+def _compile_plans(tables: loot.LootTables) -> Dict[str, buffs.BuffPlan]:
+    # One on/off plan per item, built when the tables load rather than on every grant.
+    plans = {}
+    for item in tables.items.values():
+        plan = buffs.BuffPlan(2)
+        for attr, mult in item.modifiers:
+            plan.add(buffs.CONTROLLER, attr, (1.0, mult))
+            attributes.register([attr])
+        plans[item.name] = plan
+    return plans
+
+PLANS: Dict[str, buffs.BuffPlan] = {}
+
+def _load_tables() -> None:
+    global _loot_job
+    if LOOT is None and (_loot_job is None or _loot_job.cancelled):
+        _loot_job = workers.submit(_MOD, loot.load, _install)
+
+def _install(tables: loot.LootTables) -> None:
+    global LOOT, PLANS, _loot_job
+    if LOOT is not None:
         return
-    if random.randint(1, int(DropChance.value)) == 1:
-        item = random.choice(UBERS)
-        _grant_uber(item)
-
-@hook("/Script/OakGame.OakCharacter:Died", Type.POST)
-def _on_died(obj: UObject, args: WrappedStruct, *_: Any) -> None:
+    _loot_job = None
+    LOOT = tables
+    PLANS = _compile_plans(tables)
+    # Only the uber paths are new here; everything else was resolved on enable.
+    attributes.preload()
+
+def _tables() -> loot.LootTables:
+    if LOOT is None:
+        job = _loot_job
+        tables = None
+        if job is not None and not job.cancelled:
+            try:
+                tables = job.result()
+            except Exception:
+                tables = None
+        _install(tables or loot.load())
+    return LOOT
+
+def _grant_uber(item: loot.UberDef, ctx: context.PlayerContext) -> None:
+    st = context.state_for(_session.states, ctx, _sync_players)
+    if st is None:
+        return
+    name = _mod_name(st)
+    modifiers.clear(name)
+    st.active = item
+    _session.journal.set(ctx.index, "active", text=item.name)
+    PLANS[item.name].apply(name, ctx, 1)
+    if item.skill_points:
+        _grant_skill_points(ctx.controller, item.skill_points)
+    telemetry.record(_drops, ctx.world_time(), ctx.index)
+    who = "" if ctx.index == 0 else f"P{ctx.index + 1}: "
+    hud.show("Uber Unique", f"{who}{item.name} acquired — {item.desc}", priority=True)
+
+def _enemy_class(victim) -> str | None:
     try:
-        pc = unrealsdk.GetEngine().GamePlayers[0].Actor
-        is_hostile = pc.GetTeamComponent().IsHostile if pc else None
-        if is_hostile is None or is_hostile(obj):
-            _roll_drop()
+        return str(victim.Class.Name)
     except Exception:
-        pass
-    return
+        return None
+
+def _roll_drop(kill: kills.Kill) -> None:
+    if int(DropChance.value) <= 0:
+        return
+    if LOOT.rng.randint(1, int(DropChance.value)) == 1:
+        _grant_uber(LOOT.roll(_enemy_class(kill.victim)), kill.player)
+
+@profiled("UberUniques._on_kills")
+def _on_kills(batch: kills.KillBatch) -> None:
+    # The drop goes to whoever landed the kill it fell on.
+    global _kills_to_drop
+    if LOOT is None:
+        _tables()
+    if not SkipAhead.value:
+        for kill in batch:
+            _roll_drop(kill)
+        return
+    one_in = int(DropChance.value)
+    if one_in <= 0:
+        return
+    if _kills_to_drop is None:
+        _kills_to_drop = loot.kills_until_drop(LOOT.rng, one_in)
+    left = len(batch)
+    while _kills_to_drop <= left:
+        left -= _kills_to_drop
+        kill = batch[len(batch) - left - 1]
+        _grant_uber(LOOT.roll(_enemy_class(kill.victim)), kill.player)
+        _kills_to_drop = loot.kills_until_drop(LOOT.rng, one_in)
+    _kills_to_drop -= left
 
 @keybind("Clear Uber Unique")
+@traced
+@profiled("UberUniques._kb_clear")
 def _kb_clear() -> None:
-    global _active
-    _active = None
     _restore_attrs()
-    _hud("Uber Unique", "Cleared")
+    _drop_all()
+    hud.show("Uber Unique", "Cleared", priority=True)
+
+context.on_change("UberUniques", _sync_players)
+
+def _drop_all() -> None:
+    for st in _session.states.values():
+        st.active = None
+        _session.journal.delete(st.ctx.index, "active")
+
+def _on_enable() -> None:
+    _session.enabled = True
+    _load_tables()
+    attributes.preload()
+    bases.restore()
+    _session.load_journal()
+    _sync_players()
+    kills.subscribe(_MOD, _on_kills)
+
+def _on_disable() -> None:
+    _session.enabled = False
+    workers.cancel(_MOD)
+    kills.unsubscribe(_MOD)
+    _restore_attrs()
+    _drop_all()
 
-build_mod()
+build_mod(on_enable=_on_enable, on_disable=_on_disable)
@@ -0,0 +1,115 @@
+"""
+Data-driven uber loot tables.
+
+Item definitions and per-enemy-class tables are read from ``ubers.json``. Each
+table is compiled into a Vose alias table, so a roll is one random draw and two
+list lookups regardless of how many items the table holds.
+"""
+import json
+import math
+import os
+import random
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ubers.json")
+DEFAULT_TABLE = "default"
+
+class UberDef:
+    __slots__ = ("name", "desc", "weight", "rarity", "modifiers", "skill_points")
+
+    def __init__(self, name: str, desc: str, weight: float, rarity: str,
+                 modifiers: Tuple[Tuple[str, float], ...] = (), skill_points: int = 0) -> None:
+        self.name = name
+        self.desc = desc
+        self.weight = weight
+        self.rarity = rarity
+        self.modifiers = modifiers
+        self.skill_points = skill_points
+
+class AliasTable:
+    __slots__ = ("items", "prob", "alias")
+
+    def __init__(self, items: Sequence[Any], weights: Sequence[float]) -> None:
+        pairs = [(it, float(w)) for it, w in zip(items, weights) if w > 0]
+        if not pairs:
+            raise ValueError("loot table needs at least one positive weight")
+        self.items = [it for it, _ in pairs]
+        n = len(pairs)
+        total = sum(w for _, w in pairs)
+        scaled = [w * n / total for _, w in pairs]
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] += scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def sample(self, rng: random.Random) -> Any:
+        u = rng.random() * len(self.items)
+        i = int(u)
+        return self.items[i] if (u - i) < self.prob[i] else self.items[self.alias[i]]
+
+class LootTables:
+    __slots__ = ("items", "tables", "rng")
+
+    def __init__(self, items: Dict[str, UberDef], tables: Dict[str, AliasTable], rng: Optional[random.Random] = None) -> None:
+        self.items = items
+        self.tables = tables
+        self.rng = rng or random.Random()
+
+    def seed(self, value: Any) -> None:
+        self.rng.seed(value)
+
+    def table_for(self, enemy_class: Optional[str]) -> AliasTable:
+        if enemy_class:
+            table = self.tables.get(enemy_class)
+            if table is not None:
+                return table
+        return self.tables[DEFAULT_TABLE]
+
+    def roll(self, enemy_class: Optional[str] = None) -> UberDef:
+        return self.table_for(enemy_class).sample(self.rng)
+
+def kills_until_drop(rng: random.Random, one_in: int) -> int:
+    # Geometric draw: number of kills up to and including the next 1/one_in success.
+    if one_in <= 1:
+        return 1
+    u = 1.0 - rng.random()
+    return int(math.log(u) / math.log1p(-1.0 / one_in)) + 1
+
+def _parse_item(raw: Dict[str, Any]) -> UberDef:
+    mods = tuple((str(attr), float(mult)) for attr, mult in raw.get("modifiers", ()))
+    return UberDef(
+        str(raw["name"]),
+        str(raw.get("desc", "")),
+        float(raw.get("weight", 1.0)),
+        str(raw.get("rarity", "Uber")),
+        mods,
+        int(raw.get("skill_points", 0)),
+    )
+
+def parse(data: Dict[str, Any], rng: Optional[random.Random] = None) -> LootTables:
+    items = {d.name: d for d in (_parse_item(raw) for raw in data.get("items", ()))}
+    if not items:
+        raise ValueError("no uber definitions")
+    raw_tables: Dict[str, List[str]] = dict(data.get("tables", {}))
+    raw_tables.setdefault(DEFAULT_TABLE, list(items))
+    tables: Dict[str, AliasTable] = {}
+    for key, names in raw_tables.items():
+        defs = [items[n] for n in names if n in items]
+        if defs:
+            tables[key] = AliasTable(defs, [d.weight for d in defs])
+    if DEFAULT_TABLE not in tables:
+        tables[DEFAULT_TABLE] = AliasTable(list(items.values()), [d.weight for d in items.values()])
+    return LootTables(items, tables, rng)
+
+def load(path: str = DATA_FILE, rng: Optional[random.Random] = None) -> LootTables:
+    with open(path, "r", encoding="utf-8") as f:
+        return parse(json.load(f), rng)
@@ -0,0 +1,63 @@
+"""Shared runtime used by KillStackHaste, PylonsARPG and UberUniques."""
+from typing import Any
+from mods_base import build_mod, BoolOption, SliderOption, keybind
+
+# trace, telemetry and workers are not imported lazily: the mods need them at load
+# (traced) or from enable on (telemetry rings, the loot parse); see bench_startup.
+from . import attributes, context, hud, profiling, telemetry, trace, workers
+
+def _on_profile_change(_: Any, value: bool) -> None:
+    profiling.set_enabled(value)
+
+def _on_trace_change(_: Any, value: bool) -> None:
+    if value:
+        out = trace.start()
+        hud.show("Hook Trace", f"Recording to {out}", priority=True)
+    else:
+        out = trace.stop()
+        if out:
+            hud.show("Hook Trace", f"{trace.records} events saved to {out}", priority=True)
+
+def _on_telemetry_change(_: Any, value: bool) -> None:
+    telemetry.enabled = bool(value)
+
+def _on_hud_rate_change(_: Any, value: int) -> None:
+    hud.set_rate(value)
+
+HUDRate: SliderOption = SliderOption("HUD Messages Per Second (max)", 4, 1, 10, 1, True, on_change=_on_hud_rate_change)
+ProfileHooks: BoolOption = BoolOption("Profile Hooks (latency histograms)", False, "On", "Off", on_change=_on_profile_change)
+Telemetry: BoolOption = BoolOption("Gameplay Telemetry (kill rate, stack and buff uptime)", True, "On", "Off", on_change=_on_telemetry_change)
+RecordTrace: BoolOption = BoolOption("Record Hook Trace (for offline replay)", False, "On", "Off", on_change=_on_trace_change)
+
+@keybind("ARPG: Dump Hook Profile")
+def _kb_dump_profile() -> None:
+    profiling.dump(lambda title, msg: hud.show(title, msg, priority=True), background=True)
+    hud.show("Attributes", attributes.report(), priority=True)
+    hud.show("Workers", workers.report(), priority=True)
+
+@keybind("ARPG: Export Telemetry CSV")
+def _kb_export_telemetry() -> None:
+    # The snapshot is copied out of the rings here; the file is written on a worker.
+    now = context.world_time()
+    text = telemetry.snapshot(now)
+    if workers.submit(None, lambda: telemetry.write_csv(text)) is None:
+        telemetry.write_csv(text)
+    rows = telemetry.summary(now)
+    shown = [f"{name}: {value:.1f}" for name, value in rows if not name.endswith(" total")]
+    hud.show("Telemetry", "\n".join(shown[:4]) if shown else "No samples yet", priority=True)
+
+@keybind("ARPG: Reset Hook Profile")
+def _kb_reset_profile() -> None:
+    profiling.reset()
+    hud.show("Hook Profile", "Reset", priority=True)
+
+def _on_enable() -> None:
+    hud.set_rate(HUDRate.value)
+    telemetry.enabled = bool(Telemetry.value)
+    profiling.set_enabled(ProfileHooks.value)
+
+def _on_disable() -> None:
+    profiling.set_enabled(False)
+    trace.stop()
+
+build_mod(on_enable=_on_enable, on_disable=_on_disable)
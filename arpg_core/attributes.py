@@ -0,0 +1,92 @@
+"""
+Shared AttributeDefinition registry.
+
+Mods declare the attribute paths they use (and fallback groups, where only one
+of several candidate paths exists in a given build) and the registry resolves
+them in one batch when a mod is enabled. Hits and misses are both cached, so a
+path that does not exist is looked up once, not on every apply. The cache is
+dropped and re-resolved only on a map change or an explicit ``reload()``.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import unrealsdk
+
+from .profiling import count_error
+
+# Weapon attributes buffed by more than one mod.
+RELOAD_SPEED  = "/Game/GameData/Attributes/Weapon/Att_Weapon_ReloadSpeedScale"
+FIRE_RATE     = "/Game/GameData/Attributes/Weapon/Att_Weapon_FireRateScale"
+SPLASH_DAMAGE = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashDamageScale"
+SPLASH_RADIUS = "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashRadiusScale"
+
+_defs: Dict[str, Any] = {}
+# Every path any mod has declared or asked for; reload() resolves all of them again.
+_known: Dict[str, None] = {}
+_groups: Dict[str, List[str]] = {}
+_chosen: Dict[str, Optional[str]] = {}
+_listeners: Dict[str, Callable[[], None]] = {}
+
+lookups: int = 0
+saved: int = 0
+
+def _lookup(path: str) -> Any:
+    global lookups
+    lookups += 1
+    try:
+        obj = unrealsdk.FindObject("AttributeDefinition", path)
+    except Exception:
+        obj = None
+    _defs[path] = obj
+    return obj
+
+def register(paths: Iterable[str]) -> None:
+    for path in paths:
+        _known[path] = None
+
+def register_group(name: str, candidates: Iterable[str]) -> None:
+    _groups[name] = list(candidates)
+    register(_groups[name])
+    _chosen.pop(name, None)
+
+def preload() -> int:
+    """Resolve every declared path not resolved yet; returns the number looked up."""
+    before = lookups
+    for path in _known:
+        if path not in _defs:
+            _lookup(path)
+    return lookups - before
+
+def get(path: str) -> Any:
+    """The AttributeDefinition for ``path``, or None if it does not exist."""
+    global saved
+    if path in _defs:
+        saved += 1
+        return _defs[path]
+    _known[path] = None
+    return _lookup(path)
+
+def group(name: str) -> Optional[str]:
+    """First candidate path of group ``name`` that exists, or None."""
+    if name in _chosen:
+        return _chosen[name]
+    chosen = next((p for p in _groups.get(name, ()) if get(p) is not None), None)
+    _chosen[name] = chosen
+    return chosen
+
+def reload() -> None:
+    # Map change or asset reload: definitions may have been replaced.
+    _defs.clear()
+    _chosen.clear()
+    preload()
+    for key, fn in list(_listeners.items()):
+        try:
+            fn()
+        except Exception:
+            count_error(f"{key}.on_attributes_reload")
+
+def on_reload(key: str, fn: Callable[[], None]) -> None:
+    # For mods that compiled a resolved group path into their state.
+    _listeners[key] = fn
+
+def report() -> str:
+    missing = sum(1 for v in _defs.values() if v is None)
+    return f"attributes: {len(_defs) - missing} resolved, {missing} missing, {lookups} lookups, {saved} saved"
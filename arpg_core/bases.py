@@ -0,0 +1,59 @@
+"""
+True attribute base values, journaled.
+
+The modifier registry knows each buffed attribute's true base only in memory. If
+the game or the mods go down while a buff is written, the buffed value stays on
+the character and the next session would snapshot it as the base. Every base
+the registry snapshots on a local player's controller, pawn or movement
+component is therefore journaled, and dropped again once it has been written
+back. ``restore()`` runs from each mod's ``on_enable`` before it reapplies
+anything: journaled bases are written back to objects that still exist, so the
+buffs reapplied after it compose against the true values.
+"""
+from typing import Any, Optional
+
+from . import context, modifiers
+from .journal import Journal
+
+_journal = Journal("arpg_core.bases")
+_started: bool = False
+restored: int = 0
+
+_ROLES = ("controller", "pawn", "movement")
+
+def _role_of(target: Any) -> Optional[tuple]:
+    for p in context._players:
+        for role, obj in zip(_ROLES, (p.controller, p.pawn, p.movement)):
+            if obj is not None and obj is target:
+                return p.index, role
+    return None
+
+def _on_base(target: Any, attr: str, base: Optional[float]) -> None:
+    # Called by the registry when a slot is created or retired; both are rare.
+    who = _role_of(target)
+    if who is None:
+        return
+    key = f"{who[1]}:{attr}"
+    if base is None:
+        _journal.delete(who[0], key)
+    else:
+        _journal.set(who[0], key, base)
+
+def restore() -> int:
+    """Write back bases left by the last session, then start journaling. Runs once."""
+    global _started, restored
+    if _started:
+        return 0
+    _started = True
+    entries = dict(_journal.load())
+    players = context.players() if entries else []
+    for (index, key), e in entries.items():
+        role, _, attr = key.partition(":")
+        p = players[index] if index < len(players) else None
+        target = getattr(p, role, None) if role in _ROLES else None
+        # Objects that no longer exist were rebuilt by the game with their true values.
+        if target is not None and modifiers.restore_base(target, attr, e.value):
+            restored += 1
+        _journal.delete(index, key)
+    modifiers.watch(_on_base)
+    return restored
@@ -0,0 +1,57 @@
+"""
+Compiled buff plans.
+
+A plan is the flat list of (target, attribute, value per level) a mod applies,
+worked out once from its options. The per-frame path is then a table lookup by
+level (stack count, or 1 for an on/off buff) instead of re-reading options and
+re-evaluating formulas. Mods rebuild their plan from option ``on_change``
+callbacks; disabled effects stay in the plan with neutral values, so switching
+one off removes its modifier on the next apply.
+"""
+from typing import Any, List, Sequence, Tuple
+
+from . import modifiers
+
+# Which PlayerContext object an entry targets. CONTROLLER falls back to the pawn.
+CONTROLLER = 0
+PAWN = 1
+MOVEMENT = 2
+
+def compound(per_level: float, levels: int) -> Tuple[float, ...]:
+    """Multipliers (1 + per_level) ** n for n in 0..levels-1."""
+    return tuple((1.0 + per_level) ** n for n in range(levels))
+
+def neutral(levels: int, op: str = modifiers.MULT) -> Tuple[float, ...]:
+    return ((1.0 if op == modifiers.MULT else 0.0),) * levels
+
+class BuffPlan:
+    __slots__ = ("levels", "entries")
+
+    def __init__(self, levels: int) -> None:
+        self.levels = max(1, levels)
+        self.entries: List[Tuple[int, str, Tuple[float, ...], str]] = []
+
+    def add(self, slot: int, attr: str, values: Sequence[float], op: str = modifiers.MULT) -> None:
+        values = tuple(values)
+        if len(values) != self.levels:
+            raise ValueError(f"{attr}: {len(values)} values for {self.levels} levels")
+        self.entries.append((slot, attr, values, op))
+
+    def value(self, attr: str, level: int) -> float | None:
+        for _, a, values, _ in self.entries:
+            if a == attr:
+                return values[min(level, self.levels - 1)]
+        return None
+
+    def apply(self, name: str, ctx: Any, level: int) -> None:
+        """Register every entry at ``level`` (clamped to the plan) as modifier ``name``."""
+        if level < 0:
+            level = 0
+        elif level >= self.levels:
+            level = self.levels - 1
+        pawn = ctx.pawn
+        targets = (ctx.controller or pawn, pawn, ctx.movement)
+        for slot, attr, values, op in self.entries:
+            target = targets[slot]
+            if target is not None:
+                modifiers.apply(name, target, attr, values[level], op)
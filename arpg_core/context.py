@@ -0,0 +1,209 @@
+"""
+Cached player context.
+
+Walking ``GetEngine().GamePlayers[i].Actor.Pawn...`` crosses the Python/UE boundary
+on every step, so the resolved objects are kept until a possess/unpossess, a map
+travel or a controller change invalidates them. There is one context per local
+player (split-screen); ``get()`` is the first one, ``players()`` all of them.
+"""
+import sys
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+import unrealsdk
+from unrealsdk.hooks import Type, add_hook
+
+from . import attributes, frame, modifiers
+from .profiling import count_error, profiled
+
+INVALIDATE_HOOKS = [
+    "/Script/Engine.Controller:ReceivePossess",
+    "/Script/Engine.Controller:ReceiveUnPossess",
+    "/Script/Engine.PlayerController:ClientRestart",
+    "/Script/Engine.PlayerController:ClientTravelInternal",
+    "/Script/Engine.PlayerController:ServerNotifyLoadedWorld",
+]
+_HOOK_ID = "arpg_core.context"
+UNKNOWN_MAP = "Unknown"
+
+class PlayerContext:
+    __slots__ = ("index", "controller", "pawn", "movement", "camera", "team", "world_info", "map_id", "valid")
+
+    def __init__(self, index: int = 0) -> None:
+        self.index = index
+        self.controller: Any = None
+        self.pawn: Any = None
+        self.movement: Any = None
+        self.camera: Any = None
+        self.team: Any = None
+        self.world_info: Any = None
+        # Interned map name, so per-map lookups and comparisons never rebuild the string.
+        self.map_id: str = UNKNOWN_MAP
+        self.valid = False
+
+    def refresh(self) -> "PlayerContext":
+        if self.valid:
+            return self
+        old = (self.controller, self.pawn, self.movement, self.map_id)
+        try:
+            pc = unrealsdk.GetEngine().GamePlayers[self.index].Actor
+        except Exception:
+            pc = None
+        pawn = pc.Pawn if pc else None
+        self.controller = pc
+        self.pawn = pawn
+        self.movement = getattr(pawn, "CharacterMovement", None) if pawn else None
+        self.camera = getattr(pc, "PlayerCameraManager", None) if pc else None
+        try:
+            self.team = pc.GetTeamComponent() if pc else None
+        except Exception:
+            self.team = None
+        try:
+            self.world_info = pc.GetWorldInfo() if pc else None
+        except Exception:
+            self.world_info = None
+        try:
+            self.map_id = sys.intern(str(self.world_info.GetMapName())) if self.world_info else UNKNOWN_MAP
+        except Exception:
+            self.map_id = UNKNOWN_MAP
+        # Keep retrying until a pawn exists; after that only the hooks invalidate us.
+        self.valid = pawn is not None
+        if self.index == 0:
+            frame.set_lead(pc)
+        for before, after in zip(old, (pc, pawn, self.movement)):
+            if before is not None and before != after:
+                modifiers.forget(before)
+        if self.index == 0 and old[3] != self.map_id and old[3] != UNKNOWN_MAP:
+            # Before the listeners, so buffs they reapply use the new map's definitions.
+            attributes.reload()
+        if old != (pc, pawn, self.movement, self.map_id):
+            _notify()
+        return self
+
+    def invalidate(self) -> None:
+        self.valid = False
+
+    def world_time(self) -> float:
+        try:
+            return float(self.world_info.TimeSeconds) if self.world_info else 0.0
+        except Exception:
+            return 0.0
+
+    def is_hostile(self, obj: Any) -> bool:
+        if self.team is None:
+            return True
+        return bool(self.team.IsHostile(obj))
+
+player = PlayerContext(0)
+_players: List[PlayerContext] = [player]
+# Set by the invalidate hooks; the GamePlayers count is only re-read after one.
+_count_stale: bool = True
+_listeners: Dict[str, Callable[[], None]] = {}
+_installed: bool = False
+
+def _notify() -> None:
+    for key, fn in list(_listeners.items()):
+        try:
+            fn()
+        except Exception:
+            count_error(f"{key}.on_context_change")
+
+def _resync() -> None:
+    global _count_stale
+    _count_stale = False
+    try:
+        n = max(1, len(unrealsdk.GetEngine().GamePlayers))
+    except Exception:
+        return
+    if n == len(_players):
+        return
+    while len(_players) < n:
+        _players.append(PlayerContext(len(_players)))
+    for gone in _players[n:]:
+        for obj in (gone.controller, gone.pawn, gone.movement):
+            if obj is not None:
+                modifiers.forget(obj)
+    del _players[n:]
+    _notify()
+
+def _settle() -> None:
+    # Re-resolve after an invalidation even if no mod is ticking, so change
+    # listeners can wake their hooks. Retries each frame until player one has a pawn.
+    players()
+    if not player.valid:
+        frame.call_next_frame(_HOOK_ID, _settle)
+
+@profiled("arpg_core.context._on_invalidate")
+def _on_invalidate(*_: Any) -> None:
+    global _count_stale
+    _count_stale = True
+    for p in _players:
+        p.invalidate()
+    # The controller may be replaced (save load, non-seamless travel); frame work
+    # gated on the old one would never run again, so run on any until _settle.
+    frame.set_lead(None)
+    frame.call_next_frame(_HOOK_ID, _settle)
+
+def install() -> None:
+    global _installed
+    if _installed:
+        return
+    for func in INVALIDATE_HOOKS:
+        try:
+            add_hook(func, Type.POST, _HOOK_ID, _on_invalidate)
+        except Exception:
+            pass
+    _installed = True
+
+def get() -> PlayerContext:
+    if not _installed:
+        install()
+    return player.refresh()
+
+def players() -> List[PlayerContext]:
+    """Every local player's context, refreshed; player one first."""
+    if not _installed:
+        install()
+    if _count_stale:
+        _resync()
+    for p in _players:
+        p.refresh()
+    return _players
+
+S = TypeVar("S")
+
+def sync_states(states: Dict[Any, S], make: Callable[["PlayerContext"], S]) -> Dict[Any, S]:
+    """
+    Per-player state records (anything with a ``ctx`` attribute), re-keyed by the
+    players' current controllers. A record follows its local player to a new
+    controller; new players get ``make(ctx)``; departed players are dropped.
+    """
+    by_ctx = {id(st.ctx): st for st in states.values()}
+    out: Dict[Any, S] = {}
+    for p in players():
+        if p.controller is None:
+            continue
+        st = by_ctx.get(id(p))
+        out[p.controller] = st if st is not None else make(p)
+    return out
+
+def state_for(states: Dict[Any, S], ctx: PlayerContext, resync: Callable[[], Dict[Any, S]]) -> Optional[S]:
+    """``ctx``'s record in ``states``; a controller not seen yet (a player who just joined) resyncs first."""
+    st = states.get(ctx.controller)
+    if st is None and ctx.controller is not None:
+        st = resync().get(ctx.controller)
+    return st
+
+def world_time() -> float:
+    return get().world_time()
+
+def player_for(obj: Any) -> Optional[PlayerContext]:
+    # The local player whose controller or pawn ``obj`` is, if any.
+    if obj is None:
+        return None
+    for p in _players:
+        if obj is p.controller or obj is p.pawn:
+            return p
+    return None
+
+def on_change(key: str, fn: Callable[[], None]) -> None:
+    # Called after the resolved controller, pawn, movement component or map changes.
+    _listeners[key] = fn
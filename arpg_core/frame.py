@@ -0,0 +1,78 @@
+from typing import Any, Callable, Dict
+from unrealsdk.hooks import Type, add_hook, remove_hook
+
+from .profiling import count_error, profiled
+
+PLAYER_TICK = "/Script/OakGame.OakPlayerController:PlayerTick"
+_HOOK_ID = "arpg_core.frame"
+
+# One-shot callbacks for the next PlayerTick (coalesced by key) and per-frame
+# tasks. The hook is only attached while either has something in it, so an idle
+# frame costs nothing.
+_pending: Dict[str, Callable[[], None]] = {}
+_tasks: Dict[str, Callable[[], None]] = {}
+_attached: bool = False
+# PlayerTick fires once per local controller. Frame work runs on the lead
+# (first local player's) controller only; None means run on every call.
+lead: Any = None
+
+def _attach() -> None:
+    global _attached
+    if _attached:
+        return
+    try:
+        add_hook(PLAYER_TICK, Type.POST, _HOOK_ID, _on_tick)
+        _attached = True
+    except Exception:
+        pass
+
+def _detach() -> None:
+    global _attached
+    if not _attached:
+        return
+    try:
+        remove_hook(PLAYER_TICK, Type.POST, _HOOK_ID)
+    except Exception:
+        pass
+    _attached = False
+
+def set_lead(controller: Any) -> None:
+    global lead
+    lead = controller
+
+def is_lead(obj: Any) -> bool:
+    return lead is None or obj is lead
+
+def call_next_frame(key: str, fn: Callable[[], None]) -> None:
+    _pending[key] = fn
+    _attach()
+
+def every_frame(key: str, fn: Callable[[], None]) -> None:
+    _tasks[key] = fn
+    _attach()
+
+def stop(key: str) -> None:
+    _tasks.pop(key, None)
+
+def run_pending() -> None:
+    # Callbacks queued while running wait for the next frame.
+    batch = list(_pending.items())
+    _pending.clear()
+    for key, fn in batch:
+        try:
+            fn()
+        except Exception:
+            count_error(key)
+
+@profiled("arpg_core.frame._on_tick")
+def _on_tick(obj: Any, *_: Any) -> None:
+    if lead is not None and obj is not lead:
+        return
+    for key, fn in list(_tasks.items()):
+        try:
+            fn()
+        except Exception:
+            count_error(key)
+    run_pending()
+    if not _tasks and not _pending:
+        _detach()
@@ -0,0 +1,73 @@
+"""
+Shared HUD dispatcher.
+
+Messages are queued per channel (the HUD title) and only the latest one per
+channel survives until the next flush, so a burst of stack updates shows up as a
+single "Stacks: N". Flushes run from the frame hook at most ``rate`` times per
+second. Priority messages (an uber drop, an explicit keybind response) skip the
+queue.
+"""
+import time
+from typing import Callable, Dict, Optional
+
+from . import frame
+
+_FRAME_KEY = "arpg_core.hud"
+_UNRESOLVED = object()
+
+rate: float = 4.0
+_show: object = _UNRESOLVED
+_queue: Dict[str, str] = {}
+_last_flush: float = 0.0
+sent: int = 0
+collapsed: int = 0
+
+def _resolve() -> Optional[Callable[[str, str], None]]:
+    global _show
+    if _show is _UNRESOLVED:
+        try:
+            from ui_utils import show_hud_message
+            _show = show_hud_message
+        except Exception:
+            _show = None
+    return _show  # type: ignore[return-value]
+
+def _send(title: str, msg: str) -> None:
+    global sent
+    fn = _resolve()
+    if fn is None:
+        return
+    try:
+        fn(title, msg)
+        sent += 1
+    except Exception:
+        pass
+
+def set_rate(per_second: float) -> None:
+    global rate
+    rate = max(0.1, float(per_second))
+
+def show(title: str, msg: str, priority: bool = False) -> None:
+    global collapsed
+    if priority:
+        _queue.pop(title, None)
+        _send(title, msg)
+        return
+    if title in _queue:
+        collapsed += 1
+    _queue[title] = msg
+    frame.call_next_frame(_FRAME_KEY, flush)
+
+def flush(force: bool = False) -> None:
+    global _last_flush
+    if not _queue:
+        return
+    now = time.perf_counter()
+    if not force and now - _last_flush < 1.0 / rate:
+        frame.call_next_frame(_FRAME_KEY, flush)
+        return
+    _last_flush = now
+    items = list(_queue.items())
+    _queue.clear()
+    for title, msg in items:
+        _send(title, msg)
@@ -0,0 +1,213 @@
+"""
+Append-only session state journal.
+
+Each mod keeps one small file of keyed records per local player (stack count,
+active uber, running pylon buffs, true attribute base values). A change is one
+record appended to an already open file, so writing state costs the game thread
+no more than a single short write. Loading replays the records into the latest
+value per key and ignores a torn record at the tail. When superseded records
+outnumber live keys, the file is rewritten compacted on a worker thread
+(temp file + ``os.replace``); appends made meanwhile are carried over to the new
+file under the same lock that guards the swap.
+
+Records carry the wall-clock time they were written, so a deadline saved as
+"seconds left" resumes with the time that passed while the game was closed
+already taken off.
+"""
+import os
+import re
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import workers
+
+MAGIC = b"ARPJ"
+VERSION = 1
+_HEADER = struct.Struct("<4sH")
+# op, player index, key length, value, seconds left, wall time written, text length;
+# followed by the key and text as UTF-8.
+_RECORD = struct.Struct("<BBHdddH")
+
+OP_SET = 1
+OP_DELETE = 2
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "state")
+
+Key = Tuple[int, str]
+
+class Entry:
+    __slots__ = ("value", "left", "stamp", "text")
+
+    def __init__(self, value: float, left: float, stamp: float, text: str) -> None:
+        self.value = value
+        self.left = left
+        self.stamp = stamp
+        self.text = text
+
+    def remaining(self) -> float:
+        """Seconds left now; negative once the deadline passed while the game was closed."""
+        return self.left - (time.time() - self.stamp)
+
+class Journal:
+    __slots__ = ("name", "root", "live", "records", "_file", "_lock", "_pending", "_job")
+
+    def __init__(self, name: str, root: str = DEFAULT_DIR) -> None:
+        self.name = name
+        self.root = root
+        self.live: Dict[Key, Entry] = {}
+        self.records = 0
+        self._file = None
+        self._lock = threading.Lock()
+        # Records appended while a compaction is writing the new file; None otherwise.
+        self._pending: Optional[List[bytes]] = None
+        self._job: Optional[workers.Job] = None
+
+    def path(self) -> str:
+        return os.path.join(self.root, re.sub(r"[^A-Za-z0-9_.-]", "_", self.name) + ".jnl")
+
+    @staticmethod
+    def _pack(op: int, key: Key, e: Optional[Entry] = None) -> bytes:
+        k = key[1].encode("utf-8")
+        if e is None:
+            return _RECORD.pack(op, key[0], len(k), 0.0, 0.0, 0.0, 0) + k
+        t = e.text.encode("utf-8")
+        return _RECORD.pack(op, key[0], len(k), e.value, e.left, e.stamp, len(t)) + k + t
+
+    def load(self) -> Dict[Key, Entry]:
+        """Replay the file and open it for appending; returns the live entries."""
+        self.close()
+        self.live = {}
+        self.records = 0
+        try:
+            with open(self.path(), "rb") as f:
+                data = f.read()
+        except OSError:
+            data = b""
+        end = 0
+        if len(data) >= _HEADER.size and _HEADER.unpack_from(data, 0) == (MAGIC, VERSION):
+            off = end = _HEADER.size
+            while off + _RECORD.size <= len(data):
+                op, player, klen, value, left, stamp, tlen = _RECORD.unpack_from(data, off)
+                body = off + _RECORD.size
+                if body + klen + tlen > len(data):
+                    break
+                try:
+                    key = (player, data[body:body + klen].decode("utf-8"))
+                    text = data[body + klen:body + klen + tlen].decode("utf-8")
+                except UnicodeDecodeError:
+                    break
+                off = end = body + klen + tlen
+                self.records += 1
+                if op == OP_SET:
+                    self.live[key] = Entry(value, left, stamp, text)
+                elif op == OP_DELETE:
+                    self.live.pop(key, None)
+        if end == 0 or end != len(data):
+            # Missing, foreign or torn: start the file over from what was readable.
+            self._rewrite(dict(self.live), [])
+        self._open()
+        if self._worth_compacting():
+            self.compact()
+        return self.live
+
+    def _open(self) -> None:
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            self._file = open(self.path(), "ab", buffering=0)
+        except OSError:
+            self._file = None
+
+    def close(self) -> None:
+        self.wait()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _append(self, rec: bytes) -> bool:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(rec)
+            if self._file is None:
+                return False
+            try:
+                self._file.write(rec)
+            except OSError:
+                return False
+            self.records += 1
+        if self._worth_compacting():
+            self.compact()
+        return True
+
+    def set(self, player: int, key: str, value: float = 0.0, left: float = 0.0, text: str = "") -> bool:
+        e = Entry(value, left, time.time(), text)
+        self.live[(player, key)] = e
+        return self._append(self._pack(OP_SET, (player, key), e))
+
+    def delete(self, player: int, key: str) -> bool:
+        if self.live.pop((player, key), None) is None:
+            return True
+        return self._append(self._pack(OP_DELETE, (player, key)))
+
+    def get(self, player: int, key: str) -> Optional[Entry]:
+        return self.live.get((player, key))
+
+    def _worth_compacting(self) -> bool:
+        return self._idle() and self.records > 2 * len(self.live) + 64
+
+    def _idle(self) -> bool:
+        return self._job is None or self._job.finished
+
+    def compact(self) -> None:
+        """Rewrite the file with only live entries, off the game thread."""
+        if not self._idle():
+            return
+        with self._lock:
+            self._pending = []
+        snapshot = dict(self.live)
+        # No owner: a compaction that started has to finish, even if the mod is disabled.
+        self._job = workers.submit(None, lambda: self._rewrite(snapshot, None))
+        if self._job is None:
+            # Worker queue full; try again on a later append.
+            with self._lock:
+                self._pending = None
+
+    def wait(self) -> None:
+        # For shutdown and benchmarks; the game never waits on a compaction.
+        job = self._job
+        if job is not None:
+            job.wait()
+
+    def _rewrite(self, snapshot: Dict[Key, Entry], pending: Optional[List[bytes]]) -> None:
+        path = self.path()
+        tmp = path + ".tmp"
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(MAGIC, VERSION))
+                for key, e in snapshot.items():
+                    f.write(self._pack(OP_SET, key, e))
+            with self._lock:
+                carried = self._pending if pending is None else pending
+                if carried:
+                    with open(tmp, "ab") as f:
+                        f.writelines(carried)
+                reopen = self._file is not None
+                if reopen:
+                    self._file.close()
+                    self._file = None
+                try:
+                    os.replace(tmp, path)
+                    self.records = len(snapshot) + len(carried or ())
+                finally:
+                    if reopen:
+                        self._file = open(path, "ab", buffering=0)
+        except OSError:
+            # Retried once as many records again have piled up, not on every append.
+            self.records = len(snapshot)
+        finally:
+            if pending is None:
+                with self._lock:
+                    self._pending = None
@@ -0,0 +1,135 @@
+"""
+Shared kill-event bus.
+
+``OakCharacter:Died`` and ``OakDamageComponent:OnDeath`` can both fire for one
+enemy, and several mods care about kills. The bus owns both hooks, dedupes
+victims by identity within a frame, runs the hostility check once per victim and
+hands every subscriber the frame's hostile kills as one batch. Each kill is
+credited to the local player whose controller or pawn instigated it.
+"""
+from typing import Any, Callable, Dict, List, Optional, Set
+from unrealsdk.hooks import Type, add_hook, remove_hook
+
+from . import context, frame, telemetry
+from .profiling import count_error, profiled
+
+class Kill:
+    __slots__ = ("victim", "player")
+
+    def __init__(self, victim: Any, player: "context.PlayerContext") -> None:
+        self.victim = victim
+        self.player = player
+
+KillBatch = List[Kill]
+
+DIED = "/Script/OakGame.OakCharacter:Died"
+ON_DEATH = "/Script/OakGame.OakDamageComponent:OnDeath"
+_HOOK_ID = "arpg_core.kills"
+
+_subscribers: Dict[str, Callable[[KillBatch], None]] = {}
+_seen: Set[Any] = set()
+_batch: KillBatch = []
+_installed: bool = False
+# One sample per delivered kill, valued with the credited player's index.
+_kill_ring = telemetry.ring("kills", telemetry.EVENT, 1024)
+
+# Hook argument names that may carry the killer, in the order they are tried.
+INSTIGATOR_FIELDS = ("InstigatedBy", "Killer", "InstigatorController", "EventInstigator", "DamageCauser", "Instigator")
+
+def _field(obj: Any, name: str) -> Any:
+    try:
+        return getattr(obj, name, None)
+    except Exception:
+        return None
+
+def _instigator(args: Any) -> Any:
+    if args is None:
+        return None
+    for name in INSTIGATOR_FIELDS:
+        value = _field(args, name)
+        if value:
+            return value
+    return None
+
+def _credit(killer: Any) -> Optional["context.PlayerContext"]:
+    # Unknown killer: player one, as before split-screen support. A known killer
+    # that is not a local player (AI ally, remote client) earns nothing here.
+    if killer is None:
+        return context.player
+    for obj in (killer, _field(killer, "Instigator"), _field(killer, "Owner")):
+        p = context.player_for(obj)
+        if p is not None:
+            return p
+    return None
+
+def _record(victim: Any, killer: Any) -> None:
+    if victim is None or victim in _seen:
+        return
+    _seen.add(victim)
+    # Delivery also clears _seen, so it is due even for a kill that earns nothing.
+    frame.call_next_frame(_HOOK_ID, _deliver)
+    player = _credit(killer)
+    if player is None:
+        return
+    try:
+        hostile = player.is_hostile(victim)
+    except Exception:
+        return
+    if hostile:
+        _batch.append(Kill(victim, player))
+
+@profiled("arpg_core.kills._on_died")
+def _on_died(obj: Any, args: Any = None, *_: Any) -> None:
+    _record(obj, _instigator(args))
+
+@profiled("arpg_core.kills._on_death")
+def _on_death(obj: Any, args: Any = None, *_: Any) -> None:
+    owner = getattr(obj, "Owner", None) or getattr(obj, "GetOwner", lambda: None)()
+    _record(owner, _instigator(args))
+
+def _deliver() -> None:
+    global _batch
+    batch, _batch = _batch, []
+    _seen.clear()
+    if not batch:
+        return
+    if telemetry.enabled:
+        t = context.player.world_time()
+        for k in batch:
+            telemetry.record(_kill_ring, t, k.player.index)
+    for key, fn in list(_subscribers.items()):
+        try:
+            fn(batch)
+        except Exception:
+            count_error(f"{key}.kills")
+
+def _install() -> None:
+    global _installed
+    if _installed:
+        return
+    try:
+        add_hook(DIED, Type.POST, _HOOK_ID, _on_died)
+        add_hook(ON_DEATH, Type.POST, _HOOK_ID, _on_death)
+        _installed = True
+    except Exception:
+        pass
+
+def _uninstall() -> None:
+    global _installed
+    if not _installed:
+        return
+    for func in (DIED, ON_DEATH):
+        try:
+            remove_hook(func, Type.POST, _HOOK_ID)
+        except Exception:
+            pass
+    _installed = False
+
+def subscribe(key: str, fn: Callable[[KillBatch], None]) -> None:
+    _subscribers[key] = fn
+    _install()
+
+def unsubscribe(key: str) -> None:
+    _subscribers.pop(key, None)
+    if not _subscribers:
+        _uninstall()
@@ -0,0 +1,141 @@
+"""
+Shared attribute modifiers.
+
+Every mod registers named modifiers against a (target, attribute) slot instead of
+writing values itself. The first modifier on a slot snapshots the true base value,
+the final value is composed as ``(base + sum(adds)) * prod(mults)`` and written at
+most once per frame, and removing the last modifier writes the base back exactly.
+
+Attribute names starting with ``/`` are AttributeDefinition paths, anything else
+is treated as a plain float property on the target (e.g. ``CustomTimeDilation``).
+"""
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import attributes, frame
+
+MULT = "mult"
+ADD = "add"
+
+class _Slot:
+    __slots__ = ("target", "attr", "base", "mods", "written")
+
+    def __init__(self, target: Any, attr: str, base: float) -> None:
+        self.target = target
+        self.attr = attr
+        self.base = base
+        self.mods: Dict[str, Tuple[str, float]] = {}
+        self.written = base
+
+    def value(self) -> float:
+        add = 0.0
+        mult = 1.0
+        for op, v in self.mods.values():
+            if op == ADD:
+                add += v
+            else:
+                mult *= v
+        return (self.base + add) * mult
+
+_slots: Dict[Tuple[Any, str], _Slot] = {}
+_dirty: Dict[Tuple[Any, str], _Slot] = {}
+# Told (target, attr, base) when a slot snapshots its base and (target, attr, None)
+# once the base is back on the target or the target is gone; see arpg_core.bases.
+_watcher: Optional[Callable[[Any, str, Optional[float]], None]] = None
+
+def watch(fn: Optional[Callable[[Any, str, Optional[float]], None]]) -> None:
+    global _watcher
+    _watcher = fn
+
+def _read(target: Any, attr: str) -> float | None:
+    try:
+        if attr.startswith("/"):
+            definition = attributes.get(attr)
+            return float(target.GetAttributeBaseValue(definition)) if definition else None
+        return float(getattr(target, attr))
+    except Exception:
+        return None
+
+def _write(target: Any, attr: str, value: float) -> None:
+    if attr.startswith("/"):
+        target.SetAttributeBaseValue(attributes.get(attr), value)
+    else:
+        setattr(target, attr, value)
+
+def _mark(key: Tuple[Any, str], slot: _Slot) -> None:
+    _dirty[key] = slot
+    frame.call_next_frame("arpg_core.modifiers", flush)
+
+def apply(name: str, target: Any, attr: str, value: float, op: str = MULT) -> None:
+    if not target:
+        return
+    neutral = value == (0.0 if op == ADD else 1.0)
+    key = (target, attr)
+    slot = _slots.get(key)
+    if slot is None:
+        if neutral:
+            return
+        base = _read(target, attr)
+        if base is None:
+            return
+        slot = _slots[key] = _Slot(target, attr, base)
+        if _watcher is not None:
+            _watcher(target, attr, base)
+    if neutral:
+        if slot.mods.pop(name, None) is None:
+            return
+    else:
+        if slot.mods.get(name) == (op, value):
+            return
+        slot.mods[name] = (op, value)
+    _mark(key, slot)
+
+def remove(name: str, target: Any, attr: str) -> None:
+    slot = _slots.get((target, attr))
+    if slot is not None and slot.mods.pop(name, None) is not None:
+        _mark((target, attr), slot)
+
+def clear(name: str) -> None:
+    for key, slot in _slots.items():
+        if slot.mods.pop(name, None) is not None:
+            _mark(key, slot)
+
+def forget(target: Any) -> None:
+    # The target is gone (respawn, map change); drop its slots without writing to it.
+    for key in [k for k in _slots if k[0] == target]:
+        del _slots[key]
+        _dirty.pop(key, None)
+        if _watcher is not None:
+            _watcher(target, key[1], None)
+
+def base_value(target: Any, attr: str) -> float | None:
+    slot = _slots.get((target, attr))
+    return slot.base if slot is not None else _read(target, attr)
+
+def restore_base(target: Any, attr: str, base: float) -> bool:
+    """Write a journaled true base back to a target no modifier holds (crash/reload recovery)."""
+    if not target or (target, attr) in _slots:
+        return False
+    try:
+        if _read(target, attr) != base:
+            _write(target, attr, base)
+        return True
+    except Exception:
+        return False
+
+def flush() -> int:
+    writes = 0
+    for key, slot in _dirty.items():
+        value = slot.value()
+        if value != slot.written:
+            try:
+                _write(slot.target, slot.attr, value)
+                slot.written = value
+                writes += 1
+            except Exception:
+                pass
+        if not slot.mods and _slots.get(key) is slot:
+            del _slots[key]
+            if _watcher is not None and slot.written == slot.base:
+                _watcher(slot.target, slot.attr, None)
+    _dirty.clear()
+    return writes
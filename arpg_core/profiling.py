@@ -0,0 +1,132 @@
+"""
+Opt-in per-hook profiling.
+
+``profiled(name)`` wraps a hook, keybind or bus callback. The wrapper always
+swallows and counts exceptions (the mods never let one escape into the engine);
+loops that call other code's callbacks count theirs with ``count_error``;
+when profiling is enabled it also records ``perf_counter_ns`` timings into a
+fixed-size log-linear histogram, so recording never allocates.
+"""
+import functools
+import os
+import time
+from typing import Any, Callable, Dict, List
+
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hook_profile.log")
+_SUB_BITS = 2
+_BUCKETS = 8 + 64 * (1 << _SUB_BITS)
+
+enabled: bool = False
+
+class Histogram:
+    __slots__ = ("counts", "n", "total_ns", "max_ns", "errors")
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * _BUCKETS
+        self.n = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.errors = 0
+
+    def record(self, ns: int) -> None:
+        if ns < 8:
+            i = ns if ns > 0 else 0
+        else:
+            b = ns.bit_length()
+            i = 8 + (b - 4) * 4 + ((ns >> (b - 3)) & 3)
+        self.counts[i] += 1
+        self.n += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, p: float) -> int:
+        # Upper bound of the bucket holding the p-th percentile sample.
+        if not self.n:
+            return 0
+        rank = max(1, int(self.n * p / 100.0 + 0.5))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                if i < 8:
+                    return i
+                b = (i - 8) // 4 + 4
+                return min(((4 + (i - 8) % 4 + 1) << (b - 3)) - 1, self.max_ns)
+        return self.max_ns
+
+    def reset(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.n = self.total_ns = self.max_ns = self.errors = 0
+
+histograms: Dict[str, Histogram] = {}
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        h = histograms.setdefault(name, Histogram())
+        perf = time.perf_counter_ns
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any) -> Any:
+            if not enabled:
+                try:
+                    return fn(*args)
+                except Exception:
+                    h.errors += 1
+                    return None
+            t0 = perf()
+            try:
+                return fn(*args)
+            except Exception:
+                h.errors += 1
+                return None
+            finally:
+                h.record(perf() - t0)
+        return wrapper
+    return decorator
+
+def count_error(name: str) -> None:
+    """Count an exception swallowed by a dispatch loop (frame tasks, timers, listeners) under ``name``."""
+    histograms.setdefault(name, Histogram()).errors += 1
+
+def set_enabled(value: bool) -> None:
+    global enabled
+    enabled = bool(value)
+
+def reset() -> None:
+    for h in histograms.values():
+        h.reset()
+
+def report() -> List[str]:
+    rows = sorted(histograms.items(), key=lambda kv: kv[1].percentile(99), reverse=True)
+    lines = []
+    for name, h in rows:
+        if not h.n and not h.errors:
+            continue
+        lines.append(
+            f"{name}: n={h.n} p50={h.percentile(50)/1000:.1f}us p95={h.percentile(95)/1000:.1f}us "
+            f"p99={h.percentile(99)/1000:.1f}us max={h.max_ns/1000:.1f}us errors={h.errors}"
+        )
+    return lines
+
+def write_log(lines: List[str], path: str = LOG_FILE, stamp: str | None = None) -> None:
+    try:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(stamp or time.strftime("# %Y-%m-%d %H:%M:%S\n"))
+            f.write("\n".join(lines) + "\n")
+    except Exception:
+        pass
+
+def dump(hud: Callable[[str, str], None] | None = None, path: str = LOG_FILE, background: bool = False) -> List[str]:
+    lines = report()
+    if background:
+        # The report is taken here; only the file append moves to a worker.
+        from . import workers
+        stamp = time.strftime("# %Y-%m-%d %H:%M:%S\n")
+        if workers.submit(None, lambda: write_log(lines, path, stamp)) is None:
+            write_log(lines, path, stamp)
+    else:
+        write_log(lines, path)
+    if hud is not None:
+        hud("Hook Profile", "\n".join(lines[:4]) if lines else "No samples")
+    return lines
@@ -0,0 +1,98 @@
+"""
+Deadline scheduler keyed on world time.
+
+Timers live in a min-heap, so a frame with nothing due only looks at the head.
+Rescheduling or cancelling a key leaves the old heap entry behind and it is
+skipped when it surfaces. If world time goes backwards (map travel resets the
+clock) every deadline is shifted by the same amount so the remaining time is kept.
+"""
+from heapq import heappop, heappush
+from typing import Callable, Dict, List, Optional, Tuple
+
+from . import context, frame
+from .profiling import count_error
+
+Callback = Callable[[float], None]
+
+class Scheduler:
+    __slots__ = ("name", "clock", "_heap", "_live", "_seq", "_last", "_running")
+
+    def __init__(self, name: str, clock: Callable[[], float]) -> None:
+        self.name = name
+        self.clock = clock
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, Tuple[float, int, Callback]] = {}
+        self._seq = 0
+        self._last = 0.0
+        # Set inside run_due, which holds the heap and live dict it is draining.
+        self._running = False
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._live
+
+    def schedule(self, key: str, when: float, fn: Callback) -> None:
+        if not self._live:
+            # Nothing pumped while idle, so the clock may have been reset since
+            # (map travel); a stale _last would rebase this deadline into the past.
+            self._heap.clear()
+            self._last = self.clock()
+        self._seq += 1
+        self._live[key] = (when, self._seq, fn)
+        heappush(self._heap, (when, self._seq, key))
+        if len(self._heap) > 2 * len(self._live) + 32 and not self._running:
+            # Compacting swaps in a new heap; never under a run_due still popping the old one.
+            self._rebase(0.0)
+        frame.every_frame(self.name, self.pump)
+
+    def cancel(self, key: str) -> bool:
+        return self._live.pop(key, None) is not None
+
+    def due(self, key: str) -> Optional[float]:
+        entry = self._live.get(key)
+        return entry[0] if entry is not None else None
+
+    def time_left(self, key: str, now: float) -> float:
+        entry = self._live.get(key)
+        return max(0.0, entry[0] - now) if entry is not None else 0.0
+
+    def _rebase(self, delta: float) -> None:
+        # Also used with delta=0 to drop dead heap entries left by reschedules.
+        self._live = {k: (w + delta, s, fn) for k, (w, s, fn) in self._live.items()}
+        self._heap = [(w, s, k) for k, (w, s, _) in self._live.items()]
+        self._heap.sort()
+
+    def run_due(self, now: float) -> int:
+        if now < self._last:
+            self._rebase(now - self._last)
+        self._last = now
+        fired = 0
+        heap, live = self._heap, self._live
+        self._running = True
+        try:
+            while heap and heap[0][0] <= now:
+                when, seq, key = heappop(heap)
+                entry = live.get(key)
+                if entry is None or entry[1] != seq:
+                    continue
+                del live[key]
+                fired += 1
+                try:
+                    entry[2](when)
+                except Exception:
+                    # Mods wrap their callbacks in profiled(); this catches the rest.
+                    count_error(self.name)
+        finally:
+            self._running = False
+        return fired
+
+    def pump(self) -> None:
+        if not self._live:
+            self._heap.clear()
+            frame.stop(self.name)
+            return
+        self.run_due(self.clock())
+
+timers = Scheduler("arpg_core.timers", context.world_time)
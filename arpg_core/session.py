@@ -0,0 +1,73 @@
+"""
+Per-mod session state shared by the three mods.
+
+A ``Session`` holds a mod's per-player state records keyed by controller, its
+journal and whether it is enabled. The journal is replayed once per session
+(a later re-enable keeps the in-memory states); each player's saved entries go
+to their record through the mod's ``claim``, on enable if the record exists
+(the context listener makes them even while the mod is disabled) or as soon as
+the player appears while enabled. A new record is always claimed, with nothing
+saved if there is nothing. ``wake()`` attaches the mod's PlayerTick hook, but only
+while the mod is enabled.
+"""
+from typing import Any, Callable, Dict, Generic, Optional, TypeVar
+
+from . import context
+from .journal import Entry, Journal
+
+S = TypeVar("S")
+Saved = Dict[str, Entry]
+
+class Session(Generic[S]):
+    __slots__ = ("journal", "states", "enabled", "tick", "_make", "_claim", "_leave", "_restored", "_loaded")
+
+    def __init__(self, name: str, make: Callable[[context.PlayerContext], S],
+                 claim: Optional[Callable[[S, Saved], None]] = None,
+                 leave: Optional[Callable[[S], None]] = None) -> None:
+        self.journal = Journal(name)
+        self.states: Dict[Any, S] = {}
+        self.enabled = False
+        # The mod's PlayerTick hook; set once it is defined.
+        self.tick: Any = None
+        self._make = make
+        self._claim = claim
+        self._leave = leave
+        # Journal entries by player index, waiting for that player's record.
+        self._restored: Dict[int, Saved] = {}
+        self._loaded = False
+
+    def _new(self, ctx: context.PlayerContext) -> S:
+        st = self._make(ctx)
+        self._give(st)
+        return st
+
+    def _give(self, st: S) -> None:
+        if self._claim is not None:
+            # Held back while disabled; the next enable hands them out.
+            saved = self._restored.pop(st.ctx.index, {}) if self.enabled else {}
+            self._claim(st, saved)
+
+    def sync(self) -> Dict[Any, S]:
+        """Re-key the records by controller (see ``context.sync_states``); departed players go to ``leave``."""
+        states = context.sync_states(self.states, self._new)
+        if self._leave is not None:
+            kept = set(map(id, states.values()))
+            for st in self.states.values():
+                if id(st) not in kept:
+                    self._leave(st)
+        self.states = states
+        return states
+
+    def load_journal(self) -> None:
+        """Call from on_enable, after setting ``enabled``; the file is only read the first time."""
+        if not self._loaded:
+            self._loaded = True
+            for (index, key), e in self.journal.load().items():
+                self._restored.setdefault(index, {})[key] = e
+        for st in self.states.values():
+            if st.ctx.index in self._restored:
+                self._give(st)
+
+    def wake(self) -> None:
+        if self.enabled and self.tick is not None:
+            self.tick.enable()
@@ -0,0 +1,174 @@
+"""
+Gameplay telemetry in fixed-size ring buffers.
+
+Each series is a pair of preallocated ``array('d')`` rings (time, value) that
+overwrite their oldest sample when full, so recording is two array stores and
+an index bump: no per-event allocation and no growth over a session. Series are
+created once, when a mod or player first needs one, and come in two kinds:
+
+* ``EVENT`` – one sample per occurrence (kills, uber drops); summarised as a
+  rate per minute over the window.
+* ``LEVEL`` – one sample per change of a step value (stack count, pylon buffs
+  running); summarised as the time-weighted average and the share of the window
+  it was above zero (uptime).
+
+Times are world seconds. World time restarts on map travel, so samples are
+stamped on a session clock that carries on from the last stamp when the world
+clock goes backwards.
+"""
+import os
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+EVENT = 0
+LEVEL = 1
+
+WINDOW = 60.0
+DEFAULT_SIZE = 512
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "telemetry")
+
+enabled: bool = True
+# Session clock: world time + _offset, never going backwards.
+_offset: float = 0.0
+_last: float = 0.0
+
+class Ring:
+    __slots__ = ("name", "kind", "size", "times", "values", "head", "count", "total")
+
+    def __init__(self, name: str, kind: int, size: int) -> None:
+        self.name = name
+        self.kind = kind
+        self.size = size
+        self.times = array("d", bytes(8 * size))
+        self.values = array("d", bytes(8 * size))
+        self.head = 0
+        self.count = 0
+        # Samples ever recorded, including overwritten ones.
+        self.total = 0
+
+    def push(self, t: float, v: float) -> None:
+        i = self.head
+        self.times[i] = t
+        self.values[i] = v
+        i += 1
+        self.head = 0 if i == self.size else i
+        if self.count < self.size:
+            self.count += 1
+        self.total += 1
+
+    def samples(self) -> Iterator[Tuple[float, float]]:
+        """Oldest to newest."""
+        start = self.head - self.count
+        for k in range(start, self.head):
+            yield self.times[k], self.values[k]
+
+    def last(self) -> Optional[float]:
+        return self.values[self.head - 1] if self.count else None
+
+    def count_since(self, t0: float) -> int:
+        n = 0
+        i = self.head - 1
+        for _ in range(self.count):
+            if self.times[i] < t0:
+                break
+            n += 1
+            i -= 1
+        return n
+
+    def integrate(self, t0: float, t1: float) -> Tuple[float, float, float]:
+        """(value x seconds, seconds above zero, seconds covered) of the step series in [t0, t1]."""
+        area = up = covered = 0.0
+        prev_t: Optional[float] = None
+        prev_v = 0.0
+        for t, v in self.samples():
+            if prev_t is not None and t > t0:
+                a, b = max(prev_t, t0), min(t, t1)
+                if b > a:
+                    area += prev_v * (b - a)
+                    covered += b - a
+                    if prev_v > 0.0:
+                        up += b - a
+            prev_t, prev_v = t, v
+        if prev_t is not None:
+            a = max(prev_t, t0)
+            if t1 > a:
+                area += prev_v * (t1 - a)
+                covered += t1 - a
+                if prev_v > 0.0:
+                    up += t1 - a
+        return area, up, covered
+
+_rings: Dict[str, Ring] = {}
+
+def ring(name: str, kind: int = EVENT, size: int = DEFAULT_SIZE) -> Ring:
+    """The series ``name``, created on first use. Not for the hot path: keep the Ring."""
+    r = _rings.get(name)
+    if r is None:
+        r = _rings[name] = Ring(name, kind, size)
+    return r
+
+def stamp(t: float) -> float:
+    global _offset, _last
+    s = t + _offset
+    if s < _last:
+        # World clock went back (map travel): keep the session clock running.
+        _offset += _last - s
+        s = _last
+    _last = s
+    return s
+
+def record(r: Ring, t: float, v: float = 1.0) -> None:
+    if enabled:
+        r.push(stamp(t), v)
+
+def rate(r: Ring, now: float, window: float = WINDOW) -> float:
+    """Events per minute over the last ``window`` seconds."""
+    return r.count_since(now - window) * 60.0 / window
+
+def average(r: Ring, now: float, window: float = WINDOW) -> float:
+    area, _, covered = r.integrate(now - window, now)
+    return area / covered if covered > 0.0 else 0.0
+
+def uptime(r: Ring, now: float, window: float = WINDOW) -> float:
+    """Share of the window (0..1) the level was above zero."""
+    _, up, covered = r.integrate(now - window, now)
+    return up / covered if covered > 0.0 else 0.0
+
+def summary(now_world: float, window: float = WINDOW) -> List[Tuple[str, float]]:
+    now = stamp(now_world)
+    rows = []
+    for name, r in _rings.items():
+        if not r.total:
+            continue
+        if r.kind == EVENT:
+            rows.append((f"{name} per min", rate(r, now, window)))
+            rows.append((f"{name} total", float(r.total)))
+        else:
+            rows.append((f"{name} avg", average(r, now, window)))
+            rows.append((f"{name} uptime %", 100.0 * uptime(r, now, window)))
+    return rows
+
+def snapshot(now_world: float, window: float = WINDOW) -> str:
+    """Every series' samples plus the summary, as CSV text (series,time,value)."""
+    rows = summary(now_world, window)
+    now = _last
+    lines = ["series,time,value"]
+    for name, r in _rings.items():
+        lines.extend(f"{name},{t:.3f},{v:g}" for t, v in r.samples())
+    lines.extend(f"{metric} ({window:g}s),{now:.3f},{value:.4g}" for metric, value in rows)
+    return "\n".join(lines) + "\n"
+
+def write_csv(text: str, out: Optional[str] = None) -> str:
+    if out is None:
+        out = os.path.join(DEFAULT_DIR, time.strftime("telemetry-%Y%m%d-%H%M%S.csv"))
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(text)
+    return out
+
+def reset() -> None:
+    global _offset, _last
+    for r in _rings.values():
+        r.head = r.count = r.total = 0
+    _offset = _last = 0.0
@@ -0,0 +1,209 @@
+"""
+Opt-in hook-event trace.
+
+While recording, PlayerTick, ``OakCharacter:Died``, ``OakDamageComponent:OnDeath``
+and every ``traced`` keybind append one fixed-size binary record (event type,
+local player, world time, pawn position, victim identity, class and hostility)
+to an in-memory buffer, which is written out in large chunks. Strings (victim
+classes, keybind names) are written once to an inline name table and referred to
+by id. ``events()`` reads a trace back; ``bench/replay_trace.py`` feeds one
+through the mods against the fake SDK.
+
+Recording is for reproducing a session, not for normal play: it reads the pawn
+position on every tick, so it costs a few SDK calls per frame while on.
+"""
+import functools
+import os
+import struct
+import time
+from typing import Any, Callable, Dict, Iterator, Optional
+from unrealsdk.hooks import Type, add_hook, remove_hook
+
+from . import context, kills
+from .frame import PLAYER_TICK
+
+MAGIC = b"ARPT"
+VERSION = 1
+_HEADER = struct.Struct("<4sH")
+# type, player, flags, name id, victim id (or name length), world time, x, y, z.
+# A NAME record is followed by that many bytes of UTF-8.
+_RECORD = struct.Struct("<BBBHIdfff")
+
+TICK = 1
+DIED = 2
+ON_DEATH = 3
+KEYBIND = 4
+NAME = 5
+KINDS = {TICK: "tick", DIED: "died", ON_DEATH: "on_death", KEYBIND: "keybind"}
+
+# Player byte for a kill no local player made (AI ally, remote client).
+NOT_LOCAL = 0xFF
+HOSTILE = 1
+
+FLUSH_BYTES = 1 << 16
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+_HOOK_ID = "arpg_core.trace"
+
+recording: bool = False
+path: Optional[str] = None
+records: int = 0
+_buf = bytearray()
+_names: Dict[str, int] = {}
+# Victim -> id for the current frame; ids are never reused within a trace.
+_victims: Dict[Any, int] = {}
+_next_victim: int = 0
+
+class Event:
+    __slots__ = ("kind", "player", "hostile", "name", "victim", "time", "x", "y", "z")
+
+    def __init__(self, kind: int, player: int, hostile: bool, name: str, victim: int,
+                 time: float, x: float, y: float, z: float) -> None:
+        self.kind = kind
+        self.player = player
+        self.hostile = hostile
+        self.name = name
+        self.victim = victim
+        self.time = time
+        self.x = x
+        self.y = y
+        self.z = z
+
+def _flush() -> None:
+    global _buf
+    if not _buf or path is None:
+        return
+    try:
+        with open(path, "ab") as f:
+            f.write(_buf)
+    except OSError:
+        pass
+    _buf = bytearray()
+
+def _name_id(name: str) -> int:
+    nid = _names.get(name)
+    if nid is None:
+        nid = _names[name] = len(_names)
+        data = name.encode("utf-8")
+        _buf.extend(_RECORD.pack(NAME, 0, 0, nid, len(data), 0.0, 0.0, 0.0, 0.0))
+        _buf.extend(data)
+    return nid
+
+def _append(kind: int, player: int, flags: int, name_id: int, victim: int,
+            t: float, x: float = 0.0, y: float = 0.0, z: float = 0.0) -> None:
+    global records
+    _buf.extend(_RECORD.pack(kind, player, flags, name_id, victim, t, x, y, z))
+    records += 1
+    if len(_buf) >= FLUSH_BYTES:
+        _flush()
+
+def _on_tick(obj: Any, *_: Any) -> None:
+    try:
+        p = context.player_for(obj) or context.player
+        if obj is p.controller and p.index == 0:
+            _victims.clear()
+        x = y = z = 0.0
+        if p.pawn:
+            loc = p.pawn.K2_GetActorLocation()
+            x, y, z = loc.X, loc.Y, loc.Z
+        _append(TICK, p.index, 0, 0, 0, p.world_time(), x, y, z)
+    except Exception:
+        pass
+
+def _victim_id(victim: Any) -> int:
+    global _next_victim
+    vid = _victims.get(victim)
+    if vid is None:
+        _next_victim += 1
+        vid = _victims[victim] = _next_victim
+    return vid
+
+def _kill(kind: int, victim: Any, args: Any) -> None:
+    try:
+        if victim is None:
+            return
+        p = kills._credit(kills._instigator(args))
+        hostile = bool(p.is_hostile(victim)) if p is not None else False
+        try:
+            cls = str(victim.Class.Name)
+        except Exception:
+            cls = ""
+        _append(kind, p.index if p is not None else NOT_LOCAL, HOSTILE if hostile else 0,
+                _name_id(cls), _victim_id(victim), context.player.world_time())
+    except Exception:
+        pass
+
+def _on_died(obj: Any, args: Any = None, *_: Any) -> None:
+    _kill(DIED, obj, args)
+
+def _on_death(obj: Any, args: Any = None, *_: Any) -> None:
+    _kill(ON_DEATH, getattr(obj, "Owner", None), args)
+
+def traced(fn: Callable[[], None]) -> Callable[[], None]:
+    """Record calls to a keybind callback while a trace is running."""
+    name = f"{fn.__module__}.{fn.__name__}"
+
+    @functools.wraps(fn)
+    def wrapper() -> None:
+        if recording:
+            try:
+                _append(KEYBIND, 0, 0, _name_id(name), 0, context.player.world_time())
+            except Exception:
+                pass
+        fn()
+    return wrapper
+
+def start(out: Optional[str] = None) -> str:
+    global recording, path, records, _next_victim
+    stop()
+    if out is None:
+        out = os.path.join(DEFAULT_DIR, time.strftime("trace-%Y%m%d-%H%M%S.arpt"))
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION))
+    path = out
+    records = 0
+    _names.clear()
+    _victims.clear()
+    _next_victim = 0
+    context.get()
+    for func, cb in ((PLAYER_TICK, _on_tick), (kills.DIED, _on_died), (kills.ON_DEATH, _on_death)):
+        try:
+            add_hook(func, Type.POST, _HOOK_ID, cb)
+        except Exception:
+            pass
+    recording = True
+    return out
+
+def stop() -> Optional[str]:
+    """Stop recording and write out what is buffered; returns the trace path."""
+    global recording
+    if not recording:
+        return None
+    recording = False
+    for func in (PLAYER_TICK, kills.DIED, kills.ON_DEATH):
+        try:
+            remove_hook(func, Type.POST, _HOOK_ID)
+        except Exception:
+            pass
+    _flush()
+    _victims.clear()
+    return path
+
+def events(trace_path: str) -> Iterator[Event]:
+    """Every recorded event in order; stops at a torn record at the tail."""
+    with open(trace_path, "rb") as f:
+        data = f.read()
+    if len(data) < _HEADER.size or _HEADER.unpack_from(data, 0) != (MAGIC, VERSION):
+        raise ValueError(f"{trace_path}: not a hook trace")
+    names: Dict[int, str] = {}
+    off = _HEADER.size
+    while off + _RECORD.size <= len(data):
+        kind, player, flags, nid, victim, t, x, y, z = _RECORD.unpack_from(data, off)
+        off += _RECORD.size
+        if kind == NAME:
+            if off + victim > len(data):
+                return
+            names[nid] = data[off:off + victim].decode("utf-8", "replace")
+            off += victim
+            continue
+        yield Event(kind, player, bool(flags & HOSTILE), names.get(nid, ""), victim, t, x, y, z)
@@ -0,0 +1,162 @@
+"""
+Background worker pool with a main-thread completion queue.
+
+Slow work that touches no SDK objects (file writes and compactions, profile
+dumps, parsing the loot tables) goes to a few daemon threads instead of running
+inside a hook. A job's ``done`` callback is queued and run on the game thread by
+a frame task that stops after ``budget_ms`` per frame and picks up the rest on
+the next frame; SDK calls belong in ``done``, never in ``work``.
+
+The job queue is bounded: ``submit`` returns None when it is full and the caller
+decides whether to run the work inline, retry later or skip it. ``cancel(owner)``
+drops an owner's jobs that have not started and discards the completions of the
+ones that have; mods call it from ``on_disable``. Jobs submitted with no owner
+(writes that must land) are never cancelled.
+
+``submit`` and ``cancel`` are for the game thread only.
+"""
+import collections
+import queue
+import threading
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from . import frame
+from .profiling import Histogram, count_error
+
+THREADS = 2
+MAX_QUEUED = 64
+_TASK = "arpg_core.workers"
+
+budget_ms: float = 0.5
+
+class Job:
+    __slots__ = ("owner", "work", "done", "value", "error", "cancelled", "_finished")
+
+    def __init__(self, owner: Optional[str], work: Callable[[], Any], done: Optional[Callable[[Any], None]]) -> None:
+        self.owner = owner
+        self.work = work
+        self.done = done
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+        self.cancelled = False
+        self._finished = threading.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._finished.wait(timeout)
+
+    def result(self) -> Any:
+        """Block until the work has run and return its value (or raise its error)."""
+        self._finished.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+_jobs: "queue.Queue[Job]" = queue.Queue(MAX_QUEUED)
+# Appended by workers, popped by the game thread; deque ends are thread-safe.
+_completed: Deque[Job] = collections.deque()
+_threads: List[threading.Thread] = []
+# Jobs with a done callback whose completion has not been drained yet.
+_outstanding: Dict[Job, None] = {}
+
+submitted: int = 0
+rejected: int = 0
+cancelled: int = 0
+delivered: int = 0
+# Frames that stopped draining at the budget with completions left over.
+deferred: int = 0
+drain_ns = Histogram()
+
+def _run() -> None:
+    while True:
+        job = _jobs.get()
+        if not job.cancelled:
+            try:
+                job.value = job.work()
+            except BaseException as e:
+                job.error = e
+        job._finished.set()
+        if job.done is not None:
+            _completed.append(job)
+
+def _start() -> None:
+    while len(_threads) < THREADS:
+        t = threading.Thread(target=_run, name=f"arpg_core.worker{len(_threads)}", daemon=True)
+        t.start()
+        _threads.append(t)
+
+def submit(owner: Optional[str], work: Callable[[], Any],
+           done: Optional[Callable[[Any], None]] = None) -> Optional[Job]:
+    """Queue ``work`` for a worker; ``done(value)`` runs on the game thread afterwards. None if full."""
+    global submitted, rejected
+    _start()
+    job = Job(owner, work, done)
+    try:
+        _jobs.put_nowait(job)
+    except queue.Full:
+        rejected += 1
+        return None
+    submitted += 1
+    if done is not None:
+        _outstanding[job] = None
+        frame.every_frame(_TASK, drain)
+    return job
+
+def cancel(owner: str) -> int:
+    """Cancel every job of ``owner`` not finished or not yet delivered."""
+    global cancelled
+    n = 0
+    for job in list(_outstanding):
+        if job.owner == owner and not job.cancelled:
+            job.cancelled = True
+            n += 1
+    # Jobs without a callback are not tracked above; mark the queued ones too.
+    with _jobs.mutex:
+        for job in _jobs.queue:
+            if job.owner == owner and not job.cancelled:
+                job.cancelled = True
+                n += 1
+    cancelled += n
+    return n
+
+def drain() -> int:
+    """Run finished jobs' callbacks until the frame budget is spent; returns how many ran."""
+    global delivered, deferred
+    if not _outstanding:
+        frame.stop(_TASK)
+        return 0
+    if not _completed:
+        return 0
+    perf = time.perf_counter_ns
+    t0 = perf()
+    limit = t0 + int(budget_ms * 1e6)
+    ran = 0
+    # At least one per frame, so a callback longer than the budget still makes progress.
+    while _completed:
+        job = _completed.popleft()
+        _outstanding.pop(job, None)
+        if not job.cancelled and job.error is None:
+            try:
+                job.done(job.value)
+            except Exception:
+                count_error(f"{job.owner or _TASK}.done")
+            ran += 1
+        if perf() >= limit:
+            break
+    delivered += ran
+    if _completed:
+        deferred += 1
+    drain_ns.record(perf() - t0)
+    return ran
+
+def depth() -> int:
+    return _jobs.qsize()
+
+def report() -> str:
+    return (f"workers: {submitted} jobs, {rejected} rejected, {cancelled} cancelled, {delivered} delivered; "
+            f"drain p99 {drain_ns.percentile(99)/1000:.0f}us max {drain_ns.max_ns/1000:.0f}us, "
+            f"{deferred} frames deferred the rest")
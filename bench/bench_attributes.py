@@ -0,0 +1,45 @@
+"""
+AttributeDefinition lookups over a play session.
+
+Enables all three mods against the fake SDK and plays combat, pylon activations
+and map travel. Reports the shared registry's counters and fails if FindObject is
+called more than once per declared path per map (plus the initial batch), i.e.
+if anything resolves attributes outside the registry's batch/reload points.
+
+    python bench/bench_attributes.py
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+import bench_ticks  # noqa: E402
+
+TRAVELS = 4
+TICKS_PER_MAP = 1200
+
+def main() -> int:
+    w = bench_ticks.World()
+    from arpg_core import attributes
+    for m in range(TRAVELS + 1):
+        if m:
+            w.travel(f"Bench{m}_P")
+        for i in range(TICKS_PER_MAP):
+            bench_ticks._combat(w, i)
+            if i % 400 == 0:
+                w.press("PylonsARPG", "Pylon: Drop Anchor Here")
+                w.press("PylonsARPG", "Pylon: Use Nearest")
+            w.tick()
+    finds = w.sdk.stats["FindObject"]
+    declared = len(attributes._known)
+    limit = declared * (TRAVELS + 1)
+    print(attributes.report())
+    print(f"FindObject calls: {finds} for {declared} declared paths over {TRAVELS + 1} maps (limit {limit})")
+    if finds > limit:
+        print("FAIL: attribute lookups outside the registry batch")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""
+Compiled buff plans: values match the formulas they replace, and cost per apply.
+
+For every Per-Kill % / Max Stacks setting and each toggle, changes the option the
+way the options menu does (on_change first, then the value), applies, and checks
+the KillStackHaste plan against ``(1 + p) ** stacks`` and the FOV bump formula.
+Pylon and uber plans are checked against their constants and ubers.json. Then
+times one KillStackHaste apply with the plan vs. the per-tick formula it replaced.
+
+    python bench/bench_buffplan.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+import unrealsdk  # noqa: E402
+from arpg_core import attributes, context, modifiers  # noqa: E402
+
+PCT = {1: 0.025, 2: 0.05, 3: 0.075, 4: 0.10, 5: 0.20}
+APPLIES = 20000
+
+def _close(a: float, b: float) -> bool:
+    return abs(a - b) <= 1e-12 * max(1.0, abs(b))
+
+def check_ksh(ksh) -> list:
+    errors = []
+    toggles = [ksh.AffectReload, ksh.AffectFireRate, ksh.AffectSplashD, ksh.AffectSplashR,
+               ksh.AffectAS_CDR, ksh.UseTimeDilate, ksh.UseFOVBump]
+    paths = [attributes.RELOAD_SPEED, attributes.FIRE_RATE, attributes.SPLASH_DAMAGE, attributes.SPLASH_RADIUS,
+             ksh.ATTR_AS_CDR]
+    for pct in PCT:
+        ksh.PerKillPct.value = pct
+        for max_stacks in range(1, 11):
+            ksh.MaxStacks.value = max_stacks
+            for off in [None] + toggles:
+                for t in toggles:
+                    t.value = t is not off
+                if ksh._plan is not None:
+                    errors.append("plan not invalidated by option change")
+                plan = ksh._compile_plan()
+                for n in range(max_stacks + 1):
+                    mult = (1.0 + PCT[pct]) ** n
+                    for path, t in zip(paths, toggles):
+                        want = mult if t.value else 1.0
+                        if not _close(plan.value(path, n), want):
+                            errors.append(f"{path} pct={pct} n={n}: {plan.value(path, n)} != {want}")
+                    for attr in ["MaxWalkSpeed", "MaxSprintSpeed", attributes.group(ksh.MOVE_GROUP)]:
+                        if not _close(plan.value(attr, n), mult):
+                            errors.append(f"{attr} pct={pct} n={n}")
+                    want = mult if ksh.UseTimeDilate.value else 1.0
+                    if not _close(plan.value("CustomTimeDilation", n), want):
+                        errors.append(f"CustomTimeDilation pct={pct} n={n}")
+                    want = (1.0 + 0.10*(mult-1.0)) if ksh.UseFOVBump.value else 1.0
+                    if not _close(ksh._plan_fov[n], want):
+                        errors.append(f"fov pct={pct} n={n}")
+    return errors
+
+def check_pylons(pylons) -> list:
+    want = {
+        "Frenzy": {"CustomTimeDilation": pylons.FRENZY_MS, attributes.RELOAD_SPEED: pylons.FRENZY_RE,
+                   attributes.FIRE_RATE: pylons.FRENZY_FR},
+        "Conquest": {attributes.SPLASH_DAMAGE: pylons.CONQ_SD, attributes.SPLASH_RADIUS: pylons.CONQ_SR},
+    }
+    errors = []
+    for kind, attrs in want.items():
+        for attr, value in attrs.items():
+            if pylons.PLANS[kind].value(attr, 1) != value or pylons.PLANS[kind].value(attr, 0) != 1.0:
+                errors.append(f"pylon {kind} {attr}")
+    return errors
+
+def check_ubers(ubers) -> list:
+    errors = []
+    for item in ubers.LOOT.items.values():
+        for attr, mult in item.modifiers:
+            if ubers.PLANS[item.name].value(attr, 1) != mult:
+                errors.append(f"uber {item.name} {attr}")
+    return errors
+
+def _formula_apply(ksh, ctx, stacks: int) -> None:
+    # The per-tick body _apply_all had before plans were compiled.
+    mult = (1.0 + {1: 0.025, 2: 0.05, 3: 0.075, 4: 0.10, 5: 0.20}.get(int(ksh.PerKillPct.value), 0.05)) ** stacks
+    cm, pawn, pc = ctx.movement, ctx.pawn, ctx.controller
+    if cm:
+        modifiers.apply(ksh._MOD, cm, "MaxWalkSpeed", mult)
+        modifiers.apply(ksh._MOD, cm, "MaxSprintSpeed", mult)
+    for path in ksh.ATTR_MOVE_CANDIDATES:
+        modifiers.apply(ksh._MOD, pawn, path, mult)
+    modifiers.apply(ksh._MOD, pawn, "CustomTimeDilation", mult if ksh.UseTimeDilate.value else 1.0)
+    for enabled, path in ((ksh.AffectReload.value, attributes.RELOAD_SPEED),
+                          (ksh.AffectFireRate.value, attributes.FIRE_RATE),
+                          (ksh.AffectSplashD.value, attributes.SPLASH_DAMAGE),
+                          (ksh.AffectSplashR.value, attributes.SPLASH_RADIUS),
+                          (ksh.AffectAS_CDR.value, ksh.ATTR_AS_CDR)):
+        modifiers.apply(ksh._MOD, pc, path, mult if enabled else 1.0)
+
+def main() -> int:
+    for path in ("/Game/GameData/Attributes/Weapon/Att_Weapon_ReloadSpeedScale",
+                 "/Game/GameData/Attributes/Movement/Att_CharacterMovementSpeed"):
+        unrealsdk.add_attribute(path)
+    unrealsdk.spawn_player()
+    import KillStackHaste as ksh
+    import PylonsARPG as pylons
+    import UberUniques as ubers
+    ubers._tables()
+    pylons._store.root = tempfile.mkdtemp()
+    errors = check_ksh(ksh) + check_pylons(pylons) + check_ubers(ubers)
+
+    ctx = context.get()
+    ksh.PerKillPct.value = 5
+    ksh.MaxStacks.value = 10
+    plan = ksh._compile_plan()
+    timings = {}
+    for label, fn in (("formula", lambda n: _formula_apply(ksh, ctx, n)),
+                      ("plan", lambda n: plan.apply(ksh._MOD, ctx, n))):
+        t0 = time.perf_counter()
+        for i in range(APPLIES):
+            fn(i % 11)
+        timings[label] = (time.perf_counter() - t0) / APPLIES * 1e6
+        modifiers.flush()
+    print(f"apply per tick: formula {timings['formula']:.2f} us, plan {timings['plan']:.2f} us")
+    if errors:
+        print(f"FAIL: {len(errors)} mismatches, e.g. " + "; ".join(errors[:5]))
+        return 1
+    print("compiled plans match the formulas")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
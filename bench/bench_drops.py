@@ -0,0 +1,71 @@
+"""
+Uber drop scheduling: per-kill roll vs. geometric skip-ahead.
+
+Drives the same kill stream through both modes, checks that the skip-ahead drop
+count is statistically indistinguishable from the expected 1/n rate (|z| < 4),
+and reports the per-kill cost of each.
+
+    python bench/bench_drops.py
+"""
+import importlib.util
+import math
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KILLS = 2_000_000
+BATCH = 8
+Z_LIMIT = 4.0
+
+def _load_loot():
+    path = os.path.join(ROOT, "UberUniques", "loot.py")
+    spec = importlib.util.spec_from_file_location("uber_loot", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def per_kill(rng, one_in):
+    drops = 0
+    for _ in range(KILLS):
+        if rng.randint(1, one_in) == 1:
+            drops += 1
+    return drops
+
+def skip_ahead(loot, rng, one_in):
+    drops = 0
+    gap = loot.kills_until_drop(rng, one_in)
+    for _ in range(KILLS // BATCH):
+        left = BATCH
+        while gap <= left:
+            left -= gap
+            drops += 1
+            gap = loot.kills_until_drop(rng, one_in)
+        gap -= left
+    return drops
+
+def main() -> int:
+    loot = _load_loot()
+    failed = False
+    print(f"{'1/n':>6} {'expected':>9} {'per-kill':>9} {'skip':>9} {'z':>6} {'per-kill ns':>12} {'skip ns':>9}")
+    for one_in in (100, 1000, 5000):
+        expected = KILLS / one_in
+        sd = math.sqrt(KILLS * (1 / one_in) * (1 - 1 / one_in))
+        t0 = time.perf_counter()
+        a = per_kill(random.Random(1), one_in)
+        t1 = time.perf_counter()
+        b = skip_ahead(loot, random.Random(2), one_in)
+        t2 = time.perf_counter()
+        z = (b - expected) / sd
+        print(f"{one_in:>6} {expected:>9.0f} {a:>9} {b:>9} {z:>6.2f} "
+              f"{(t1 - t0) / KILLS * 1e9:>12.1f} {(t2 - t1) / KILLS * 1e9:>9.1f}")
+        if abs(z) > Z_LIMIT:
+            failed = True
+    if failed:
+        print("FAIL: skip-ahead drop rate deviates from 1/n")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Session state journal: game-thread cost per write, and recovery after a crash.
+
+Appends a stream of state changes to one journal and reports the mean and worst
+time the game thread spends in ``set()``, while background compactions run, next
+to opening the file for every record. Then plays a short session (kills, a pylon
+buff, an uber) in a fresh interpreter and exits without disabling anything, as a
+crash would. A second interpreter starts from the same journals with the buffed
+values still stuck on the character, enables the mods and checks that stacks,
+the uber and the pylon buff are back and that each attribute is buffed once from
+its true base, not on top of the stuck value; disabling must leave the base.
+
+    python bench/bench_journal.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+WRITES = 20000
+KEYS = 8
+# The game thread may not wait on a compaction: worst set() must stay near an append.
+MAX_WRITE_MS = 5.0
+
+def bench_writes() -> dict:
+    from arpg_core.journal import Journal
+    with tempfile.TemporaryDirectory() as root:
+        j = Journal("bench", root)
+        j.load()
+        worst = 0.0
+        t0 = time.perf_counter()
+        for i in range(WRITES):
+            t = time.perf_counter()
+            j.set(i % 4, f"k{i % KEYS}", float(i), 10.0, "Frenzy")
+            worst = max(worst, time.perf_counter() - t)
+        mean = (time.perf_counter() - t0) / WRITES
+        j.close()
+        size = os.path.getsize(j.path())
+        live = dict((k, e.value) for k, e in j.live.items())
+        replay = dict((k, e.value) for k, e in Journal("bench", root).load().items())
+        path = os.path.join(root, "naive.bin")
+        t0 = time.perf_counter()
+        for i in range(WRITES // 10):
+            with open(path, "ab") as f:
+                f.write(b"x" * 40)
+        naive = (time.perf_counter() - t0) / (WRITES // 10)
+    return {"mean": mean * 1e6, "worst": worst * 1e3, "naive": naive * 1e6, "size": size,
+            "ok": replay == live}
+
+def _snapshot(w) -> dict:
+    pc, pawn = w.pc, w.pc.Pawn
+    return {
+        "pc": dict(object.__getattribute__(pc, "attributes")),
+        "pawn": dict(object.__getattribute__(pawn, "attributes")),
+        "dilation": object.__getattribute__(pawn, "_props")["CustomTimeDilation"],
+        "walk": object.__getattribute__(pawn.CharacterMovement, "_props")["MaxWalkSpeed"],
+        "fov": object.__getattribute__(w.camera, "fov"),
+    }
+
+def _state() -> dict:
+    ksh, pylons, ubers = (sys.modules[m] for m in ("KillStackHaste", "PylonsARPG", "UberUniques"))
+    return {
+        "stacks": [st.stacks for st in ksh._session.states.values()],
+        "uber": [st.active.name if st.active else None for st in ubers._session.states.values()],
+        "pylons": sorted(b["type"] for b in pylons._active),
+    }
+
+def play(state_dir: str) -> None:
+    import bench_ticks
+    w = bench_ticks.World(state_dir)
+    ubers = sys.modules["UberUniques"]
+    w.kill(6)
+    w.press("PylonsARPG", "Pylon: Drop Anchor Here")
+    for _ in range(30):
+        w.tick()
+    w.press("PylonsARPG", "Pylon: Use Nearest")
+    from arpg_core import context
+    ubers._grant_uber(next(iter(ubers._tables().items.values())), context.get())
+    for _ in range(5):
+        w.tick()
+    print(json.dumps({"values": _snapshot(w), "state": _state()}))
+    sys.stdout.flush()
+    os._exit(0)  # no on_disable, no journal close: as if the game crashed
+
+def resume(state_dir: str, stuck: dict) -> None:
+    import bench_ticks
+
+    def leave_stuck(pc) -> None:
+        object.__getattribute__(pc, "attributes").update(stuck["pc"])
+        pawn = pc.Pawn
+        object.__getattribute__(pawn, "attributes").update(stuck["pawn"])
+        object.__getattribute__(pawn, "_props")["CustomTimeDilation"] = stuck["dilation"]
+        object.__getattribute__(pawn.CharacterMovement, "_props")["MaxWalkSpeed"] = stuck["walk"]
+        object.__setattr__(pc.PlayerCameraManager, "fov", stuck["fov"])
+
+    w = bench_ticks.World(state_dir, leave_stuck)
+    for _ in range(5):
+        w.tick()
+    from arpg_core import bases
+    out = {"values": _snapshot(w), "state": _state(), "restored": bases.restored}
+    for mod in w.mods.values():
+        mod.disable()
+    out["after_disable"] = _snapshot(w)
+    print(json.dumps(out))
+
+def _close(a, b) -> bool:
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[k], b[k]) for k in a)
+    return abs(a - b) <= 1e-9 * max(1.0, abs(b))
+
+def main(argv: list) -> int:
+    if argv[:1] == ["--play"]:
+        play(argv[1])
+        return 0
+    if argv[:1] == ["--resume"]:
+        resume(argv[1], json.loads(argv[2]))
+        return 0
+    failed = []
+    r = bench_writes()
+    print(f"set(): mean {r['mean']:.2f} us, worst {r['worst']:.2f} ms over {WRITES} writes "
+          f"({r['size']} bytes on disk after compaction); open+append+close {r['naive']:.2f} us")
+    if not r["ok"]:
+        failed.append("replay does not match the live entries")
+    if r["worst"] > MAX_WRITE_MS:
+        failed.append(f"worst write {r['worst']:.2f} ms > {MAX_WRITE_MS} ms")
+
+    with tempfile.TemporaryDirectory() as state_dir:
+        me = os.path.abspath(__file__)
+        out = subprocess.run([sys.executable, me, "--play", state_dir], capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr)
+            return 1
+        before = json.loads(out.stdout.strip().splitlines()[-1])
+        out = subprocess.run([sys.executable, me, "--resume", state_dir, json.dumps(before["values"])],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr)
+            return 1
+        after = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"before crash: {before['state']}")
+    print(f"after resume: {after['state']}  ({after['restored']} base values written back)")
+    print(f"walk speed {before['values']['walk']:.1f} -> {after['values']['walk']:.1f}, "
+          f"after disable {after['after_disable']['walk']:.1f}")
+    if after["state"] != before["state"]:
+        failed.append("state not restored")
+    if not _close(after["values"], before["values"]):
+        failed.append(f"buffed values differ after resume: {after['values']} vs {before['values']}")
+    base = {"pc": {k: 1.0 for k in before["values"]["pc"]}, "pawn": {k: 1.0 for k in before["values"]["pawn"]},
+            "dilation": 1.0, "walk": 600.0, "fov": 90.0}
+    if not _close(after["after_disable"], base):
+        failed.append(f"true bases not back after disable: {after['after_disable']}")
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
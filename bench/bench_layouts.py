@@ -0,0 +1,114 @@
+"""
+Pylon layout store: map-entry load time and drop-anchor append time with many
+maps on disk.
+
+Writes ``MAPS`` layouts of ``ANCHORS`` anchors each into a temp dir, then times
+loading a single map (what a map transition pays) and appending one record (what
+'Drop Anchor Here' or an activation pays). Then piles superseded records onto one
+map, loads it (compaction goes to a worker), keeps appending while the
+compaction runs and checks nothing appended meanwhile is lost. Last, checks a
+saved cooldown comes back with the time it has left in later sessions, is gone
+once that ran out, and is left out when the file is compacted. Fails if a
+budget is exceeded, a record goes missing or a cooldown outlives its deadline.
+
+    python bench/bench_layouts.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+from PylonsARPG import layouts  # noqa: E402
+from PylonsARPG.spatial import Anchor  # noqa: E402
+
+MAPS = 500
+ANCHORS = 200
+LOAD_BUDGET_MS = 20.0
+APPEND_BUDGET_MS = 2.0
+COOLDOWN_S = 0.2
+
+def main() -> int:
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as root:
+        store = layouts.LayoutStore(root)
+        for m in range(MAPS):
+            name = f"Map{m:03d}_P"
+            anchors = [Anchor(name, rng.uniform(-1e5, 1e5), rng.uniform(-1e5, 1e5), 0.0,
+                              rng.choice(layouts.TYPES), 0.0, i) for i in range(ANCHORS)]
+            store.write_all(name, anchors, {i: 30.0 for i in range(0, ANCHORS, 10)})
+        size = sum(os.path.getsize(os.path.join(root, f)) for f in os.listdir(root))
+
+        t0 = time.perf_counter()
+        for m in range(0, MAPS, 5):
+            layout = store.load(f"Map{m:03d}_P")
+            assert layout is not None and len(layout.anchors) == ANCHORS
+        load_ms = (time.perf_counter() - t0) / (MAPS // 5) * 1e3
+
+        a = Anchor("Map000_P", 1.0, 2.0, 3.0, "Frenzy", 0.0, ANCHORS)
+        t0 = time.perf_counter()
+        for _ in range(200):
+            store.append("Map000_P", layouts.OP_COOLDOWN, a, 180.0)
+        append_ms = (time.perf_counter() - t0) / 200 * 1e3
+
+        for _ in range(600):
+            store.append("Map000_P", layouts.OP_COOLDOWN, a, 180.0)
+        before = os.path.getsize(store.path("Map000_P"))
+        t0 = time.perf_counter()
+        store.load("Map000_P")
+        compact_load_ms = (time.perf_counter() - t0) * 1e3
+        for i in range(50):
+            store.append("Map000_P", layouts.OP_ADD, Anchor("Map000_P", 0.0, 0.0, 0.0, "Frenzy", 0.0, ANCHORS + 1 + i))
+        store.wait()
+        after = os.path.getsize(store.path("Map000_P"))
+        kept = len(store.load("Map000_P").anchors)
+
+        short = Anchor("Cool_P", 0.0, 0.0, 0.0, "Frenzy", 0.0, 1)
+        long = Anchor("Cool_P", 9.0, 0.0, 0.0, "Frenzy", 0.0, 2)
+        store.append("Cool_P", layouts.OP_ADD, short)
+        store.append("Cool_P", layouts.OP_ADD, long)
+        store.append("Cool_P", layouts.OP_COOLDOWN, short, COOLDOWN_S)
+        store.append("Cool_P", layouts.OP_COOLDOWN, long, 180.0)
+        sessions = [store.load("Cool_P").cooldowns]
+        time.sleep(COOLDOWN_S * 1.5)
+        # Enough superseded records (an anchor dropped and removed) that the next load compacts.
+        temp = Anchor("Cool_P", 5.0, 0.0, 0.0, "Frenzy", 0.0, 3)
+        for _ in range(15):
+            store.append("Cool_P", layouts.OP_ADD, temp)
+            store.append("Cool_P", layouts.OP_REMOVE, temp)
+        sessions.append(store.load("Cool_P").cooldowns)
+        store.wait()
+        sessions.append(store.load("Cool_P").cooldowns)
+        records = store.load("Cool_P").records
+
+    print(f"{MAPS} maps x {ANCHORS} anchors, {size / 1024:.0f} KiB on disk")
+    print(f"load one map: {load_ms:.2f} ms   append one record: {append_ms:.3f} ms")
+    print(f"load needing compaction: {compact_load_ms:.2f} ms on the game thread; "
+          f"{before} -> {after} bytes, {kept} anchors after appends during compaction")
+    print(f"cooldowns over three sessions: {[{u: round(l, 2) for u, l in c.items()} for c in sessions]}; "
+          f"{records} records after compaction")
+    failed = []
+    if 1 not in sessions[0] or any(1 in c for c in sessions[1:]):
+        failed.append("a cooldown came back after it ran out")
+    if not all(179.0 < c.get(2, 0.0) <= 180.0 for c in sessions) or not sessions[2][2] < sessions[0][2]:
+        failed.append("a running cooldown did not resume with the time it had left")
+    if records != 3:
+        failed.append(f"compacted file holds {records} records, not 2 anchors and 1 cooldown")
+    if kept != ANCHORS + 50:
+        failed.append(f"{ANCHORS + 50 - kept} anchors appended during compaction lost")
+    if after >= before:
+        failed.append("file not compacted")
+    if load_ms > LOAD_BUDGET_MS:
+        failed.append(f"load {load_ms:.2f} ms > {LOAD_BUDGET_MS}")
+    if append_ms > APPEND_BUDGET_MS:
+        failed.append(f"append {append_ms:.3f} ms > {APPEND_BUDGET_MS}")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
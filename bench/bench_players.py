@@ -0,0 +1,120 @@
+"""
+Per-frame cost with 1 to 4 local (split-screen) players.
+
+Each player count runs in a fresh interpreter with all three mods enabled. Every
+frame dispatches PlayerTick once per local controller, as the engine does, and
+kills are made by the even-numbered players in turn, credited through the hook's
+instigator; an AI ally makes kills too. Reports SDK calls and wall time per
+frame; fails if an odd-numbered player ends up with stacks (a kill credited to
+the wrong player), if a killer has none, if the kill bus still holds victims
+after the last delivery, or if cost per frame grows faster than ``SLOPE`` times the one-player
+cost per added player.
+
+    python bench/bench_players.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SDK = os.path.join(ROOT, "bench", "fake_sdk")
+
+DT = 1.0 / 60.0
+PLAYER_TICK = "/Script/OakGame.OakPlayerController:PlayerTick"
+DIED = "/Script/OakGame.OakCharacter:Died"
+WARMUP = 120
+FRAMES = 1200
+# Allowed cost per frame at N players: one-player cost * (1 + SLOPE * (N - 1)).
+SLOPE = 1.5
+# Wall time is the best of this many runs, to keep scheduler noise out of the slope check.
+RUNS = 3
+
+class HookArgs:
+    __slots__ = ("InstigatedBy",)
+
+    def __init__(self, instigator) -> None:
+        self.InstigatedBy = instigator
+
+def run(players: int) -> dict:
+    sys.path[:0] = [FAKE_SDK, ROOT]
+    import unrealsdk
+    import mods_base
+    unrealsdk.add_attribute("/Game/GameData/Attributes/Weapon/Att_Weapon_FireRateScale")
+    pcs = [unrealsdk.spawn_player(loc=(i * 3000.0, 0.0, 0.0)) for i in range(players)]
+    import KillStackHaste as ksh
+    import PylonsARPG  # noqa: F401
+    import UberUniques  # noqa: F401
+    PylonsARPG._store.root = tempfile.mkdtemp()
+    from arpg_core import bases
+    for journal in (ksh._session.journal, PylonsARPG._session.journal, UberUniques._session.journal, bases._journal):
+        journal.root = PylonsARPG._store.root
+    for mod in mods_base.mods.values():
+        mod.enable()
+    worlds = [pc.GetWorldInfo() for pc in pcs]
+    ally = unrealsdk.Enemy("Ally", hostile=False)
+
+    def frame(i: int) -> None:
+        for w in worlds:
+            object.__getattribute__(w, "_props")["TimeSeconds"] += DT
+        if i % 30 == 0:
+            killer = pcs[2 * ((i // 30) % ((players + 1) // 2))]
+            unrealsdk.hooks.dispatch(DIED, unrealsdk.Enemy(), HookArgs(killer.Pawn))
+        elif i % 30 == 15:
+            unrealsdk.hooks.dispatch(DIED, unrealsdk.Enemy(), HookArgs(ally))
+        for pc in pcs:
+            unrealsdk.hooks.dispatch(PLAYER_TICK, pc)
+
+    for i in range(WARMUP):
+        frame(i)
+    unrealsdk.reset_stats()
+    t0 = time.perf_counter()
+    for i in range(WARMUP, WARMUP + FRAMES):
+        frame(i)
+    elapsed = time.perf_counter() - t0
+    stacks = [st.stacks for st in sorted(ksh._session.states.values(), key=lambda st: st.ctx.index)]
+    from arpg_core import kills
+    return {"calls": unrealsdk.total_calls() / FRAMES, "us": elapsed / FRAMES * 1e6, "stacks": stacks,
+            "seen": len(kills._seen)}
+
+def main(argv: list) -> int:
+    if argv[:1] == ["--child"]:
+        print(json.dumps(run(int(argv[1]))))
+        return 0
+    failed = []
+    base = None
+    print(f"{'players':>7} {'calls/frame':>12} {'us/frame':>9}  stacks")
+    for n in range(1, 5):
+        runs = []
+        for _ in range(RUNS):
+            out = subprocess.run([sys.executable, __file__, "--child", str(n)], capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{n:>7} crashed:\n{out.stderr}")
+                break
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        if len(runs) < RUNS:
+            failed.append(f"{n} players crashed")
+            continue
+        r = min(runs, key=lambda run: run["us"])
+        print(f"{n:>7} {r['calls']:>12.2f} {r['us']:>9.1f}  {r['stacks']}")
+        want = [i % 2 == 0 for i in range(n)]
+        if [s > 0 for s in r["stacks"]] != want:
+            failed.append(f"{n} players: kills credited to the wrong players ({r['stacks']})")
+        if r["seen"]:
+            failed.append(f"{n} players: {r['seen']} victims left in the kill bus's dedup set")
+        if base is None:
+            base = r
+            continue
+        allowed = 1 + SLOPE * (n - 1)
+        for key in ("calls", "us"):
+            if r[key] > base[key] * allowed:
+                failed.append(f"{n} players: {key} {r[key]:.1f} > {allowed:.2f} x {base[key]:.1f}")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,101 @@
+"""
+Nearest-pylon query cost vs. anchor count.
+
+Compares the old linear scan with PylonsARPG.spatial.AnchorGrid, and times one
+Proximity update (the per-render-pass enter/exit check) along a walk. Grid query
+time should stay flat as the map fills up; the run fails if it grows more than
+``FLAT_FACTOR`` times between the smallest and largest anchor counts. Also
+fails if an anchor still in range enters twice when another one is dropped from
+the grid (region eviction), or if the nearest usable anchor is past the enter radius.
+
+    python bench/bench_spatial.py
+"""
+import importlib.util
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COUNTS = [10, 100, 1000, 5000]
+QUERIES = 2000
+WORLD = 200_000.0
+RANGE = 1200.0
+FLAT_FACTOR = 4.0
+
+def _load_spatial():
+    path = os.path.join(ROOT, "PylonsARPG", "spatial.py")
+    spec = importlib.util.spec_from_file_location("pylons_spatial", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def _linear(anchors, me, within):
+    best, bestd = None, 9e9
+    for a in anchors:
+        dx, dy, dz = a.x - me[0], a.y - me[1], a.z - me[2]
+        d = (dx*dx + dy*dy + dz*dz) ** 0.5
+        if d < bestd and d <= within:
+            best, bestd = a, d
+    return best
+
+def check_proximity(spatial) -> list:
+    failed = []
+    grid = spatial.AnchorGrid()
+    kept, evicted = spatial.Anchor("Bench_P", 0.0, 0.0, 0.0, "Frenzy"), spatial.Anchor("Bench_P", 600.0, 0.0, 0.0, "Frenzy")
+    grid.insert(kept)
+    grid.insert(evicted)
+    prox = spatial.Proximity(RANGE, RANGE * 1.25)
+    prox.update(grid, 0.0, 0.0, 0.0)
+    grid.remove(evicted)
+    prox.forget([evicted])
+    entered, _ = prox.update(grid, 0.0, 0.0, 0.0)
+    if entered:
+        failed.append("an anchor still in range entered again after another was evicted")
+    # Past the enter radius but inside the exit band: still "near", not usable.
+    prox.update(grid, RANGE * 1.1, 0.0, 0.0)
+    if kept not in prox.near or prox.nearest()[0] is not None:
+        failed.append("nearest usable anchor reaches past the enter radius")
+    return failed
+
+def main() -> int:
+    spatial = _load_spatial()
+    rng = random.Random(1234)
+    points = [(rng.uniform(0, WORLD), rng.uniform(0, WORLD), 0.0) for _ in range(QUERIES)]
+    grid_us = []
+    print(f"{'anchors':>8} {'linear us':>10} {'grid us':>10} {'prox us':>10}")
+    for n in COUNTS:
+        grid = spatial.AnchorGrid()
+        flat = []
+        for _ in range(n):
+            a = spatial.Anchor("Bench_P", rng.uniform(0, WORLD), rng.uniform(0, WORLD), 0.0, "Frenzy")
+            grid.insert(a)
+            flat.append(a)
+        for p in points[:50]:
+            assert grid.nearest(p[0], p[1], p[2], RANGE)[0] is _linear(flat, p, RANGE)
+        t0 = time.perf_counter()
+        for p in points:
+            _linear(flat, p, RANGE)
+        t1 = time.perf_counter()
+        for p in points:
+            grid.nearest(p[0], p[1], p[2], RANGE)
+        t2 = time.perf_counter()
+        prox = spatial.Proximity(RANGE, RANGE * 1.25)
+        x, y = points[0][0], points[0][1]
+        t3 = time.perf_counter()
+        for i in range(QUERIES):
+            prox.update(grid, x + i * 60.0, y, 0.0)
+        t4 = time.perf_counter()
+        lin, grd = (t1 - t0) / QUERIES * 1e6, (t2 - t1) / QUERIES * 1e6
+        grid_us.append(grd)
+        print(f"{n:>8} {lin:>10.2f} {grd:>10.2f} {(t4 - t3) / QUERIES * 1e6:>10.2f}")
+    failed = check_proximity(spatial)
+    print(f"proximity: {'ok' if not failed else 'WRONG'} (enter once across evictions, nearest within enter radius)")
+    if grid_us[-1] > grid_us[0] * FLAT_FACTOR:
+        failed.append(f"grid query grew {grid_us[-1] / grid_us[0]:.1f}x from {COUNTS[0]} to {COUNTS[-1]} anchors")
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
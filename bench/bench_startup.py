@@ -0,0 +1,176 @@
+"""
+Startup cost of the three mods on the shared core.
+
+Each load runs in a fresh interpreter against the fake SDK and times importing
+and enabling ``arpg_core`` and all three mods; the best of ``RUNS`` runs is
+reported. ``--baseline DIR`` times another checkout of the mods the same way
+(e.g. ``git worktree add /tmp/before <rev>``) and prints the difference, so a
+change is compared against real earlier code rather than against the shared
+core loaded once per mod.
+
+Also fails if any module from this repo is executed more than once when all
+three mods are enabled, or if importing the mods (before enabling them) parses
+the loot tables, starts worker threads, opens a journal or reads a pylon layout.
+Last, reports what the modules that stay imported at load (every session needs
+them by the end of enable) cost, from ``python -X importtime``.
+
+    python bench/bench_startup.py
+    python bench/bench_startup.py --baseline /tmp/before
+"""
+import importlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SDK = os.path.join(ROOT, "bench", "fake_sdk")
+
+MODS = ["KillStackHaste", "PylonsARPG", "UberUniques"]
+RUNS = 5
+# Imported at load although only used from enable on; their cost is reported.
+EAGER = ["arpg_core.trace", "arpg_core.telemetry", "arpg_core.workers",
+         "PylonsARPG.layouts", "PylonsARPG.regions", "PylonsARPG.render"]
+
+def _journal_of(mod):
+    # Older checkouts kept the journal on the module rather than on a Session.
+    session = getattr(mod, "_session", None)
+    return session.journal if session is not None else mod._journal
+
+def _count_execs(root: str) -> dict:
+    # Every module body executed from source, by file; a module imported under two
+    # names (or reloaded) shows up as a count above one.
+    from importlib.machinery import SourceFileLoader
+    execs: dict = {}
+    exec_module = SourceFileLoader.exec_module
+
+    def counted(self, module) -> None:
+        path = os.path.relpath(os.path.realpath(self.path), root)
+        execs[path] = execs.get(path, 0) + 1
+        exec_module(self, module)
+
+    SourceFileLoader.exec_module = counted
+    return execs
+
+def _eager_work(loaded: list) -> dict:
+    # Work that should wait for enable or first use, found after import.
+    from arpg_core import workers
+    found = {"worker threads": len(workers._threads)}
+    if "UberUniques" in loaded:
+        found["loot tables parsed"] = int(sys.modules["UberUniques"].LOOT is not None)
+    if "PylonsARPG" in loaded:
+        found["pylon layouts read"] = len(sys.modules["PylonsARPG"]._index)
+    found["journals open"] = sum(1 for m in loaded if _journal_of(sys.modules[m])._file is not None)
+    return found
+
+def child(root: str, mods: list) -> dict:
+    sys.path[:0] = [FAKE_SDK, root]
+    execs = _count_execs(root)
+    import unrealsdk
+    import mods_base
+    import bench_ticks
+    for path in bench_ticks.ATTRIBUTES:
+        unrealsdk.add_attribute(path)
+    unrealsdk.spawn_player()
+    perf = time.perf_counter
+    imported, enabled = {}, {}
+    for name in ["arpg_core"] + mods:
+        t0 = perf()
+        importlib.import_module(name)
+        imported[name] = (perf() - t0) * 1e3
+    eager = _eager_work(mods) if root == ROOT else {}
+    from arpg_core import bases
+    tmp = tempfile.TemporaryDirectory()
+    bases._journal.root = tmp.name
+    for name in mods:
+        _journal_of(sys.modules[name]).root = tmp.name
+    if "PylonsARPG" in mods:
+        sys.modules["PylonsARPG"]._store.root = tmp.name
+    for name in ["arpg_core"] + mods:
+        t0 = perf()
+        mods_base.mods[name].enable()
+        enabled[name] = (perf() - t0) * 1e3
+    first_use = 0.0
+    if "UberUniques" in mods:
+        # The first kill needs the loot tables.
+        t0 = perf()
+        sys.modules["UberUniques"]._tables()
+        first_use = (perf() - t0) * 1e3
+    return {"import": imported, "enable": enabled, "first_use": first_use, "eager": eager,
+            "execs": {p: n for p, n in execs.items() if not p.startswith("..") and not p.startswith("bench")}}
+
+def _run(root: str, mods: list) -> dict:
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", root] + mods,
+                         capture_output=True, text=True, cwd=root)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _total(r: dict) -> float:
+    return sum(r["import"].values()) + sum(r["enable"].values()) + r["first_use"]
+
+def _best(root: str, mods: list) -> dict:
+    return min((_run(root, mods) for _ in range(RUNS)), key=_total)
+
+def _import_times() -> dict:
+    # name -> (self us, cumulative us), cumulative including stdlib modules it was first to import.
+    out = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child", ROOT] + MODS,
+                         capture_output=True, text=True, cwd=ROOT)
+    times = {}
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            own, total, name = line[len("import time:"):].split("|")
+            if own.strip().isdigit():
+                times[name.strip()] = (int(own), int(total))
+    return times
+
+def eager_cost() -> dict:
+    runs = [_import_times() for _ in range(RUNS)]
+    return {m: min((r[m] for r in runs if m in r), key=lambda t: t[1]) for m in EAGER}
+
+def main(argv: list) -> int:
+    if argv[:1] == ["--child"]:
+        print(json.dumps(child(argv[1], argv[2:])))
+        return 0
+    baseline = os.path.abspath(argv[argv.index("--baseline") + 1]) if "--baseline" in argv else None
+    failed = []
+    print(f"{'load':<16} {'core ms':>8} {'import ms':>10} {'enable ms':>10} {'first use':>10} {'total ms':>9}")
+
+    def row(label: str, r: dict, mods: list) -> None:
+        core = r["import"]["arpg_core"] + r["enable"]["arpg_core"]
+        imp = sum(r["import"][m] for m in mods)
+        en = sum(r["enable"][m] for m in mods)
+        print(f"{label:<16} {core:>8.2f} {imp:>10.2f} {en:>10.2f} {r['first_use']:>10.2f} {_total(r):>9.2f}")
+
+    shared = _best(ROOT, MODS)
+    row("this tree", shared, MODS)
+    if baseline is not None:
+        before = _best(baseline, MODS)
+        row("baseline", before, MODS)
+        diff = _total(shared) - _total(before)
+        print(f"this tree vs {baseline}: {diff:+.2f} ms ({100 * diff / _total(before):+.0f}%)")
+
+    core = {p: n for p, n in shared["execs"].items() if p.startswith("arpg_core")}
+    twice = sorted(p for p, n in shared["execs"].items() if n > 1)
+    print(f"all three enabled: {len(shared['execs'])} modules executed, {len(core)} of them shared core modules")
+    if twice:
+        failed.append(f"executed more than once: {', '.join(twice)}")
+    cost = eager_cost()
+    own = sum(c[0] for c in cost.values()) / 1000
+    total = sum(c[1] for c in cost.values()) / 1000
+    print("imported at load, used from enable on (self / with stdlib deps, ms): "
+          + ", ".join(f"{m} {c[0] / 1000:.2f}/{c[1] / 1000:.2f}" for m, c in cost.items()))
+    print(f"  together {own:.2f} ms self, {total:.2f} ms with deps, of {_total(shared):.2f} ms startup; "
+          f"importing them on first use would move this to enable, not save it")
+    eager = {k: v for k, v in shared["eager"].items() if v}
+    print(f"before enable: {', '.join(f'{k} {v}' for k, v in shared['eager'].items())}")
+    if eager:
+        failed.append(f"import did work that should wait: {', '.join(eager)}")
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,151 @@
+"""
+Telemetry rings: per-event cost, allocation, and the rolling metrics.
+
+Times ``telemetry.record`` against an empty call with the same arguments and
+against recording switched off, and fails if an event costs more than
+``MAX_RECORD_NS`` over the call itself. Records a long run into a full ring
+under ``tracemalloc`` and fails if memory grows. Then checks kills/min,
+time-weighted average and uptime on synthetic series with known answers, that
+a ring keeps only its newest samples in order, that the session clock keeps
+running when world time restarts on map travel, and times ``summary`` and
+``snapshot`` with every ring full.
+
+    python bench/bench_telemetry.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+from arpg_core import telemetry  # noqa: E402
+
+EVENTS = 200000
+# Event cost over a plain function call; a hook already pays several microseconds.
+MAX_RECORD_NS = 1000
+# Allowed net growth while recording into full rings (tracemalloc's own noise).
+MAX_GROWTH_BYTES = 1024
+
+def _noop(r, t, v) -> None:
+    pass
+
+def _loop(fn, r) -> float:
+    t = 0.0
+    t0 = time.perf_counter_ns()
+    for i in range(EVENTS):
+        t += 0.01
+        fn(r, t, 1.0)
+    return (time.perf_counter_ns() - t0) / EVENTS
+
+def bench_record() -> dict:
+    r = telemetry.Ring("bench", telemetry.EVENT, telemetry.DEFAULT_SIZE)
+    best = {"noop": float("inf"), "on": float("inf"), "off": float("inf")}
+    for _ in range(5):
+        telemetry.reset()
+        best["noop"] = min(best["noop"], _loop(_noop, r))
+        telemetry.enabled = True
+        best["on"] = min(best["on"], _loop(telemetry.record, r))
+        telemetry.enabled = False
+        best["off"] = min(best["off"], _loop(telemetry.record, r))
+    telemetry.enabled = True
+    return best
+
+def bench_alloc() -> int:
+    telemetry.reset()
+    rings = [telemetry.Ring(f"alloc{i}", telemetry.LEVEL, 256) for i in range(4)]
+    # Fill every ring first; the measured run only overwrites.
+    for r in rings:
+        for i in range(r.size):
+            telemetry.record(r, float(i), 1.0)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    t = 1000.0
+    for i in range(EVENTS // 2):
+        t += 0.01
+        telemetry.record(rings[i & 3], t, float(i & 7))
+    growth = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return growth
+
+def check_metrics() -> list:
+    failed = []
+    telemetry.reset()
+    kills = telemetry.Ring("kills", telemetry.EVENT, 1024)
+    # 2 kills a second for 60 s, then a quiet minute.
+    for i in range(120):
+        telemetry.record(kills, i * 0.5)
+    if abs(telemetry.rate(kills, 60.0) - 120.0) > 1e-9:
+        failed.append(f"kills/min over a busy minute: {telemetry.rate(kills, 60.0)}")
+    if telemetry.rate(kills, 121.0):
+        failed.append("kills/min after a quiet minute is not 0")
+
+    # Stacks: 0 until 10 s, 3 until 40 s, 0 to the end of the minute.
+    stacks = telemetry.Ring("stacks", telemetry.LEVEL, 16)
+    for t, v in ((0.0, 0), (10.0, 3), (40.0, 0)):
+        stacks.push(t, v)
+    avg, up = telemetry.average(stacks, 60.0), telemetry.uptime(stacks, 60.0)
+    if abs(avg - 1.5) > 1e-9 or abs(up - 0.5) > 1e-9:
+        failed.append(f"stacks average {avg:.3f} (want 1.5), uptime {up:.3f} (want 0.5)")
+    # A window reaching back before the first sample only counts covered time.
+    if abs(telemetry.uptime(stacks, 30.0) - 20.0 / 30.0) > 1e-9:
+        failed.append(f"uptime with a partly covered window: {telemetry.uptime(stacks, 30.0):.3f}")
+
+    wrap = telemetry.Ring("wrap", telemetry.LEVEL, 8)
+    for i in range(20):
+        wrap.push(float(i), float(i))
+    if [v for _, v in wrap.samples()] != [float(i) for i in range(12, 20)] or wrap.total != 20:
+        failed.append(f"wrapped ring holds {list(wrap.samples())}")
+
+    telemetry.reset()
+    travel = telemetry.Ring("travel", telemetry.EVENT, 16)
+    for t in (100.0, 101.0, 2.0, 3.0):
+        telemetry.record(travel, t)
+    times = [t for t, _ in travel.samples()]
+    if times != sorted(times) or times[-1] - times[-2] != 1.0:
+        failed.append(f"session clock after map travel: {times}")
+    return failed
+
+def bench_export() -> tuple:
+    telemetry.reset()
+    names = ["kills", "UberUniques.drops"] + [f"Mod.level P{i}" for i in range(8)]
+    for n, name in enumerate(names):
+        r = telemetry.ring(name, telemetry.EVENT if n < 2 else telemetry.LEVEL)
+        for i in range(r.size * 2):
+            telemetry.record(r, i * 0.1, float(i % 5))
+    now = telemetry._last
+    t0 = time.perf_counter()
+    telemetry.summary(now)
+    summary_ms = (time.perf_counter() - t0) * 1e3
+    t0 = time.perf_counter()
+    text = telemetry.snapshot(now)
+    snapshot_ms = (time.perf_counter() - t0) * 1e3
+    return summary_ms, snapshot_ms, len(text.splitlines()) - 1, len(text)
+
+def main() -> int:
+    failed = []
+    ns = bench_record()
+    cost = ns["on"] - ns["noop"]
+    print(f"record: {ns['on']:.0f} ns/event, {cost:.0f} ns over an empty call ({ns['noop']:.0f} ns); "
+          f"{ns['off'] - ns['noop']:.0f} ns with telemetry off")
+    if cost > MAX_RECORD_NS:
+        failed.append(f"record costs {cost:.0f} ns over a call (budget {MAX_RECORD_NS} ns)")
+
+    growth = bench_alloc()
+    print(f"{EVENTS // 2} events into full rings: {growth} bytes net allocated")
+    if growth > MAX_GROWTH_BYTES:
+        failed.append(f"recording grew memory by {growth} bytes")
+
+    metric_failures = check_metrics()
+    print(f"metrics: {'ok' if not metric_failures else 'WRONG'} (kills/min, average, uptime, wrap, map travel)")
+    failed.extend(metric_failures)
+
+    summary_ms, snapshot_ms, rows, size = bench_export()
+    print(f"10 full rings: summary {summary_ms:.2f} ms, snapshot {snapshot_ms:.2f} ms ({rows} rows, {size} bytes)")
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Per-tick cost of KillStackHaste, PylonsARPG and UberUniques against the fake SDK.
+
+Each scenario runs in a fresh interpreter with all three mods enabled and drives
+a stream of PlayerTick, kill and keybind events through the hooks. It reports
+SDK calls, SDK writes and wall time per tick, and fails when a scenario goes
+over its budget in BUDGETS.
+
+    python bench/bench_ticks.py              # all scenarios
+    python bench/bench_ticks.py idle combat  # a subset
+    python bench/bench_ticks.py --profile    # also print per-hook latency histograms
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SDK = os.path.join(ROOT, "bench", "fake_sdk")
+
+DT = 1.0 / 60.0
+PLAYER_TICK = "/Script/OakGame.OakPlayerController:PlayerTick"
+DIED = "/Script/OakGame.OakCharacter:Died"
+ON_DEATH = "/Script/OakGame.OakDamageComponent:OnDeath"
+TRAVEL = "/Script/Engine.PlayerController:ClientTravelInternal"
+
+ATTRIBUTES = [
+    "/Game/GameData/Attributes/Weapon/Att_Weapon_ReloadSpeedScale",
+    "/Game/GameData/Attributes/Weapon/Att_Weapon_FireRateScale",
+    "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashDamageScale",
+    "/Game/GameData/Attributes/Weapon/Att_Weapon_SplashRadiusScale",
+    "/Game/GameData/Attributes/ActionSkill/Att_ActionSkill_CooldownRate",
+    "/Game/GameData/Attributes/Movement/Att_CharacterMovementSpeed",
+    "/Game/GameData/Attributes/Character/Att_Character_DamageReduction",
+    "/Game/GameData/Attributes/Weapon/Att_Weapon_ProjectilesPerShot",
+]
+
+# Upper bounds per measured tick; "writes" counts property sets, SetAttributeBaseValue and SetFOV.
+# "draws" is debug spheres issued per tick by the pylon renderer.
+# "tick_hooks" is the number of PlayerTick hooks still attached at the end of the run.
+BUDGETS = {
+    "idle":   {"calls": 3.0,  "writes": 0.0},
+    "idle_no_pylons": {"calls": 0.0, "writes": 0.0, "tick_hooks": 0},
+    "combat": {"calls": 5.0,  "writes": 0.5},
+    "wipe":   {"calls": 5.0,  "writes": 0.5},
+    "pylons": {"calls": 5.0,  "writes": 0.5},
+    "travel": {"calls": 5.0,  "writes": 0.5},
+    # "early" counts stacks gained after a clock reset that were gone 8 s later (DecaySeconds is 10).
+    "travel_reset": {"calls": 5.0, "writes": 0.5, "early": 0},
+    # "stalled" counts kills after a controller swap that never became stacks.
+    "new_controller": {"calls": 5.0, "writes": 0.5, "stalled": 0},
+    "pylon_field": {"calls": 10.0, "writes": 0.5, "draws": 6.0},
+    # Sprinting across ~60 regions; "anchors" is what the map grid still holds at the
+    # end (at most regions.MAX_REGIONS x 'Anchors Per Region').
+    "roam":   {"calls": 5.0,  "writes": 0.5, "anchors": 80},
+}
+
+def redirect_journals(root: str) -> None:
+    from arpg_core import bases
+    for mod in ("KillStackHaste", "PylonsARPG", "UberUniques"):
+        sys.modules[mod]._session.journal.root = root
+    bases._journal.root = root
+
+class World:
+    def __init__(self, state_dir: str | None = None, before_enable=None, players: int = 1) -> None:
+        sys.path[:0] = [FAKE_SDK, ROOT]
+        import unrealsdk
+        import mods_base
+        self.sdk = unrealsdk
+        self.hooks = unrealsdk.hooks
+        for path in ATTRIBUTES:
+            unrealsdk.add_attribute(path)
+        self.pcs = [unrealsdk.spawn_player(loc=(i * 3000.0, 0.0, 0.0)) for i in range(players)]
+        self.pc = self.pcs[0]
+        import KillStackHaste  # noqa: F401
+        import PylonsARPG  # noqa: F401
+        import UberUniques  # noqa: F401
+        # Keep pylon layouts and session journals written during the run out of the mod folders.
+        self.tmp = tempfile.TemporaryDirectory()
+        PylonsARPG._store.root = self.tmp.name
+        redirect_journals(state_dir or self.tmp.name)
+        if before_enable is not None:
+            before_enable(self.pc)
+        self.mods = mods_base.mods
+        for mod in self.mods.values():
+            mod.enable()
+        # UberUniques parses its loot tables on a worker from on_enable; deliver them
+        # now, so the drain task is not still on the tick hook when a run is measured.
+        from arpg_core import workers
+        job = UberUniques._loot_job
+        while job is not None and job in workers._outstanding:
+            job.wait()
+            workers.drain()
+        self.world = self.pc.GetWorldInfo()
+        self.pawn = self.pc.Pawn
+        self.camera = self.pc.PlayerCameraManager
+        self.render = PylonsARPG.render
+        # Scenario checks that failed, e.g. a stack that decayed early.
+        self.early = 0
+        self.stalled = 0
+
+    def _props(self, obj):
+        return object.__getattribute__(obj, "_props")
+
+    def tick(self) -> None:
+        self._props(self.world)["TimeSeconds"] += DT
+        self.hooks.dispatch(PLAYER_TICK, self.pc)
+
+    def new_controller(self) -> None:
+        # Loading a save or non-seamless travel: player one gets a new controller and pawn.
+        self.pawn = self.sdk.Pawn()
+        self.pc = self.sdk.PlayerController(self.world, self.pawn)
+        self.pcs[0] = self.sdk.GetEngine().GamePlayers[0].Actor = self.pc
+        self.camera = self.pc.PlayerCameraManager
+        self.hooks.dispatch(TRAVEL, self.pc)
+
+    def kill(self, count: int) -> None:
+        for _ in range(count):
+            enemy = self.sdk.Enemy()
+            self.hooks.dispatch(DIED, enemy)
+            self.hooks.dispatch(ON_DEATH, self.sdk.DamageComponent(enemy))
+
+    def move(self, dx: float, dy: float) -> None:
+        x, y, z = object.__getattribute__(self.pawn, "loc")
+        object.__setattr__(self.pawn, "loc", (x + dx, y + dy, z))
+        object.__setattr__(self.camera, "loc", (x + dx, y + dy, z))
+
+    def turn(self, yaw: float) -> None:
+        object.__setattr__(self.camera, "yaw", yaw)
+
+    def travel(self, map_name: str, reset_clock: bool = False) -> None:
+        object.__setattr__(self.world, "map_name", map_name)
+        if reset_clock:
+            # A new world starts its clock at zero.
+            self._props(self.world)["TimeSeconds"] = 0.0
+        self.pawn = self.sdk.Pawn()
+        self._props(self.pc)["Pawn"] = self.pawn
+        self.hooks.dispatch(TRAVEL, self.pc)
+
+    def press(self, mod: str, identifier: str) -> None:
+        self.mods[mod].keybind(identifier)()
+
+def _idle(w: World, i: int) -> None:
+    pass
+
+def _idle_no_pylons(w: World, i: int) -> None:
+    # All mods enabled on a map with no anchors (generation off, none dropped) and no
+    # buffs: every PlayerTick hook, Pylons' included, should detach.
+    if i == 0:
+        sys.modules["PylonsARPG"].AnchorsPerRegion.value = 0
+
+def _combat(w: World, i: int) -> None:
+    if i % 240 == 0:
+        w.kill(3)
+    elif i % 30 == 0:
+        w.kill(1)
+
+def _wipe(w: World, i: int) -> None:
+    if i % 300 == 0:
+        w.kill(40)
+
+def _pylons(w: World, i: int) -> None:
+    w.move(4.0, 0.0)
+    if i % 240 == 0:
+        w.press("PylonsARPG", "Pylon: Drop Anchor Here")
+        w.press("PylonsARPG", "Pylon: Use Nearest")
+
+def _pylon_field(w: World, i: int) -> None:
+    # 400 anchors 2000 units apart on a 40k x 40k map; only the ones in range and
+    # in front of the camera get drawn.
+    if i == 0:
+        pylons = sys.modules["PylonsARPG"]
+        for gx in range(20):
+            for gy in range(20):
+                a = pylons.Anchor(pylons._built_for_map, gx * 2000.0 - 20000.0, gy * 2000.0 - 20000.0, 0.0, "Frenzy", 0.0, 100 + gx * 20 + gy)
+                pylons._anchors.insert(a)
+        pylons._session.wake()
+    w.move(3.0, 1.0)
+    w.turn((i * 0.5) % 360.0)
+
+def _roam(w: World, i: int) -> None:
+    w.move(200.0, 30.0)
+    w.turn(8.0)
+
+def _travel(w: World, i: int) -> None:
+    if i % 300 == 0:
+        w.travel("Sanctuary3_P" if (i // 300) % 2 else "Prologue_P")
+    if i % 300 == 150:
+        w.kill(2)
+
+def _travel_reset(w: World, i: int) -> None:
+    # Travel with world time restarting while no timer is pending (stacks cleared);
+    # a stack gained after it must still last DecaySeconds.
+    k = i % 600
+    if k == 0:
+        w.press("KillStackHaste", "KSH: Clear Stacks")
+        w.travel("Sanctuary3_P" if (i // 600) % 2 else "Prologue_P", reset_clock=True)
+    elif k == 60:
+        w.kill(1)
+    elif k == 540:
+        if not any(st.stacks for st in sys.modules["KillStackHaste"]._session.states.values()):
+            w.early += 1
+
+def _new_controller(w: World, i: int) -> None:
+    # Ticks only ever come from the new controller; kills must still turn into stacks.
+    k = i % 600
+    if k == 0:
+        w.press("KillStackHaste", "KSH: Clear Stacks")
+        w.new_controller()
+    elif k == 60:
+        w.kill(1)
+    elif k == 120:
+        if not any(st.stacks for st in sys.modules["KillStackHaste"]._session.states.values()):
+            w.stalled += 1
+
+SCENARIOS = {"idle": _idle, "idle_no_pylons": _idle_no_pylons, "combat": _combat, "wipe": _wipe, "pylons": _pylons, "travel": _travel, "travel_reset": _travel_reset, "new_controller": _new_controller, "pylon_field": _pylon_field, "roam": _roam}
+WARMUP = 120
+TICKS = 1200
+
+def run_scenario(name: str, profile: bool = False) -> dict:
+    w = World()
+    from arpg_core import profiling
+    profiling.set_enabled(profile)
+    step = SCENARIOS[name]
+    for i in range(WARMUP):
+        step(w, i)
+        w.tick()
+    w.sdk.reset_stats()
+    draws0 = w.render.total_draws
+    t0 = time.perf_counter()
+    for i in range(TICKS):
+        step(w, i)
+        w.tick()
+    elapsed = time.perf_counter() - t0
+    return {
+        "calls": w.sdk.total_calls() / TICKS,
+        "writes": w.sdk.writes() / TICKS,
+        "us": elapsed / TICKS * 1e6,
+        "draws": (w.render.total_draws - draws0) / TICKS,
+        "anchors": len(sys.modules["PylonsARPG"]._anchors),
+        "tick_hooks": w.hooks.hook_count(PLAYER_TICK),
+        "early": w.early,
+        "stalled": w.stalled,
+        "top": w.sdk.stats.most_common(5),
+        "profile": profiling.report() if profile else [],
+    }
+
+def main(argv: list) -> int:
+    if argv[:1] == ["--child"]:
+        print(json.dumps(run_scenario(argv[1], "--profile" in argv)))
+        return 0
+    profile = "--profile" in argv
+    names = [a for a in argv if not a.startswith("--")] or list(SCENARIOS)
+    failed = []
+    print(f"{'scenario':<16} {'calls/tick':>11} {'writes/tick':>12} {'us/tick':>9} {'draws':>6} {'hooks':>6}  top calls")
+    for name in names:
+        cmd = [sys.executable, __file__, "--child", name] + (["--profile"] if profile else [])
+        out = subprocess.run(cmd, capture_output=True, text=True)
+        if out.returncode != 0:
+            print(f"{name:<16} crashed:\n{out.stderr}")
+            failed.append(name)
+            continue
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        top = ", ".join(f"{k}={v}" for k, v in r["top"])
+        print(f"{name:<16} {r['calls']:>11.2f} {r['writes']:>12.2f} {r['us']:>9.1f} {r['draws']:>6.2f} {r['tick_hooks']:>6}  {top}")
+        for line in r["profile"]:
+            print(f"    {line}")
+        budget = BUDGETS.get(name, {})
+        for key, limit in budget.items():
+            if r[key] > limit:
+                failed.append(f"{name}.{key}={r[key]:.2f} > {limit}")
+    if failed:
+        print("FAIL: " + "; ".join(failed))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
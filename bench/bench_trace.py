@@ -0,0 +1,109 @@
+"""
+Hook trace round trip: record a chaotic fight, replay it, compare.
+
+Runs a scripted two-player session against the fake SDK with the trace recorder
+on: 50-enemy waves killed through both Died and OnDeath, kills by an AI ally,
+friendly deaths, pylon drops and activations while moving. Reports the
+recorder's cost per event and the trace size, then replays the trace in a fresh
+interpreter with ``bench/replay_trace.py`` and fails unless the replay ends in
+the same state as the recorded session.
+
+    python bench/bench_trace.py
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+import bench_ticks  # noqa: E402
+import replay_trace  # noqa: E402
+
+FRAMES = 3600
+WAVE = 50
+
+def session(w, frame: int) -> None:
+    sdk = w.sdk
+    p1, p2 = w.pcs
+    if frame % 300 == 0:
+        # A wave: most kills by player one, some by player two, a few by an ally.
+        for n in range(WAVE):
+            enemy = sdk.Enemy("BPChar_Enemy" if n % 7 else "BPChar_Badass", hostile=n % 13 != 0)
+            killer = p1.Pawn if n % 3 else (p2.Pawn if n % 9 else sdk.Enemy("Ally", hostile=False))
+            args = replay_trace.HookArgs(killer)
+            w.hooks.dispatch(bench_ticks.DIED, enemy, args)
+            w.hooks.dispatch(bench_ticks.ON_DEATH, sdk.DamageComponent(enemy), args)
+    elif frame % 45 == 0:
+        w.hooks.dispatch(bench_ticks.DIED, sdk.Enemy(), replay_trace.HookArgs(p2.Pawn))
+    if frame % 300 == 150:
+        w.press("PylonsARPG", "Pylon: Drop Anchor Here")
+    if frame % 300 == 180:
+        w.press("PylonsARPG", "Pylon: Use Nearest")
+    if frame == FRAMES // 2:
+        w.press("KillStackHaste", "KSH: Clear Stacks")
+
+def frame_tick(w, i: int) -> None:
+    for pc in w.pcs:
+        w._props(pc.GetWorldInfo())["TimeSeconds"] = (i + 1) * bench_ticks.DT
+    for n, pc in enumerate(w.pcs):
+        x, y, z = object.__getattribute__(pc.Pawn, "loc")
+        object.__setattr__(pc.Pawn, "loc", (x + 6.0 + n, y + (i % 7) - 3.0, z))
+    for pc in w.pcs:
+        w.hooks.dispatch(bench_ticks.PLAYER_TICK, pc)
+
+def record(out: str, with_trace: bool) -> dict:
+    from arpg_core import trace
+    w = bench_ticks.World(players=2)
+    sys.modules["UberUniques"]._tables().seed(0)
+    if with_trace:
+        trace.start(out)
+    t0 = time.perf_counter()
+    for i in range(FRAMES):
+        session(w, i)
+        frame_tick(w, i)
+    elapsed = time.perf_counter() - t0
+    trace.stop()
+    return {"us": elapsed / FRAMES * 1e6, "records": trace.records, "state": replay_trace.final_state()}
+
+def main(argv: list) -> int:
+    if argv[:1] == ["--record"]:
+        print(json.dumps(record(argv[1], argv[2] == "1")))
+        return 0
+    me = os.path.abspath(__file__)
+    runs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "session.arpt")
+        for label, flag in (("plain", "0"), ("traced", "1")):
+            out = subprocess.run([sys.executable, me, "--record", path, flag], capture_output=True, text=True)
+            if out.returncode != 0:
+                print(out.stderr)
+                return 1
+            runs[label] = json.loads(out.stdout.strip().splitlines()[-1])
+        size = os.path.getsize(path)
+        out = subprocess.run([sys.executable, os.path.join(ROOT, "bench", "replay_trace.py"), path, "--json"],
+                             capture_output=True, text=True)
+        if out.returncode != 0:
+            print(out.stderr)
+            return 1
+        replayed = json.loads(out.stdout.strip().splitlines()[-1])
+    rec = runs["traced"]
+    overhead = (rec["us"] - runs["plain"]["us"]) * FRAMES / max(1, rec["records"])
+    print(f"recorded {rec['records']} events in {size} bytes ({size / max(1, rec['records']):.1f} B/event); "
+          f"frame {runs['plain']['us']:.1f} us plain, {rec['us']:.1f} us recording (~{overhead:.2f} us/event)")
+    replay_trace.print_report(replayed)
+    print(f"recorded state: {json.dumps(rec['state'])}")
+    failed = []
+    if runs["plain"]["state"] != rec["state"]:
+        failed.append("recording changed the session's outcome")
+    if replayed["state"] != rec["state"]:
+        failed.append("replay ended in a different state than the recorded session")
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+"""
+Worker pool: drain budget, backpressure and cancellation.
+
+Against the fake SDK, submits batches of jobs whose work takes a while on a
+worker and whose ``done`` callback costs ~100 us on the game thread, lets each
+batch finish (as if during one long frame), then ticks frames until every
+completion is delivered. Reports the game-thread cost of a submit, the drain
+time per frame and how many frames hit the budget, and fails if the 99th
+percentile frame drains for longer than the budget plus one callback (the max
+is reported too; one preempted frame is not the pool's doing). Then fills the
+queue with blocked jobs to check ``submit`` refuses instead of blocking, and
+cancels an owner's jobs to check none of their callbacks run and the frame
+task detaches afterwards.
+
+    python bench/bench_workers.py
+"""
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+import unrealsdk  # noqa: E402
+from arpg_core import frame, workers  # noqa: E402
+
+JOBS = 400
+BATCH = 40
+CALLBACK_US = 100
+# Scheduler noise on a shared machine; a real overrun is a whole batch of callbacks.
+SLACK_MS = 1.0
+
+def _spin(us: float) -> None:
+    end = time.perf_counter() + us / 1e6
+    while time.perf_counter() < end:
+        pass
+
+def _tick(pc) -> None:
+    unrealsdk.hooks.dispatch(frame.PLAYER_TICK, pc)
+
+def main() -> int:
+    pc = unrealsdk.spawn_player()
+    failed = []
+
+    done = []
+    submit_ns = 0
+    frames = 0
+    for start in range(0, JOBS, BATCH):
+        jobs = []
+        for i in range(start, start + BATCH):
+            t0 = time.perf_counter_ns()
+            job = workers.submit("Bench", lambda i=i: (time.sleep(0.0002), i)[1],
+                                 lambda v: (_spin(CALLBACK_US), done.append(v)))
+            submit_ns += time.perf_counter_ns() - t0
+            if job is None:
+                failed.append("submit refused below the queue bound")
+            else:
+                jobs.append(job)
+        # The whole batch finishes during one long frame, so the drain has to spread it.
+        for job in jobs:
+            job.wait()
+        while len(done) < start + BATCH and frames < 100000:
+            _tick(pc)
+            frames += 1
+            time.sleep(0.0001)
+    worst_ms = workers.drain_ns.max_ns / 1e6
+    p99_ms = workers.drain_ns.percentile(99) / 1e6
+    print(f"{JOBS} jobs: submit {submit_ns / JOBS / 1000:.1f} us each; drained over {workers.drain_ns.n} frames, "
+          f"p99 {p99_ms * 1000:.0f} us, max {worst_ms * 1000:.0f} us "
+          f"(budget {workers.budget_ms * 1000:.0f} us), {workers.deferred} frames left completions for the next")
+    if sorted(done) != list(range(JOBS)):
+        failed.append(f"{JOBS - len(done)} completions missing")
+    if p99_ms > workers.budget_ms + CALLBACK_US / 1000 + SLACK_MS:
+        failed.append(f"p99 frame drained for {p99_ms:.2f} ms")
+
+    gate = threading.Event()
+    blocked = [workers.submit(None, gate.wait) for _ in range(workers.THREADS + workers.MAX_QUEUED + 8)]
+    refused = sum(1 for j in blocked if j is None)
+    print(f"queue full: {refused} of {len(blocked)} submits refused without blocking")
+    if refused < 8:
+        failed.append("submit accepted more than the queue holds")
+    gate.set()
+    for j in blocked:
+        if j is not None:
+            j.wait()
+
+    gate = threading.Event()
+    ran = []
+    workers.submit(None, gate.wait)
+    workers.submit(None, gate.wait)
+    for i in range(20):
+        workers.submit("Cancelled", lambda: None, lambda v: ran.append(v))
+    n = workers.cancel("Cancelled")
+    gate.set()
+    for _ in range(200):
+        _tick(pc)
+        time.sleep(0.0005)
+    attached = unrealsdk.hooks.hook_count(frame.PLAYER_TICK)
+    print(f"cancelled {n} jobs, {len(ran)} callbacks ran; tick hooks left attached: {attached}")
+    if ran:
+        failed.append("cancelled callbacks ran")
+    if attached:
+        failed.append("drain task still attached with nothing outstanding")
+    print(workers.report())
+    for f in failed:
+        print(f"FAIL: {f}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
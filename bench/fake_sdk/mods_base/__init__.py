@@ -0,0 +1,107 @@
+"""Minimal mods_base stand-in: options, hooks, keybinds and build_mod."""
+import inspect
+from typing import Any, Callable, Dict, List, Optional
+
+from unrealsdk.hooks import Type, add_hook, remove_hook
+
+class _Option:
+    def __init__(self, identifier: str, value: Any, *, on_change: Optional[Callable[[Any, Any], None]] = None) -> None:
+        self.identifier = identifier
+        self.on_change = on_change
+        object.__setattr__(self, "value", value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        # Like mods_base, on_change runs before the value is updated.
+        if name == "value" and getattr(self, "on_change", None) is not None:
+            self.on_change(self, value)
+        object.__setattr__(self, name, value)
+
+class SliderOption(_Option):
+    def __init__(self, identifier: str, value: float, min_value: float, max_value: float,
+                 step: float = 1, is_integer: bool = True, **kwargs: Any) -> None:
+        self.min_value, self.max_value, self.step, self.is_integer = min_value, max_value, step, is_integer
+        super().__init__(identifier, value, **kwargs)
+
+class BoolOption(_Option):
+    def __init__(self, identifier: str, value: bool, true_text: Optional[str] = None,
+                 false_text: Optional[str] = None, **kwargs: Any) -> None:
+        self.true_text, self.false_text = true_text, false_text
+        super().__init__(identifier, value, **kwargs)
+
+class _Hook:
+    def __init__(self, func: str, type: Type, fn: Callable[..., Any]) -> None:
+        self.hook_func = func
+        self.hook_type = type
+        self.fn = fn
+        self.identifier = f"{fn.__module__}.{fn.__name__}"
+        self.__name__ = fn.__name__
+
+    def __call__(self, *args: Any) -> Any:
+        return self.fn(*args)
+
+    def enable(self) -> None:
+        add_hook(self.hook_func, self.hook_type, self.identifier, self)
+
+    def disable(self) -> None:
+        remove_hook(self.hook_func, self.hook_type, self.identifier)
+
+def hook(func: str, type: Type = Type.PRE, **_: Any) -> Callable[[Callable[..., Any]], _Hook]:
+    return lambda fn: _Hook(func, type, fn)
+
+class _Keybind:
+    def __init__(self, identifier: str, fn: Callable[[], None]) -> None:
+        self.identifier = identifier
+        self.callback = fn
+        self.__name__ = fn.__name__
+
+    def __call__(self) -> None:
+        self.callback()
+
+def keybind(identifier: str, key: Optional[str] = None, **_: Any) -> Callable[[Callable[[], None]], _Keybind]:
+    return lambda fn: _Keybind(identifier, fn)
+
+class Mod:
+    def __init__(self, name: str, options: List[_Option], hooks: List[_Hook], keybinds: List[_Keybind],
+                 on_enable: Optional[Callable[[], None]], on_disable: Optional[Callable[[], None]]) -> None:
+        self.name = name
+        self.options = options
+        self.hooks = hooks
+        self.keybinds = keybinds
+        self.on_enable = on_enable
+        self.on_disable = on_disable
+        self.is_enabled = False
+
+    def enable(self) -> None:
+        for h in self.hooks:
+            h.enable()
+        self.is_enabled = True
+        if self.on_enable:
+            self.on_enable()
+
+    def disable(self) -> None:
+        for h in self.hooks:
+            h.disable()
+        self.is_enabled = False
+        if self.on_disable:
+            self.on_disable()
+
+    def keybind(self, identifier: str) -> _Keybind:
+        return next(k for k in self.keybinds if k.identifier == identifier)
+
+mods: Dict[str, Mod] = {}
+
+def build_mod(*, on_enable: Optional[Callable[[], None]] = None, on_disable: Optional[Callable[[], None]] = None,
+              **_: Any) -> Mod:
+    module = inspect.stack()[1].frame.f_globals
+    name = module["__name__"].split(".")[0]
+    values = list(module.values())
+    mod = Mod(
+        name,
+        [v for v in values if isinstance(v, _Option)],
+        [v for v in values if isinstance(v, _Hook)],
+        [v for v in values if isinstance(v, _Keybind)],
+        on_enable or module.get("on_enable"),
+        on_disable or module.get("on_disable"),
+    )
+    mods[name] = mod
+    return mod
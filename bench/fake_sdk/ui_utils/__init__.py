@@ -0,0 +1,7 @@
+import unrealsdk
+
+messages = []
+
+def show_hud_message(title: str, msg: str, duration: float = 2.5) -> None:
+    unrealsdk.stats["show_hud_message"] += 1
+    messages.append((title, msg))
@@ -0,0 +1,198 @@
+"""
+Headless stand-in for unrealsdk, for benchmarks only.
+
+Models just enough of the engine for the bl3_ARPG mods: GamePlayers with a
+controller, pawn, movement component, camera and team component, attribute
+base values, FindObject, DrawDebugSphere and hook dispatch. Every SDK-facing
+operation is counted in ``stats`` so benchmarks can report calls per tick.
+"""
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import hooks, unreal
+from .unreal import UObject, WrappedStruct
+
+stats: Counter = Counter()
+
+def reset_stats() -> None:
+    stats.clear()
+
+def total_calls() -> int:
+    return sum(stats.values())
+
+def writes() -> int:
+    return sum(v for k, v in stats.items() if k.startswith("set:") or k == "call:SetAttributeBaseValue" or k == "call:SetFOV")
+
+class FakeObject(UObject):
+    """Counts every property read/write that is not a Python-side dunder or helper."""
+
+    def __init__(self, **props: Any) -> None:
+        object.__setattr__(self, "_props", dict(props))
+
+    def __getattr__(self, name: str) -> Any:
+        props = object.__getattribute__(self, "_props")
+        if name in props:
+            stats["get:" + name] += 1
+            return props[name]
+        raise AttributeError(name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        stats["set:" + name] += 1
+        object.__getattribute__(self, "_props")[name] = value
+
+    def _call(self, name: str) -> None:
+        stats["call:" + name] += 1
+
+class AttributeDefinition(FakeObject):
+    def __init__(self, path: str) -> None:
+        super().__init__()
+        object.__setattr__(self, "path", path)
+
+class AttributeHolder(FakeObject):
+    def __init__(self, **props: Any) -> None:
+        super().__init__(**props)
+        object.__setattr__(self, "attributes", {})
+
+    def GetAttributeBaseValue(self, attr: AttributeDefinition) -> float:
+        self._call("GetAttributeBaseValue")
+        return object.__getattribute__(self, "attributes").get(attr.path, 1.0)
+
+    def SetAttributeBaseValue(self, attr: AttributeDefinition, value: float) -> None:
+        self._call("SetAttributeBaseValue")
+        object.__getattribute__(self, "attributes")[attr.path] = value
+
+class Vector:
+    __slots__ = ("X", "Y", "Z")
+
+    def __init__(self, x: float, y: float, z: float) -> None:
+        self.X, self.Y, self.Z = x, y, z
+
+class WorldInfo(FakeObject):
+    def __init__(self, map_name: str) -> None:
+        super().__init__(TimeSeconds=0.0)
+        object.__setattr__(self, "map_name", map_name)
+
+    def GetMapName(self) -> str:
+        self._call("GetMapName")
+        return object.__getattribute__(self, "map_name")
+
+class TeamComponent(FakeObject):
+    def IsHostile(self, other: Any) -> bool:
+        self._call("IsHostile")
+        return bool(getattr(other, "hostile", True))
+
+class Rotator:
+    __slots__ = ("Pitch", "Yaw", "Roll")
+
+    def __init__(self, pitch: float, yaw: float, roll: float) -> None:
+        self.Pitch, self.Yaw, self.Roll = pitch, yaw, roll
+
+class Camera(FakeObject):
+    def __init__(self) -> None:
+        super().__init__(DefaultFOV=90.0)
+        object.__setattr__(self, "fov", 90.0)
+        object.__setattr__(self, "loc", (0.0, 0.0, 0.0))
+        object.__setattr__(self, "yaw", 0.0)
+
+    def GetCameraLocation(self) -> Vector:
+        self._call("GetCameraLocation")
+        return Vector(*object.__getattribute__(self, "loc"))
+
+    def GetCameraRotation(self) -> Rotator:
+        self._call("GetCameraRotation")
+        return Rotator(0.0, object.__getattribute__(self, "yaw"), 0.0)
+
+    def GetFOVAngle(self) -> float:
+        self._call("GetFOVAngle")
+        return object.__getattribute__(self, "fov")
+
+    def SetFOV(self, fov: float) -> None:
+        self._call("SetFOV")
+        object.__setattr__(self, "fov", fov)
+
+class Pawn(AttributeHolder):
+    def __init__(self, loc: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> None:
+        super().__init__(
+            CharacterMovement=FakeObject(MaxWalkSpeed=600.0, MaxSprintSpeed=900.0),
+            CustomTimeDilation=1.0,
+        )
+        object.__setattr__(self, "loc", loc)
+
+    def K2_GetActorLocation(self) -> Vector:
+        self._call("K2_GetActorLocation")
+        return Vector(*object.__getattribute__(self, "loc"))
+
+class PlayerController(AttributeHolder):
+    def __init__(self, world: WorldInfo, pawn: Optional[Pawn] = None) -> None:
+        super().__init__(Pawn=pawn, PlayerCameraManager=Camera(), SkillPoints=0)
+        object.__setattr__(self, "world", world)
+        object.__setattr__(self, "team", TeamComponent())
+
+    def GetWorldInfo(self) -> WorldInfo:
+        self._call("GetWorldInfo")
+        return object.__getattribute__(self, "world")
+
+    def GetTeamComponent(self) -> TeamComponent:
+        self._call("GetTeamComponent")
+        return object.__getattribute__(self, "team")
+
+    def AddSkillPoints(self, count: int) -> None:
+        self._call("AddSkillPoints")
+        self.SkillPoints = self.SkillPoints + count
+
+class EnemyClass:
+    __slots__ = ("Name",)
+
+    def __init__(self, name: str) -> None:
+        self.Name = name
+
+class Enemy(UObject):
+    def __init__(self, cls: str = "BPChar_Enemy", hostile: bool = True) -> None:
+        self.Class = EnemyClass(cls)
+        self.hostile = hostile
+
+class DamageComponent(UObject):
+    def __init__(self, owner: Enemy) -> None:
+        self.Owner = owner
+
+class LocalPlayer:
+    __slots__ = ("Actor",)
+
+    def __init__(self, actor: PlayerController) -> None:
+        self.Actor = actor
+
+class Engine:
+    def __init__(self) -> None:
+        self.GamePlayers: List[LocalPlayer] = []
+
+_engine = Engine()
+# Paths FindObject can resolve; everything else returns None like a missing asset.
+known_attributes: Dict[str, AttributeDefinition] = {}
+
+def GetEngine() -> Engine:
+    stats["GetEngine"] += 1
+    return _engine
+
+def FindObject(cls: str, path: str) -> Any:
+    stats["FindObject"] += 1
+    return known_attributes.get(path)
+
+def DrawDebugSphere(*_: Any) -> None:
+    stats["DrawDebugSphere"] += 1
+
+def add_attribute(path: str) -> AttributeDefinition:
+    attr = known_attributes[path] = AttributeDefinition(path)
+    return attr
+
+def spawn_player(map_name: str = "Bench_P", loc: Tuple[float, float, float] = (0.0, 0.0, 0.0)) -> PlayerController:
+    pc = PlayerController(WorldInfo(map_name), Pawn(loc))
+    _engine.GamePlayers.append(LocalPlayer(pc))
+    return pc
+
+def reset() -> None:
+    _engine.GamePlayers.clear()
+    known_attributes.clear()
+    hooks.clear()
+    reset_stats()
+
+__all__ = ["hooks", "unreal", "UObject", "WrappedStruct"]
@@ -0,0 +1,29 @@
+from enum import Enum
+from typing import Any, Callable, Dict, Tuple
+
+class Type(Enum):
+    PRE = 0
+    POST = 1
+    POST_UNCONDITIONAL = 2
+
+_hooks: Dict[Tuple[str, Type], Dict[str, Callable[..., Any]]] = {}
+
+def add_hook(func: str, type: Type, identifier: str, callback: Callable[..., Any]) -> None:
+    _hooks.setdefault((func, type), {})[identifier] = callback
+
+def remove_hook(func: str, type: Type, identifier: str) -> bool:
+    return _hooks.get((func, type), {}).pop(identifier, None) is not None
+
+def has_hook(func: str, type: Type, identifier: str) -> bool:
+    return identifier in _hooks.get((func, type), {})
+
+def hook_count(func: str) -> int:
+    return sum(len(v) for (f, _), v in _hooks.items() if f == func)
+
+def dispatch(func: str, obj: Any, args: Any = None) -> None:
+    for type in (Type.PRE, Type.POST):
+        for callback in list(_hooks.get((func, type), {}).values()):
+            callback(obj, args, None, func)
+
+def clear() -> None:
+    _hooks.clear()
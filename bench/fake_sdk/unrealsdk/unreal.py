@@ -0,0 +1,5 @@
+class UObject:
+    pass
+
+class WrappedStruct:
+    pass
@@ -0,0 +1,123 @@
+"""
+Replay a recorded hook trace through KillStackHaste, PylonsARPG and UberUniques.
+
+Record a trace in game with the arpg_core option "Record Hook Trace" (written
+under ``arpg_core/traces/``), then feed it back here against the fake SDK at full
+speed. Every PlayerTick, kill and keybind in the trace is dispatched to the mods
+with the recorded world time, pawn position, victim class, hostility and killer;
+the report gives the time and SDK calls each event type costs. Uber drops are
+seeded (``--seed``), so a replay is deterministic: save its final state once
+with ``--save`` and later replays with ``--expect`` fail if the state changed.
+
+    python bench/replay_trace.py TRACE [--seed N] [--save STATE.json] [--expect STATE.json]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, "bench", "fake_sdk"), ROOT]
+
+import bench_ticks  # noqa: E402
+
+class HookArgs:
+    __slots__ = ("InstigatedBy",)
+
+    def __init__(self, instigator) -> None:
+        self.InstigatedBy = instigator
+
+def final_state() -> dict:
+    ksh, pylons, ubers = (sys.modules[m] for m in ("KillStackHaste", "PylonsARPG", "UberUniques"))
+    by_index = lambda states: sorted(states.values(), key=lambda st: st.ctx.index)
+    return {
+        "stacks": [st.stacks for st in by_index(ksh._session.states)],
+        "uber": [st.active.name if st.active else None for st in by_index(ubers._session.states)],
+        "pylons": sorted([b["player"].index, b["type"]] for b in pylons._active),
+        "anchors": len(pylons._anchors),
+    }
+
+def replay(trace_path: str, seed: int = 0) -> dict:
+    from arpg_core import profiling, trace
+    events = list(trace.events(trace_path))
+    players = 1 + max((e.player for e in events if e.player != trace.NOT_LOCAL), default=0)
+    w = bench_ticks.World(players=players)
+    sdk = w.sdk
+    sys.modules["UberUniques"]._tables().seed(seed)
+    worlds = [w._props(pc.GetWorldInfo()) for pc in w.pcs]
+    hists = {k: profiling.Histogram() for k in trace.KINDS}
+    calls = {k: 0 for k in trace.KINDS}
+    victims = {}
+    stranger = sdk.Enemy("Stranger", hostile=False)
+    perf = time.perf_counter_ns
+    for e in events:
+        for props in worlds:
+            props["TimeSeconds"] = e.time
+        if e.kind == trace.TICK:
+            pc = w.pcs[e.player]
+            if e.player == 0:
+                victims.clear()
+            object.__setattr__(pc.Pawn, "loc", (e.x, e.y, e.z))
+            object.__setattr__(pc.PlayerCameraManager, "loc", (e.x, e.y, e.z))
+            fn = lambda pc=pc: w.hooks.dispatch(bench_ticks.PLAYER_TICK, pc)
+        elif e.kind in (trace.DIED, trace.ON_DEATH):
+            victim = victims.get(e.victim)
+            if victim is None:
+                victim = victims[e.victim] = sdk.Enemy(e.name or "BPChar_Enemy", e.hostile)
+            args = HookArgs(stranger if e.player == trace.NOT_LOCAL else w.pcs[e.player].Pawn)
+            if e.kind == trace.DIED:
+                fn = lambda v=victim, a=args: w.hooks.dispatch(bench_ticks.DIED, v, a)
+            else:
+                fn = lambda v=victim, a=args: w.hooks.dispatch(bench_ticks.ON_DEATH, sdk.DamageComponent(v), a)
+        elif e.kind == trace.KEYBIND:
+            module, _, name = e.name.rpartition(".")
+            fn = getattr(sys.modules[module], name)
+        else:
+            continue
+        before = sdk.total_calls()
+        t0 = perf()
+        fn()
+        hists[e.kind].record(perf() - t0)
+        calls[e.kind] += sdk.total_calls() - before
+    return {
+        "events": {trace.KINDS[k]: {"n": h.n, "mean_us": h.total_ns / h.n / 1000 if h.n else 0.0,
+                                    "p99_us": h.percentile(99) / 1000, "max_us": h.max_ns / 1000,
+                                    "calls": calls[k] / h.n if h.n else 0.0}
+                   for k, h in hists.items()},
+        "state": final_state(),
+    }
+
+def print_report(result: dict) -> None:
+    print(f"{'event':<10} {'n':>7} {'mean us':>8} {'p99 us':>8} {'max us':>8} {'calls':>6}")
+    for kind, r in result["events"].items():
+        if r["n"]:
+            print(f"{kind:<10} {r['n']:>7} {r['mean_us']:>8.1f} {r['p99_us']:>8.1f} {r['max_us']:>8.1f} {r['calls']:>6.2f}")
+    print(f"final state: {json.dumps(result['state'])}")
+
+def main(argv: list) -> int:
+    ap = argparse.ArgumentParser(description="Replay a hook trace against the fake SDK.")
+    ap.add_argument("trace")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--save", help="write the final state here")
+    ap.add_argument("--expect", help="fail unless the final state matches this file")
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    opts = ap.parse_args(argv)
+    result = replay(opts.trace, opts.seed)
+    if opts.json:
+        print(json.dumps(result))
+    else:
+        print_report(result)
+    if opts.save:
+        with open(opts.save, "w", encoding="utf-8") as f:
+            json.dump(result["state"], f, indent=1)
+    if opts.expect:
+        with open(opts.expect, encoding="utf-8") as f:
+            want = json.load(f)
+        if want != result["state"]:
+            print(f"FAIL: final state differs from {opts.expect}: {json.dumps(want)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))